@@ -0,0 +1,355 @@
+import datetime
+import itertools
+import threading
+import numpy as np
+
+# Day and month value of motions without a readable order date
+MISSING = -1
+
+# Velocities are reported as denials per this many days
+VELOCITY_DAYS = 30
+
+
+def _day_number(date, name="date"):
+    """Days since 1970-01-01 of an ISO date string, raising ValueError naming the parameter if it is not one"""
+    try:
+        day = datetime.date.fromisoformat(date)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    return int(np.datetime64(day, "D").astype(np.int64))
+
+
+def _month_number(month, name="month"):
+    """Months since January 1970 of a YYYY-MM string, raising ValueError naming the parameter if it is not one"""
+    try:
+        first_day = datetime.datetime.strptime(month, "%Y-%m").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a month in YYYY-MM format")
+    return int(np.datetime64(first_day, "M").astype(np.int64))
+
+
+def _month_first_day(month_number):
+    """Day number of the first day of a month number"""
+    return int(np.datetime64(month_number, "M").astype("datetime64[D]").astype(np.int64))
+
+
+def _int_rows(rows, width):
+    """(len(rows), width) int64 array of fetched rows, filled without building a list per row"""
+    values = itertools.chain.from_iterable(rows)
+    return np.fromiter(values, dtype=np.int64, count=len(rows) * width).reshape(len(rows), width)
+
+
+def _rounded(values, digits=2):
+    """Plain Python floats for JSON, with NaN as None"""
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+class Snapshot:
+    """Columnar copy of the motions table in NumPy arrays, one element per motion
+    
+    judge and court hold dimension ids and motion_type an index into
+    motion_types, all -1 where missing; day and month hold the order date as
+    days and months since January 1970. Motions are ordered by day, undated
+    ones first and dated ones from first_dated on, so every date range is a
+    contiguous slice. firm_motion and firm list every distinct (motion index,
+    law firm id) pair, ordered by motion index.
+    """
+    
+    def __init__(self, db):
+        motions = []
+        firm_pairs = []
+        self.names = {}
+        for kind, value in db.iter_analytics_columns():
+            if kind == "generation":
+                self.generation = value
+            elif kind == "motion_types":
+                self.motion_types = value
+            elif kind == "names":
+                dimension, names = value
+                self.names[dimension] = names
+            elif kind == "motions":
+                motions.append(_int_rows(value, 5))
+            elif kind == "law_firms":
+                firm_pairs.append(_int_rows(value, 2))
+        
+        motions = np.concatenate(motions) if motions else np.empty((0, 5), dtype=np.int64)
+        undated = motions[:, 4] == MISSING
+        motions = motions[np.lexsort((motions[:, 4], ~undated))]
+        self.first_dated = int(undated.sum())
+        self.ids = motions[:, 0]
+        self.judge = motions[:, 1].astype(np.int32)
+        self.court = motions[:, 2].astype(np.int32)
+        self.motion_type = motions[:, 3].astype(np.int32)
+        self.day = motions[:, 4].astype(np.int32)
+        months = motions[:, 4].astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+        self.month = np.where(self.day != MISSING, months, MISSING).astype(np.int32)
+        
+        # Pairs are found by motion position; a firm appearing through several attorneys counts once
+        firm_pairs = np.concatenate(firm_pairs) if firm_pairs else np.empty((0, 2), dtype=np.int64)
+        if len(self.ids) and len(firm_pairs):
+            by_id = np.argsort(self.ids)
+            index = np.minimum(np.searchsorted(self.ids[by_id], firm_pairs[:, 0]), len(self.ids) - 1)
+            position = by_id[index]
+            found = self.ids[position] == firm_pairs[:, 0]
+            stride = int(firm_pairs[:, 1].max()) + 1
+            keys = np.sort(position[found] * stride + firm_pairs[found, 1])
+            distinct = np.ones(len(keys), dtype=bool)
+            distinct[1:] = keys[1:] != keys[:-1]
+            keys = keys[distinct]
+            self.firm_motion = (keys // stride).astype(np.int64)
+            self.firm = (keys % stride).astype(np.int32)
+        else:
+            self.firm_motion = np.empty(0, dtype=np.int64)
+            self.firm = np.empty(0, dtype=np.int32)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def name(self, dimension, dimension_id):
+        return self.names[dimension].get(int(dimension_id))
+
+
+class AnalyticsEngine:
+    """Judge, court and law firm analytics computed with NumPy over a cached snapshot of the motions
+    
+    The snapshot is loaded on first use and reloaded on the first use after
+    the data generation changes, so analytics never run on stale data and the
+    table is only read once per write. Every aggregate is a vectorized pass
+    over the snapshot arrays.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._snapshot = None
+        self._lock = threading.Lock()
+    
+    def snapshot(self):
+        """The snapshot for the current data generation, loading it if the data has changed"""
+        generation = self.db.get_generation()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+        
+        # One load at a time; requests arriving meanwhile wait for it rather than loading again
+        with self._lock:
+            if self._snapshot is None or self._snapshot.generation != generation:
+                self._snapshot = Snapshot(self.db)
+            return self._snapshot
+    
+    def clear(self):
+        """Drop the cached snapshot, so the next call loads it again"""
+        with self._lock:
+            self._snapshot = None
+    
+    def _select(self, snapshot, court=None, motion_type=None, first_day=None, last_day=None, dated=False):
+        """Slice of the snapshot rows ordered between two day numbers, and a mask over it of the matching rows
+        
+        Undated motions are left out once either day is given or dated is set,
+        as filter_motions leaves them out of date filters.
+        """
+        start, stop = 0, len(snapshot)
+        if dated or first_day is not None or last_day is not None:
+            days = snapshot.day[snapshot.first_dated:]
+            start = snapshot.first_dated + (int(np.searchsorted(days, first_day)) if first_day is not None else 0)
+            if last_day is not None:
+                stop = snapshot.first_dated + int(np.searchsorted(days, last_day, side="right"))
+        rows = slice(start, max(start, stop))
+        
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+        if court:
+            court_id = self.db.find_dimension_id("court", court)
+            mask &= snapshot.court[rows] == (court_id if court_id is not None else -2)
+        if motion_type:
+            # Lookup by type index; the extra last entry is the one a missing type (-1) reads
+            matches = np.zeros(len(snapshot.motion_types) + 1, dtype=bool)
+            matches[[index for index, name in enumerate(snapshot.motion_types) if motion_type.lower() in name.lower()]] = True
+            mask &= matches[snapshot.motion_type[rows]]
+        return rows, mask
+    
+    def judge_velocity(self, window_days=90, as_of=None, court=None, motion_type=None, limit=20):
+        """Denials per 30 days for each judge over a trailing window, against the window before it
+        
+        The window ends at as_of (an ISO date), or at the latest order date.
+        Judges are ranked by denials in the current window.
+        """
+        if not 1 <= window_days <= 3650:
+            raise ValueError("window_days must be between 1 and 3650")
+        
+        snapshot = self.snapshot()
+        rows, mask = self._select(snapshot, court, motion_type, last_day=_day_number(as_of, "as_of") if as_of else None, dated=True)
+        judge = snapshot.judge[rows]
+        day = snapshot.day[rows]
+        mask &= judge >= 0
+        if not mask.any():
+            return {"as_of": None, "window_days": window_days, "judges": []}
+        
+        # Rows are in day order, so the latest matching day is the last matching row's
+        end = _day_number(as_of, "as_of") if as_of else int(day[len(mask) - 1 - np.argmax(mask[::-1])])
+        first, middle, last = np.searchsorted(day, [end - 2 * window_days, end - window_days, end], side="right")
+        size = int(snapshot.judge.max()) + 1
+        current = np.bincount(judge[middle:last][mask[middle:last]], minlength=size)
+        previous = np.bincount(judge[first:middle][mask[first:middle]], minlength=size)
+        total = np.bincount(judge[:last][mask[:last]], minlength=size)
+        
+        # Most denials in the current window first, then most overall
+        order = np.lexsort((-total, -current))
+        order = order[(current[order] > 0) | (previous[order] > 0)][:limit]
+        
+        scale = VELOCITY_DAYS / window_days
+        velocity = current[order] * scale
+        previous_velocity = previous[order] * scale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change_pct = np.where(previous[order] > 0, (current[order] - previous[order]) / previous[order] * 100, np.nan)
+        
+        return {
+            "as_of": str(np.datetime64(end, "D")),
+            "window_days": window_days,
+            "judges": [
+                {
+                    "judge_id": int(judge_id),
+                    "judge": snapshot.name("judge", judge_id),
+                    "denials": int(current[judge_id]),
+                    "previous_denials": int(previous[judge_id]),
+                    "total": int(total[judge_id]),
+                    "velocity": round(float(velocity[index]), 2),
+                    "previous_velocity": round(float(previous_velocity[index]), 2),
+                    "change": round(float(velocity[index] - previous_velocity[index]), 2),
+                    "change_pct": _rounded(change_pct[index:index + 1])[0],
+                }
+                for index, judge_id in enumerate(order)
+            ],
+        }
+    
+    def monthly_trends(self, dimension="judge", months=12, rolling=3, limit=10, end_month=None, court=None,
+                       motion_type=None):
+        """Monthly denial counts with month-over-month deltas and rolling averages
+        
+        dimension is "judge" or "court" for one series per judge or court (the
+        limit busiest over the period) or "all" for a single series. The period
+        is the months months ending at end_month (YYYY-MM), or at the month of
+        the latest order. Deltas and rolling averages of the first months draw
+        on the months before the period.
+        """
+        if dimension not in ("judge", "court", "all"):
+            raise ValueError(f"Unknown dimension: {dimension}")
+        if not 1 <= months <= 120:
+            raise ValueError("months must be between 1 and 120")
+        if not 1 <= rolling <= 24:
+            raise ValueError("rolling must be between 1 and 24")
+        
+        snapshot = self.snapshot()
+        end = _month_number(end_month, "end_month") if end_month else None
+        last_day = _month_first_day(end + 1) - 1 if end is not None else None
+        rows, mask = self._select(snapshot, court, motion_type, last_day=last_day, dated=True)
+        if dimension != "all":
+            mask &= getattr(snapshot, dimension)[rows] >= 0
+        if not mask.any():
+            return {"dimension": dimension, "months": [], "series": []}
+        
+        month = snapshot.month[rows]
+        if end is None:
+            end = int(month[len(mask) - 1 - np.argmax(mask[::-1])])
+        first = end - months + 1
+        # Months read before the period: one for the first delta, rolling - 1 for the first average
+        lead = max(1, rolling - 1)
+        start = first - lead
+        span = end - start + 1
+        
+        period = slice(int(np.searchsorted(month, start)), int(np.searchsorted(month, end, side="right")))
+        selected = mask[period]
+        offsets = month[period][selected] - start
+        if dimension == "all":
+            entity_ids = np.array([-1])
+            entity_rows = np.zeros(len(offsets), dtype=np.int64)
+        else:
+            # Dimension ids are small and dense, so each id is its own row
+            entity_rows = getattr(snapshot, dimension)[rows][period][selected].astype(np.int64)
+            entity_ids = np.arange(int(getattr(snapshot, dimension).max()) + 1)
+        
+        # Entities by month in one bincount over (entity row, month offset) cells
+        counts = np.bincount(entity_rows * span + offsets, minlength=len(entity_ids) * span).reshape(len(entity_ids), span)
+        top = np.argsort(-counts[:, lead:].sum(axis=1), kind="stable")[:limit]
+        top = top[counts[top, lead:].sum(axis=1) > 0]
+        counts = counts[top]
+        
+        previous = counts[:, lead - 1:-1]
+        delta = counts[:, lead:] - previous
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta_pct = np.where(previous > 0, delta / previous * 100, np.nan)
+        cumulative = np.cumsum(np.pad(counts, ((0, 0), (1, 0))), axis=1)
+        rolling_avg = ((cumulative[:, rolling:] - cumulative[:, :-rolling]) / rolling)[:, -months:]
+        
+        return {
+            "dimension": dimension,
+            "months": np.arange(first, end + 1).astype("datetime64[M]").astype(str).tolist(),
+            "series": [
+                {
+                    "id": None if dimension == "all" else int(entity_ids[row]),
+                    "name": "All" if dimension == "all" else snapshot.name(dimension, entity_ids[row]),
+                    "total": int(counts[index, lead:].sum()),
+                    "counts": counts[index, lead:].tolist(),
+                    "mom_delta": delta[index].tolist(),
+                    "mom_pct": _rounded(delta_pct[index]),
+                    "rolling_avg": _rounded(rolling_avg[index]),
+                }
+                for index, row in enumerate(top)
+            ],
+        }
+    
+    def firm_judge_matrix(self, firms=10, judges=10, court=None, motion_type=None, start_date=None, end_date=None):
+        """Denials involving each of the busiest law firms before each of the busiest judges
+        
+        Returns the top firms (by motions they appeared in) and judges (by
+        motions decided), with counts[i][j] the motions of firm i before judge j.
+        """
+        if not (1 <= firms <= 100 and 1 <= judges <= 100):
+            raise ValueError("firms and judges must be between 1 and 100")
+        
+        snapshot = self.snapshot()
+        rows, mask = self._select(
+            snapshot, court, motion_type,
+            _day_number(start_date, "start_date") if start_date else None,
+            _day_number(end_date, "end_date") if end_date else None
+        )
+        judge = snapshot.judge[rows]
+        mask &= judge >= 0
+        
+        # Pairs are ordered by motion index, so the pairs of the selected rows are a slice too
+        first, last = np.searchsorted(snapshot.firm_motion, [rows.start, rows.stop])
+        pair_rows = snapshot.firm_motion[first:last] - rows.start
+        pairs = mask[pair_rows]
+        pair_firm = snapshot.firm[first:last][pairs]
+        pair_judge = judge[pair_rows[pairs]]
+        if not len(pair_firm):
+            return {"firms": [], "judges": [], "counts": []}
+        
+        firm_totals = np.bincount(pair_firm)
+        judge_totals = np.bincount(judge[mask])
+        top_firms = np.argsort(-firm_totals, kind="stable")[:firms]
+        top_firms = top_firms[firm_totals[top_firms] > 0]
+        top_judges = np.argsort(-judge_totals, kind="stable")[:judges]
+        top_judges = top_judges[judge_totals[top_judges] > 0]
+        
+        # Matrix positions of the chosen firms and judges, -1 for the rest
+        firm_position = np.full(len(firm_totals), -1)
+        firm_position[top_firms] = np.arange(len(top_firms))
+        judge_position = np.full(len(judge_totals), -1)
+        judge_position[top_judges] = np.arange(len(top_judges))
+        rows = firm_position[pair_firm]
+        columns = judge_position[pair_judge]
+        keep = (rows >= 0) & (columns >= 0)
+        counts = np.bincount(
+            rows[keep] * len(top_judges) + columns[keep], minlength=len(top_firms) * len(top_judges)
+        ).reshape(len(top_firms), len(top_judges))
+        
+        return {
+            "firms": [
+                {"id": int(firm_id), "name": snapshot.name("law_firm", firm_id), "total": int(firm_totals[firm_id])}
+                for firm_id in top_firms
+            ],
+            "judges": [
+                {"id": int(judge_id), "name": snapshot.name("judge", judge_id), "total": int(judge_totals[judge_id])}
+                for judge_id in top_judges
+            ],
+            "counts": counts.tolist(),
+        }
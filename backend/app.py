@@ -1,18 +1,36 @@
 import os
+import io
+import atexit
+import logging
+import csv
 import json
+import time
 import datetime
-import requests
-from flask import Flask, request, jsonify
+import functools
+import click
+import metrics
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import openai
-from database import Database
+from database import Database, encode_cursor, decode_cursor, resolve_fields
+from lexmachina import LexMachinaAPI
+from summaries import SummaryEngine
+from tracker import MotionTracker
+from http_cache import ResponseCache
+from documents import DocumentStore
+from view_cache import ViewCache
+from analytics import AnalyticsEngine
+from jobs import JobQueue
+from scheduler import RefreshScheduler, Lease, validate_refresh_settings, MAX_DAYS_BACK
+from backfill import run_backfill, DEFAULT_SHARD_DAYS
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+app.logger.setLevel(logging.INFO)
 
 # Allow all origins with simpler approach
 @app.after_request
@@ -29,282 +47,250 @@ def options_handler(path):
     return app.make_default_options_response()
 
 
+# Request, SQL and outbound call metrics served at /api/metrics (0 disables the instrumentation),
+# and whether a request sending X-Profile: 1 gets its timing breakdown back in a Server-Timing header
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_PROFILING = os.getenv("METRICS_PROFILING", "0") == "1"
+metrics.configure(METRICS_ENABLED)
+
+def start_request_metrics():
+    metrics.begin_request()
+
+def record_request_metrics(response):
+    """Record the request's latency and SQL use under its route pattern, adding Server-Timing if asked"""
+    profile = metrics.end_request()
+    if profile is None:
+        return response
+    
+    elapsed = time.perf_counter() - profile.start
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.HTTP_REQUEST_SECONDS.observe(elapsed, route, request.method, str(response.status_code))
+    metrics.HTTP_REQUEST_SQL_QUERIES.observe(profile.sql_queries, route)
+    metrics.HTTP_REQUEST_SQL_SECONDS.observe(profile.sql_seconds, route)
+    
+    if METRICS_PROFILING and request.headers.get("X-Profile") == "1":
+        response.headers["Server-Timing"] = profile.server_timing(elapsed)
+        response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+# Registered only when enabled, so disabled metrics add nothing to the request path
+if METRICS_ENABLED:
+    app.before_request(start_request_metrics)
+    app.after_request(record_request_metrics)
+
+
 # Initialize database connection
-db = Database()
+db = Database(os.getenv("DATABASE_PATH", "motions.db"))
 
 # Configure API credentials
 LEX_MACHINA_CLIENT_ID = os.getenv("LEX_MACHINA_CLIENT_ID")
 LEX_MACHINA_CLIENT_SECRET = os.getenv("LEX_MACHINA_CLIENT_SECRET")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Parallelism and per-host rate limit for Lex Machina fetches (0 disables the limit)
+LEX_MACHINA_MAX_WORKERS = int(os.getenv("LEX_MACHINA_MAX_WORKERS", "8"))
+LEX_MACHINA_RATE_LIMIT = float(os.getenv("LEX_MACHINA_RATE_LIMIT", "0"))
+
+# Retries of a Lex Machina request after connection errors, timeouts, 429s and 5xx responses
+LEX_MACHINA_MAX_RETRIES = int(os.getenv("LEX_MACHINA_MAX_RETRIES", "4"))
+
+# Disk cache for Lex Machina case details (seconds before revalidation, max cached cases)
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "http_cache.db")
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", str(6 * 3600)))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "20000"))
+
+# Directory of the compressed order document store
+DOCUMENT_STORE_PATH = os.getenv("DOCUMENT_STORE_PATH", "documents")
+
+# Concurrency and token budget for AI summaries (0 disables throttling)
+SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "4"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+
+# Rendered responses kept in memory for the read endpoints (count and total bytes)
+VIEW_CACHE_MAX_ENTRIES = int(os.getenv("VIEW_CACHE_MAX_ENTRIES", "512"))
+VIEW_CACHE_MAX_BYTES = int(os.getenv("VIEW_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Default and maximum page sizes for motion listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Motions written per bulk transaction during a refresh
+REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "50"))
+
+# Seconds without a progress heartbeat before an active background job is considered dead
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "600"))
+
+# Daily refresh scheduler: set to 0 to disable it in this process, and random delay after the configured time
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+SCHEDULER_JITTER = int(os.getenv("SCHEDULER_JITTER", "900"))
+
 # Configure OpenAI
 openai.api_key = OPENAI_API_KEY
 
-class LexMachinaAPI:
-    """Client for the Lex Machina API"""
+# Initialize summary engine, response cache, document store and API client
+summary_engine = SummaryEngine(
+    db,
+    max_workers=SUMMARY_MAX_WORKERS,
+    tokens_per_minute=OPENAI_TOKENS_PER_MINUTE or None
+)
+lex_machina_api = LexMachinaAPI(
+    LEX_MACHINA_CLIENT_ID,
+    LEX_MACHINA_CLIENT_SECRET,
+    max_workers=LEX_MACHINA_MAX_WORKERS,
+    requests_per_second=LEX_MACHINA_RATE_LIMIT or None,
+    max_retries=LEX_MACHINA_MAX_RETRIES,
+    summarizer=summary_engine,
+    response_cache=ResponseCache(HTTP_CACHE_PATH, ttl=HTTP_CACHE_TTL, max_entries=HTTP_CACHE_MAX_ENTRIES),
+    document_store=DocumentStore(DOCUMENT_STORE_PATH)
+)
+motion_tracker = MotionTracker(lex_machina_api, db, batch_size=REFRESH_BATCH_SIZE)
+
+
+def run_refresh_job(params, job):
+    """Background job handler for a refresh, reporting progress after each stored batch
     
-    TOKEN_URL = "https://api.lexmachina.com/oauth2/token"
-    QUERY_URL = "https://api.lexmachina.com/query-district-cases"
-    CASE_DETAIL_URL = "https://api.lexmachina.com/district-cases/{}"
+    The refresh lease keeps refreshes from different worker processes from
+    running at the same time; a job waits for it while another one holds it.
+    """
+    lease = Lease(db, "refresh", ttl=JOB_STALE_AFTER)
+    while not lease.acquire():
+        job.progress({"waiting": "Another refresh is running"})
+        time.sleep(5)
     
-    def __init__(self, client_id, client_secret):
-        self.client_id = client_id
-        self.client_secret = client_secret
-        self.access_token = None
-        self.token_expiry = None
+    def progress(values):
+        if not lease.acquire():
+            raise Exception("Lost the refresh lease to another process")
+        job.progress(values)
     
-    def get_access_token(self):
-        """Get OAuth2 token from Lex Machina API"""
-        # Check if we have a valid token
-        if self.access_token and self.token_expiry and datetime.datetime.now() < self.token_expiry:
-            return self.access_token
-            
-        # Request new token
-        response = requests.post(
-            self.TOKEN_URL,
-            data={"client_id": self.client_id, "client_secret": self.client_secret},
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
+    try:
+        return motion_tracker.refresh(
+            days_back=params["days_back"],
+            incremental=params["incremental"],
+            progress=progress
         )
-        
-        if response.status_code == 200:
-            token_data = response.json()
-            self.access_token = token_data["access_token"]
-            # Set expiry time (typically 1 hour, but subtract 5 minutes to be safe)
-            self.token_expiry = datetime.datetime.now() + datetime.timedelta(seconds=token_data.get("expires_in", 3600) - 300)
-            return self.access_token
-        else:
-            raise Exception(f"Failed to get access token: {response.status_code} - {response.text}")
-    
-    def search_denied_motions(self, motion_type=None, days_back=1):
-        """Search for denied motions to dismiss or summary judgment"""
-        token = self.get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        # Calculate date range
-        end_date = datetime.datetime.now()
-        start_date = end_date - datetime.timedelta(days=days_back)
-        
-        # Determine event types to search for
-        event_types = []
-        if motion_type:
-            if "dismiss" in motion_type.lower():
-                event_types.append("Dismiss (Contested)")
-            elif "summary judgment" in motion_type.lower():
-                event_types.append("Summary Judgment (Contested)")
-        else:
-            event_types = ["Dismiss (Contested)", "Summary Judgment (Contested)"]
-        
-        # Build query payload
-        payload = {
-            "caseStatus": "Open",
-            "events": {
-                "includeEventTypes": event_types,
-                "date": {
-                    "onOrAfter": start_date.strftime("%Y-%m-%d"),
-                    "onOrBefore": end_date.strftime("%Y-%m-%d")
-                },
-                "includeEventOutcomes": ["Denied"]
-            },
-            "page": 1,
-            "pageSize": 100
-        }
-        
-        # Execute the query
-        response = requests.post(self.QUERY_URL, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            results = response.json()
-            case_refs = results.get("cases", [])
-            
-            denied_motions = []
-            for case_ref in case_refs:
-                case_id = case_ref.get("districtCaseId")
-                if not case_id:
-                    continue
-                    
-                # Get detailed case information
-                case_details = self.get_case_details(case_id)
-                processed_case = self._process_case(case_details, motion_type)
-                
-                if processed_case:
-                    denied_motions.append(processed_case)
-            
-            return denied_motions
-        else:
-            raise Exception(f"API request failed with status {response.status_code}: {response.text}")
-    
-    def get_case_details(self, case_id):
-        """Get detailed case information"""
-        token = self.get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        response = requests.get(self.CASE_DETAIL_URL.format(case_id), headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"Failed to get case details: {response.status_code} - {response.text}")
-    
-    def _process_case(self, case, motion_type=None):
-        """Process a case to extract relevant information"""
-        # Extract case name
-        case_name = case.get("caseName", "Unknown Case")
-        
-        # Extract court information
-        court = case.get("court", {}).get("name", "Unknown Court")
-        
-        # Extract judge information
-        judge = case.get("judge", {}).get("name", "Unknown Judge")
-        
-        # Extract docket number
-        docket_number = case.get("docketNumber", "Unknown Docket")
-        
-        # Extract parties and their representation
-        parties = []
-        for party in case.get("parties", []):
-            party_name = party.get("name", "Unknown Party")
-            party_role = party.get("role", "Unknown Role")
-            
-            attorneys = []
-            # Find law firm representations for this party
-            for rep in case.get("lawFirmRepresentations", []):
-                if rep.get("side") == party_role:
-                    firm = rep.get("lawFirm", {}).get("name", "Unknown Firm")
-                    
-                    for attorney in rep.get("attorneys", []):
-                        attorney_name = attorney.get("name", "Unknown Attorney")
-                        attorneys.append({
-                            "name": attorney_name,
-                            "firm": firm
-                        })
-            
-            parties.append({
-                "type": party_role,
-                "name": party_name,
-                "attorneys": attorneys
-            })
-        
-        # Find the relevant motion and order information
-        order_info = None
-        order_text = None
-        
-        # Look for denied motions in events
-        for event in case.get("events", []):
-            event_type = event.get("type", "")
-            event_outcome = event.get("outcome", "")
-            
-            is_relevant_motion = False
-            determined_motion_type = ""
-            
-            if "Dismiss" in event_type and "Contested" in event_type and "Denied" in event_outcome:
-                is_relevant_motion = True
-                determined_motion_type = "motion to dismiss denied"
-            elif "Summary Judgment" in event_type and "Contested" in event_type and "Denied" in event_outcome:
-                is_relevant_motion = True
-                determined_motion_type = "motion for summary judgment denied"
-            
-            # If we have a specific motion type filter, check it
-            if motion_type and determined_motion_type != motion_type:
-                continue
-                
-            if is_relevant_motion:
-                event_date = event.get("date")
-                event_description = f"{event_type} - {event_outcome}"
-                document_id = event.get("documentId")
-                
-                # Get the order text if we have a document ID
-                if document_id:
-                    # In a real implementation, we would fetch the document text
-                    # This would require an additional API call to get document content
-                    # For now, we'll use a placeholder
-                    order_text = f"Order denying {determined_motion_type}. Document ID: {document_id}"
-                
-                order_info = {
-                    "date": event_date,
-                    "description": event_description,
-                    "document_number": document_id
-                }
-                
-                # Stop after finding the first relevant motion
-                break
-        
-        if not order_info:
-            return None
-        
-        # Generate AI summary of the order
-        summary = self._generate_summary(order_text or f"Order denying motion in case {case_name}")
-        
-        return {
-            "case_name": case_name,
-            "judge": judge,
-            "court": court,
-            "docket_number": docket_number,
-            "parties": parties,
-            "motion_type": motion_type or "order denial",
-            "order_info": order_info,
-            "summary": summary
-        }
-    
-    def _generate_summary(self, order_text):
-        """Generate an AI summary of the court order"""
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a helpful legal assistant. Summarize the following court order denying a motion to dismiss or motion for summary judgment. Focus on the key legal reasoning and grounds for denial."},
-                    {"role": "user", "content": order_text[:15000]}  # Limit to 15000 chars to stay within token limits
-                ],
-                max_tokens=500,
-                temperature=0.3
-            )
-            return response.choices[0].message["content"]
-        except Exception as e:
-            return f"Error generating summary: {str(e)}"
-
+    finally:
+        lease.release()
 
-# Initialize API client
-lex_machina_api = LexMachinaAPI(LEX_MACHINA_CLIENT_ID, LEX_MACHINA_CLIENT_SECRET)
-motion_tracker = MotionTracker(lex_machina_api)
-
-class MotionTracker:
-    """Process and track motions from court dockets"""
-    
-    def __init__(self, api_client):
-        self.api_client = api_client
-    
-    def find_denied_motions(self, days_back=1):
-        """Find denied motions to dismiss or summary judgment"""
-        # Get denied motions from API client
-        return self.api_client.search_denied_motions(days_back=days_back)
+# Background jobs run one at a time so refreshes never overlap
+job_queue = JobQueue(db, max_workers=1, stale_after=JOB_STALE_AFTER)
+job_queue.register("refresh", run_refresh_job)
 
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh_motions():
     """Endpoint to manually trigger refresh of denied motions"""
     days_back = request.json.get('days_back', 1)
+    incremental = request.json.get('incremental', True)
+    
+    if isinstance(days_back, bool) or not isinstance(days_back, int) or not 1 <= days_back <= MAX_DAYS_BACK:
+        return jsonify({"success": False, "error": f"days_back must be an integer between 1 and {MAX_DAYS_BACK}"}), 400
     
     try:
-        # Find denied motions
-        denied_motions = motion_tracker.find_denied_motions(days_back=days_back)
-        
-        # Store in database
-        for motion in denied_motions:
-            db.insert_motion(motion)
-        
-        return jsonify({"success": True, "motions_found": len(denied_motions)})
+        # Queue the refresh and return at once; an identical refresh already in flight is reused
+        job_id, created = job_queue.submit("refresh", {"days_back": days_back, "incremental": incremental})
+        return jsonify({"success": True, "job_id": job_id, "coalesced": not created})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """List the most recent background jobs"""
+    limit = request.args.get('limit', 20, type=int)
+    
+    try:
+        jobs = db.get_jobs(limit=min(limit, 100))
+        return jsonify({"success": True, "jobs": jobs})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a background job's status, progress and result"""
+    try:
+        job = db.get_job(job_id)
+        if not job:
+            return jsonify({"success": False, "error": "Job not found"})
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Request cancellation of a queued or running background job"""
+    try:
+        if not job_queue.cancel(job_id):
+            return jsonify({"success": False, "error": "Job is not active"})
+        return jsonify({"success": True, "job": db.get_job(job_id)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+view_cache = ViewCache(max_entries=VIEW_CACHE_MAX_ENTRIES, max_bytes=VIEW_CACHE_MAX_BYTES)
+
+def cached_view(view=None, dated=False):
+    """Serve a read endpoint from the view cache until the next write, with ETag revalidation
+    
+    Entries are keyed by path and normalized query string, plus today's date
+    for dated views whose default ranges end today. Only successful
+    responses are cached. Clients get an ETag and Cache-Control: no-cache, so
+    browsers revalidate and receive 304 Not Modified while the data is unchanged.
+    """
+    if view is None:
+        return functools.partial(cached_view, dated=dated)
+    
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            generation = db.get_generation()
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)})
+        
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        if dated:
+            key += (datetime.date.today().isoformat(),)
+        cached = view_cache.get(key, generation)
+        if cached:
+            body, etag = cached
+        else:
+            response = view(*args, **kwargs)
+            if not response.get_json().get("success"):
+                return response
+            body, etag = view_cache.put(key, generation, response.get_data())
+        
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+    
+    return wrapper
+
+def page_args():
+    """Read limit, offset, cursor and field projection arguments from the query string"""
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    token = request.args.get('cursor')
+    after = decode_cursor(token) if token else None
+    fields = resolve_fields(request.args.get('view', 'detail'), request.args.get('fields'))
+    return limit, offset, after, fields
+
+def page_response(motions, limit):
+    """Build a listing response from limit + 1 rows, with a continuation token if more remain"""
+    next_cursor = encode_cursor(motions[limit - 1]) if len(motions) > limit else None
+    motions = motions[:limit]
+    return jsonify({"success": True, "motions": motions, "next_cursor": next_cursor})
+
 @app.route('/api/motions', methods=['GET'])
+@cached_view
 def get_motions():
     """Get all tracked motions"""
     try:
-        motions = db.get_motions()
-        return jsonify({"success": True, "motions": motions})
+        limit, offset, after, fields = page_args()
+        motions = db.get_motions(limit=limit + 1, offset=offset, after=after, fields=fields)
+        return page_response(motions, limit)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
 @app.route('/api/motions/filter', methods=['GET'])
+@cached_view
 def filter_motions():
     """Filter motions by various criteria"""
     court = request.args.get('court')
@@ -314,40 +300,288 @@ def filter_motions():
     end_date = request.args.get('end_date')
     
     try:
-        motions = db.filter_motions(court, judge, motion_type, start_date, end_date)
-        return jsonify({"success": True, "motions": motions})
+        limit, offset, after, fields = page_args()
+        motions = db.filter_motions(court, judge, motion_type, start_date, end_date,
+                                    limit=limit + 1, offset=offset, after=after, fields=fields)
+        return page_response(motions, limit)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/motions/export', methods=['GET'])
+def export_motions():
+    """Stream every motion matching the filter_motions criteria as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    
+    try:
+        if export_format not in ('ndjson', 'csv'):
+            raise ValueError(f"Unknown export format: {export_format}")
+        fields = resolve_fields(request.args.get('view', 'export'), request.args.get('fields'))
+        motions = db.iter_motions(
+            court=request.args.get('court'),
+            judge=request.args.get('judge'),
+            motion_type=request.args.get('motion_type'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            fields=fields
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+    
+    if export_format == 'csv':
+        body, mimetype = export_csv(motions, fields), 'text/csv'
+    else:
+        body, mimetype = export_ndjson(motions), 'application/x-ndjson'
+    
+    filename = f"motions-{datetime.date.today().isoformat()}.{export_format}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+def export_ndjson(motions, batch_size=500):
+    """Encode motions as newline-delimited JSON, yielding a chunk per batch of rows"""
+    lines = []
+    for motion in motions:
+        lines.append(json.dumps(motion) + "\n")
+        if len(lines) >= batch_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+def export_csv(motions, fields, batch_size=500):
+    """Encode motions as CSV with a header row, yielding a chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    
+    for count, motion in enumerate(motions, 1):
+        if "parties" in motion:
+            # One cell per motion: "Plaintiff: Name; Defendant: Name"
+            motion["parties"] = "; ".join(f"{party['party_type']}: {party['party_name']}" for party in motion["parties"])
+        writer.writerow(motion)
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@app.route('/api/motions/<int:motion_id>', methods=['GET'])
+def get_motion(motion_id):
+    """Get a single motion with its parties and full source data"""
+    try:
+        motion = db.get_motion(motion_id)
+        if not motion:
+            return jsonify({"success": False, "error": "Motion not found"})
+        return jsonify({"success": True, "motion": motion})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/motions/search', methods=['GET'])
+def search_motions():
+    """Full-text search over motions, ranked by relevance"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    
+    try:
+        results = db.search_motions(query, limit=min(limit, 100), offset=offset)
+        return jsonify({"success": True, "results": results})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
 @app.route('/api/stats', methods=['GET'])
+@cached_view(dated=True)
 def get_stats():
     """Get statistics about denied motions"""
     try:
-        stats = {
-            "total_motions": db.count_motions(),
-            "by_court": db.count_motions_by_court(),
-            "by_judge": db.count_motions_by_judge(),
-            "by_motion_type": db.count_motions_by_type(),
-            "recent_trend": db.get_motion_trend()
-        }
+        stats = db.get_stats()
         return jsonify({"success": True, "stats": stats})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
-def scheduled_refresh():
+@app.route('/api/law-firms', methods=['GET'])
+def get_law_firms():
+    """Get the most active law firms"""
+    limit = request.args.get('limit', 50, type=int)
+    
+    try:
+        firms = db.get_law_firms(limit=limit)
+        return jsonify({"success": True, "firms": firms})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/stats/trend', methods=['GET'])
+def get_trend():
+    """Get motion counts bucketed by day, week or month over a date window"""
+    days = request.args.get('days', 30, type=int)
+    bucket = request.args.get('bucket', 'day')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    try:
+        trend = db.get_motion_trend(days=days, bucket=bucket, start_date=start_date, end_date=end_date)
+        return jsonify({"success": True, "trend": trend})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+analytics_engine = AnalyticsEngine(db)
+
+@app.route('/api/analytics/judges', methods=['GET'])
+@cached_view
+def get_judge_velocity():
+    """Get each judge's denials per 30 days over a trailing window, compared with the window before"""
+    try:
+        velocity = analytics_engine.judge_velocity(
+            window_days=request.args.get('window_days', 90, type=int),
+            as_of=request.args.get('as_of'),
+            court=request.args.get('court'),
+            motion_type=request.args.get('motion_type'),
+            limit=max(1, min(request.args.get('limit', 20, type=int), 500))
+        )
+        return jsonify({"success": True, **velocity})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/analytics/trends', methods=['GET'])
+@cached_view
+def get_monthly_trends():
+    """Get monthly denial counts per judge, per court or overall, with month-over-month deltas and rolling averages"""
+    try:
+        trends = analytics_engine.monthly_trends(
+            dimension=request.args.get('dimension', 'judge'),
+            months=request.args.get('months', 12, type=int),
+            rolling=request.args.get('rolling', 3, type=int),
+            limit=max(1, min(request.args.get('limit', 10, type=int), 100)),
+            end_month=request.args.get('end_month'),
+            court=request.args.get('court'),
+            motion_type=request.args.get('motion_type')
+        )
+        return jsonify({"success": True, **trends})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/analytics/firm-judge', methods=['GET'])
+@cached_view
+def get_firm_judge_matrix():
+    """Get denial counts for the busiest law firms before the busiest judges"""
+    try:
+        matrix = analytics_engine.firm_judge_matrix(
+            firms=request.args.get('firms', 10, type=int),
+            judges=request.args.get('judges', 10, type=int),
+            court=request.args.get('court'),
+            motion_type=request.args.get('motion_type'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+        return jsonify({"success": True, **matrix})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+def scheduled_refresh(days_back=1):
     """Function to be called by scheduler for daily refresh"""
-    denied_motions = motion_tracker.find_denied_motions(days_back=1)
-    for motion in denied_motions:
-        db.insert_motion(motion)
-    print(f"Daily refresh completed: {len(denied_motions)} new motions found")
+    job_id, created = job_queue.submit("refresh", {"days_back": days_back, "incremental": True})
+    app.logger.info("Daily refresh queued as job %s%s", job_id, "" if created else " (already running)")
+    return job_id
 
-if __name__ == '__main__':
-    # You would typically set up a scheduler here for daily refresh
-    # For example, using APScheduler:
-    # 
-    # from apscheduler.schedulers.background import BackgroundScheduler
-    # scheduler = BackgroundScheduler()
-    # scheduler.add_job(scheduled_refresh, 'cron', hour=1)  # Run at 1 AM every day
-    # scheduler.start()
+# Every web server worker runs the scheduler; the schedules table ensures each run is submitted once
+refresh_scheduler = RefreshScheduler(db, scheduled_refresh, jitter_seconds=SCHEDULER_JITTER)
+
+def start_scheduler():
+    """Start the refresh scheduler in a web server process, stopping it when the process exits
+    
+    Called by `python app.py` and by gunicorn.conf.py in each worker, so CLI
+    commands and scripts that import the app never schedule refreshes.
+    """
+    if SCHEDULER_ENABLED:
+        refresh_scheduler.start()
+        atexit.register(refresh_scheduler.shutdown)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Metrics for this process in the Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route('/api/settings/refresh', methods=['GET'])
+def get_refresh_settings():
+    """Get the automatic refresh settings and the next scheduled run"""
+    try:
+        next_run = refresh_scheduler.next_run()
+        return jsonify({
+            "success": True,
+            "settings": refresh_scheduler.settings(),
+            "next_run": next_run.isoformat() if next_run else None,
+            "last_run": db.get_schedule(RefreshScheduler.SCHEDULE_NAME)
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/settings/refresh', methods=['POST'])
+def update_refresh_settings():
+    """Update the automatic refresh settings"""
+    try:
+        settings = validate_refresh_settings(request.json or {})
+        db.set_setting("refresh", settings)
+        next_run = refresh_scheduler.next_run()
+        return jsonify({"success": True, "settings": settings, "next_run": next_run.isoformat() if next_run else None})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the stats rollup tables from the raw motion rows"""
+    db.rebuild_rollups()
+    print(f"Rollups rebuilt: {db.count_motions()} motions")
+
+@app.cli.command('add-alias')
+@click.argument('dimension', type=click.Choice(['judge', 'court', 'law_firm']))
+@click.argument('alias')
+@click.argument('canonical')
+def add_alias_command(dimension, alias, canonical):
+    """Record ALIAS as another spelling of CANONICAL, merging motions stored under it"""
+    db.add_name_alias(dimension, alias, canonical)
+    print(f"{dimension} alias added: {alias!r} -> {canonical!r}")
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Recompute the full-text search index from the stored motions"""
+    db.rebuild_search_index()
+    print(f"Search index rebuilt: {db.count_motions()} motions")
+
+@app.cli.command('backfill')
+@click.argument('start_date', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.argument('end_date', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.option('--shard-days', default=DEFAULT_SHARD_DAYS, show_default=True, help='Days of motions fetched per shard')
+@click.option('--processes', default=4, show_default=True, help='Worker processes fetching shards in parallel')
+def backfill_command(start_date, end_date, shard_days, processes):
+    """Load denied motions from START_DATE to END_DATE (YYYY-MM-DD), resuming an interrupted run over the same range and shard size"""
+    if end_date < start_date:
+        raise click.BadParameter("END_DATE is before START_DATE")
     
+    # The rate limit and token budget are shared out between the worker processes
+    config = {
+        "client_id": LEX_MACHINA_CLIENT_ID,
+        "client_secret": LEX_MACHINA_CLIENT_SECRET,
+        "openai_api_key": OPENAI_API_KEY,
+        "database_path": db.db_path,
+        "document_store_path": DOCUMENT_STORE_PATH,
+        "max_workers": LEX_MACHINA_MAX_WORKERS,
+        "requests_per_second": LEX_MACHINA_RATE_LIMIT / processes or None,
+        "max_retries": LEX_MACHINA_MAX_RETRIES,
+        "summary_max_workers": SUMMARY_MAX_WORKERS,
+        "tokens_per_minute": OPENAI_TOKENS_PER_MINUTE // processes or None,
+    }
+    stats = run_backfill(
+        db, config, start_date.date(), end_date.date(),
+        shard_days=max(1, shard_days),
+        processes=max(1, processes),
+        batch_size=REFRESH_BATCH_SIZE
+    )
+    print(
+        f"Backfill finished: {stats['done']} shards done, {stats['failed']} failed, "
+        f"{stats['skipped']} already done, {stats['motions']} motions stored"
+    )
+    if stats["done"] + stats["skipped"] < stats["shards"]:
+        print("Run the same command again to retry the unfinished shards")
+
+if __name__ == '__main__':
+    start_scheduler()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,174 @@
+import queue
+import datetime
+import multiprocessing
+import openai
+from database import Database
+from lexmachina import LexMachinaAPI
+from summaries import SummaryEngine
+from documents import DocumentStore
+
+# Days of motions covered by each backfill shard
+DEFAULT_SHARD_DAYS = 30
+
+# Seconds the writer waits for results before checking whether any worker is still alive
+RESULT_POLL_SECONDS = 5
+
+
+def make_shards(start_date, end_date, shard_days=DEFAULT_SHARD_DAYS):
+    """Split an inclusive date range into consecutive (start, end) ISO date pairs of shard_days each"""
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        shard_end = min(end_date, shard_start + datetime.timedelta(days=shard_days - 1))
+        shards.append((shard_start.isoformat(), shard_end.isoformat()))
+        shard_start = shard_end + datetime.timedelta(days=1)
+    return shards
+
+
+class SummaryCacheRelay:
+    """Summary cache for backfill workers: reads the database, but sends new summaries to the writer"""
+    
+    def __init__(self, db, results):
+        self.db = db
+        self.results = results
+    
+    def get_cached_summary(self, cache_key):
+        return self.db.get_cached_summary(cache_key)
+    
+    def store_cached_summary(self, cache_key, prompt_version, model, summary):
+        self.results.put(("summary", None, (cache_key, prompt_version, model, summary)))
+
+
+def _worker(config, batch_size, tasks, results):
+    """Worker process: fetch each shard taken from tasks, sending its motions to the writer in batches
+    
+    Workers open the motions database read-only; motions and summaries are
+    written by the parent through the results queue. Downloaded order
+    documents go straight into the shared document store, whose blobs are
+    content-addressed and renamed into place, and whose index takes
+    concurrent writers.
+    """
+    openai.api_key = config["openai_api_key"]
+    summarizer = SummaryEngine(
+        SummaryCacheRelay(Database(config["database_path"], read_only=True), results),
+        max_workers=config["summary_max_workers"],
+        tokens_per_minute=config["tokens_per_minute"]
+    )
+    api = LexMachinaAPI(
+        config["client_id"],
+        config["client_secret"],
+        max_workers=config["max_workers"],
+        requests_per_second=config["requests_per_second"],
+        max_retries=config["max_retries"],
+        summarizer=summarizer,
+        document_store=DocumentStore(config["document_store_path"])
+    )
+    
+    while True:
+        shard = tasks.get()
+        if shard is None:
+            return
+        
+        try:
+            found = 0
+            batch = []
+            motions = api.search_denied_motions(
+                start_date=datetime.datetime.fromisoformat(shard[0]),
+                end_date=datetime.datetime.fromisoformat(shard[1])
+            )
+            for motion in motions:
+                batch.append(motion)
+                if len(batch) >= batch_size:
+                    results.put(("motions", shard, batch))
+                    found += len(batch)
+                    batch = []
+            if batch:
+                results.put(("motions", shard, batch))
+                found += len(batch)
+            results.put(("done", shard, found))
+        except Exception as e:
+            results.put(("failed", shard, str(e)))
+
+
+def run_backfill(db, config, start_date, end_date, shard_days=DEFAULT_SHARD_DAYS, processes=4, batch_size=50,
+                 log=print):
+    """Load denied motions between two dates across worker processes, returning run statistics
+    
+    The range is split into shards of shard_days, recorded in backfill_shards.
+    Shards completed by an earlier run are skipped, so rerunning the same range
+    resumes an interrupted or partly failed backfill. Worker processes fetch and
+    summarize shards, and this process is the only one writing to the motions
+    database, writing each batch in one transaction as it arrives. A shard is marked done after
+    its last batch is stored; one cut short is fetched again on the next run.
+    
+    config holds the Lex Machina and OpenAI credentials and per-process limits
+    the workers build their clients from.
+    """
+    shards = make_shards(start_date, end_date, shard_days)
+    db.add_backfill_shards(shards)
+    completed = {
+        (shard["shard_start"], shard["shard_end"])
+        for shard in db.get_backfill_shards(shards[0][0], shards[-1][1])
+        if shard["status"] == "done"
+    } if shards else set()
+    pending = [shard for shard in shards if shard not in completed]
+    stats = {"shards": len(shards), "skipped": len(shards) - len(pending), "done": 0, "failed": 0, "motions": 0}
+    if not pending:
+        return stats
+    
+    context = multiprocessing.get_context("spawn")
+    tasks = context.Queue()
+    # Bounded, so workers wait for the writer instead of piling up fetched motions
+    results = context.Queue(maxsize=processes * 4)
+    for shard in pending:
+        tasks.put(shard)
+    
+    workers = [
+        context.Process(target=_worker, args=(config, batch_size, tasks, results), daemon=True)
+        for _ in range(min(processes, len(pending)))
+    ]
+    for worker in workers:
+        tasks.put(None)
+        worker.start()
+    
+    remaining = set(pending)
+    summaries = []
+    try:
+        while remaining:
+            try:
+                kind, shard, payload = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                # Shards held by a worker that died stay pending for the next run
+                if not any(worker.is_alive() for worker in workers):
+                    log(f"All workers exited with {len(remaining)} shards unfinished")
+                    break
+                continue
+            
+            if kind == "summary":
+                summaries.append(payload)
+            elif kind == "motions":
+                # Store the summaries received so far first, so the cache covers every stored motion
+                if summaries:
+                    db.store_cached_summaries(summaries)
+                    summaries = []
+                db.insert_motions(payload)
+                stats["motions"] += len(payload)
+            elif kind == "done":
+                db.finish_backfill_shard(shard, "done", motions=payload)
+                remaining.discard(shard)
+                stats["done"] += 1
+                log(f"Shard {shard[0]}..{shard[1]}: {payload} motions ({len(remaining)} shards left)")
+            elif kind == "failed":
+                db.finish_backfill_shard(shard, "failed", error=payload)
+                remaining.discard(shard)
+                stats["failed"] += 1
+                log(f"Shard {shard[0]}..{shard[1]} failed: {payload}")
+    finally:
+        if summaries:
+            db.store_cached_summaries(summaries)
+        for worker in workers:
+            if remaining:
+                worker.terminate()
+            worker.join()
+    
+    return stats
@@ -0,0 +1,87 @@
+"""Time the NumPy analytics engine against a per-judge SQL equivalent.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analytics --sizes 100000 1000000
+
+Reports the snapshot load (paid once per write), each aggregate on a warm
+snapshot, and judge velocity computed with two COUNT queries per judge.
+"""
+import os
+import time
+import argparse
+import tempfile
+from benchmarks.corpus import seed_corpus
+from analytics import AnalyticsEngine
+
+
+def sql_judge_velocity(db, as_of, window_days):
+    """Judge velocity the row-store way: a pair of COUNT queries for every judge"""
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM judges")
+        judge_ids = [row["id"] for row in cursor.fetchall()]
+        results = []
+        for judge_id in judge_ids:
+            counts = []
+            for offset in (0, window_days):
+                cursor.execute(
+                    '''
+                    SELECT COUNT(*) AS count FROM motions
+                    WHERE judge_id = ? AND order_date > date(?, ?) AND order_date <= date(?, ?)
+                    ''',
+                    (judge_id, as_of, f"-{offset + window_days} days", as_of, f"-{offset} days")
+                )
+                counts.append(cursor.fetchone()["count"])
+            results.append((judge_id, *counts))
+        return results
+
+
+def timed(fn, repeat):
+    """Best wall time of fn over repeat runs, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--window-days", type=int, default=90)
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = seed_corpus(os.path.join(tmp, "bench.db"), size)
+            engine = AnalyticsEngine(db)
+            
+            start = time.perf_counter()
+            engine.snapshot()
+            load_time = (time.perf_counter() - start) * 1000
+            
+            as_of = engine.judge_velocity(window_days=args.window_days)["as_of"]
+            timings = [
+                ("judge velocity", lambda: engine.judge_velocity(window_days=args.window_days)),
+                ("judge velocity, filtered", lambda: engine.judge_velocity(window_days=args.window_days, motion_type="dismiss")),
+                ("monthly trends by judge", lambda: engine.monthly_trends("judge", months=12, rolling=3)),
+                ("monthly trends by court", lambda: engine.monthly_trends("court", months=24, rolling=6)),
+                ("firm x judge matrix", lambda: engine.firm_judge_matrix(firms=25, judges=25)),
+            ]
+            results = [(name, timed(fn, args.repeat)) for name, fn in timings]
+            sql_time = timed(lambda: sql_judge_velocity(db, as_of, args.window_days), 1)
+            db.pool.close()
+        
+        print(f"{size} motions:")
+        print(f"  snapshot load:              {load_time:9.1f} ms")
+        for name, elapsed in results:
+            print(f"  {name + ':':27s} {elapsed:9.1f} ms")
+        print(f"  judge velocity, SQL/judge:  {sql_time:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure dashboard read throughput while a bulk refresh is writing.
+
+Compares the rollback journal with WAL. Run from the backend directory:
+
+    python -m benchmarks.bench_concurrency --motions 20000 --writes 2000 --readers 4
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from database import Database
+from benchmarks.corpus import seed_corpus
+from benchmarks.mock_lexmachina import mock_case
+
+
+def writer(db, count, done):
+    """Insert motions one at a time, the way a refresh does"""
+    for case_id in range(1, count + 1):
+        case = mock_case(case_id)
+        db.insert_motion({
+            "case_name": case["caseName"],
+            "judge": case["judge"]["name"],
+            "court": case["court"]["name"],
+            "docket_number": case["docketNumber"],
+            "motion_type": "motion to dismiss denied",
+            "order_info": {"date": "2024-06-01", "description": "Denied", "document_number": f"bench-{case_id}"},
+            "parties": [{"type": "Plaintiff", "name": "P", "attorneys": [{"name": "A", "firm": "Firm"}]}],
+            "summary": "Summary"
+        })
+    done.set()
+
+
+def reader(db, done, counts, errors):
+    """Alternate the two dashboard requests until the writer finishes"""
+    while not done.is_set():
+        try:
+            db.get_stats()
+            db.get_motions(limit=5)
+            counts.append(1)
+        except Exception:
+            errors.append(1)
+
+
+def run(journal_mode, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_corpus(path, args.motions).close()
+        db = Database(path, journal_mode=journal_mode)
+        
+        done = threading.Event()
+        counts, errors = [], []
+        readers = [threading.Thread(target=reader, args=(db, done, counts, errors)) for _ in range(args.readers)]
+        start = time.perf_counter()
+        for thread in readers:
+            thread.start()
+        writer(db, args.writes, done)
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        db.close()
+    
+    print(f"{journal_mode:8} writes: {args.writes / elapsed:7.0f}/s  "
+          f"reads: {len(counts) / elapsed:7.0f}/s  read errors: {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--motions", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    
+    for journal_mode in ("DELETE", "WAL"):
+        run(journal_mode, args)
+
+
+if __name__ == "__main__":
+    main()
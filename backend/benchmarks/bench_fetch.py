@@ -0,0 +1,52 @@
+"""Compare serial and concurrent case fetching against a local mock Lex Machina server.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_fetch --cases 200 --latency 0.05 --workers 16
+
+Pass --documents to also download each order document into a temporary document store.
+"""
+import time
+import argparse
+import tempfile
+from summaries import SummaryEngine
+from documents import DocumentStore
+from benchmarks.mock_lexmachina import MockLexMachinaServer
+from benchmarks.stub_openai import StubCompletion
+
+
+def run(client, days_back):
+    start = time.perf_counter()
+    count = sum(1 for _ in client.search_denied_motions(days_back=days_back))
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API latency per request in seconds")
+    parser.add_argument("--summary-latency", type=float, default=0.2, help="Stubbed LLM latency per summary in seconds")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--documents", action="store_true", help="Fetch order documents into a document store")
+    args = parser.parse_args()
+    
+    def client(max_workers):
+        # Each run gets an empty store so both download every document
+        store = DocumentStore(tempfile.mkdtemp(prefix="documents-")) if args.documents else None
+        summarizer = SummaryEngine(completion_fn=StubCompletion(latency=args.summary_latency), max_workers=max_workers)
+        return server.make_api(max_workers=max_workers, summarizer=summarizer, document_store=store)
+    
+    server = MockLexMachinaServer(case_count=args.cases, latency=args.latency).start()
+    try:
+        serial_count, serial_time = run(client(1), 1)
+        concurrent_count, concurrent_time = run(client(args.workers), 1)
+    finally:
+        server.stop()
+    
+    print(f"serial:     {serial_count} motions in {serial_time:.2f}s")
+    print(f"concurrent: {concurrent_count} motions in {concurrent_time:.2f}s ({args.workers} workers)")
+    print(f"speedup:    {serial_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare per-row (N+1) and batched party/attorney hydration for motion listings.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_hydration --sizes 10000 100000 --page-size 100
+"""
+import os
+import time
+import argparse
+import tempfile
+from contextlib import contextmanager
+from benchmarks.corpus import seed_corpus
+
+
+class QueryCounter:
+    """Counts statements executed on connections it is attached to"""
+    
+    def __init__(self):
+        self.count = 0
+    
+    def __call__(self, statement):
+        self.count += 1
+
+
+def instrument(db, counter):
+    """Route every connection the database opens through the query counter"""
+    original = db._get_connection
+    
+    @contextmanager
+    def counted_connection():
+        with original() as conn:
+            conn.set_trace_callback(counter)
+            yield conn
+    
+    db._get_connection = counted_connection
+
+
+def legacy_get_motions(db, limit, offset):
+    """The original per-row hydration, kept for comparison"""
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM motions ORDER BY order_date DESC LIMIT ? OFFSET ?", (limit, offset))
+        motions = []
+        for row in cursor.fetchall():
+            motion = dict(row)
+            cursor.execute("SELECT * FROM parties WHERE motion_id = ?", (row["id"],))
+            parties = []
+            for party_row in cursor.fetchall():
+                party = dict(party_row)
+                cursor.execute("SELECT * FROM attorneys WHERE party_id = ?", (party["id"],))
+                party["attorneys"] = [dict(attorney_row) for attorney_row in cursor.fetchall()]
+                parties.append(party)
+            motion["parties"] = parties
+            motions.append(motion)
+        return motions
+
+
+def measure(fn, counter):
+    counter.count = 0
+    start = time.perf_counter()
+    result = fn()
+    return len(result), counter.count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = seed_corpus(os.path.join(tmp, "bench.db"), size)
+            counter = QueryCounter()
+            instrument(db, counter)
+            
+            rows, legacy_queries, legacy_time = measure(lambda: legacy_get_motions(db, args.page_size, 0), counter)
+            rows, batched_queries, batched_time = measure(lambda: db.get_motions(args.page_size, 0), counter)
+        
+        print(f"{size} motions, page of {rows}:")
+        print(f"  per-row: {legacy_queries:5d} queries in {legacy_time * 1000:9.1f} ms")
+        print(f"  batched: {batched_queries:5d} queries in {batched_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
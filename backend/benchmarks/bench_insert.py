@@ -0,0 +1,68 @@
+"""Compare per-motion inserts with the bulk upsert path.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_insert --motions 5000
+"""
+import os
+import time
+import argparse
+import tempfile
+from database import Database
+from benchmarks.mock_lexmachina import mock_case
+
+
+def make_motion(case_id):
+    """Shape a mock case the way LexMachinaAPI._process_case does"""
+    case = mock_case(case_id)
+    firms = {rep["side"]: rep for rep in case["lawFirmRepresentations"]}
+    return {
+        "case_name": case["caseName"],
+        "judge": case["judge"]["name"],
+        "court": case["court"]["name"],
+        "docket_number": case["docketNumber"],
+        "motion_type": "order denial",
+        "order_info": {"date": "2024-06-01", "description": "Dismiss (Contested) - Denied", "document_number": f"doc-{case_id}"},
+        "parties": [
+            {
+                "type": party["role"],
+                "name": party["name"],
+                "attorneys": [
+                    {"name": attorney["name"], "firm": firms[party["role"]]["lawFirm"]["name"]}
+                    for attorney in firms[party["role"]]["attorneys"]
+                ]
+            }
+            for party in case["parties"]
+        ],
+        "summary": "Summary"
+    }
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:32} {count / elapsed:9.0f} motions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--motions", type=int, default=5000)
+    args = parser.parse_args()
+    
+    motions = [make_motion(case_id) for case_id in range(1, args.motions + 1)]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "single.db"))
+        timed("insert_motion loop (new)", len(motions), lambda: [db.insert_motion(m) for m in motions])
+        timed("insert_motion loop (update)", len(motions), lambda: [db.insert_motion(m) for m in motions])
+        db.close()
+        
+        db = Database(os.path.join(tmp, "bulk.db"))
+        timed("insert_motions bulk (new)", len(motions), lambda: db.insert_motions(motions))
+        timed("insert_motions bulk (unchanged)", len(motions), lambda: db.insert_motions(motions))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
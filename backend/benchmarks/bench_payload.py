@@ -0,0 +1,59 @@
+"""Measure listing payload size and serialization time for each field projection.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_payload --motions 5000 --limit 100
+"""
+import os
+import time
+import argparse
+import tempfile
+from benchmarks.corpus import seed_corpus
+
+
+def measure(client, url, repeat=20):
+    """Average response time and body size of a GET request"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url)
+    elapsed = (time.perf_counter() - start) / repeat
+    return len(response.data), elapsed
+
+
+def legacy_motions(db, limit):
+    """The previous listing rows: every column, full_data included, plus parties"""
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM motions ORDER BY order_date DESC LIMIT ?", (limit,))
+        return db._attach_parties(cursor, [dict(row) for row in cursor.fetchall()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--motions", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_corpus(path, args.motions).close()
+        os.environ["DATABASE_PATH"] = path
+        import app
+        app.app.add_url_rule(
+            "/bench/legacy", "bench_legacy",
+            lambda: app.jsonify({"success": True, "motions": legacy_motions(app.db, int(app.request.args["limit"]))})
+        )
+        client = app.app.test_client()
+        
+        for label, url in [
+            ("SELECT * (before)", f"/bench/legacy?limit={args.limit}"),
+            ("view=detail", f"/api/motions?limit={args.limit}&view=detail"),
+            ("view=summary", f"/api/motions?limit={args.limit}&view=summary"),
+            ("fields=id,case_name,...", f"/api/motions?limit={args.limit}&fields=id,case_name,court,judge,motion_type,order_date"),
+        ]:
+            size, elapsed = measure(client, url)
+            print(f"{label:28} {size:9d} bytes {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
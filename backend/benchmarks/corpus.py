@@ -0,0 +1,96 @@
+import json
+import random
+import datetime
+from database import Database
+
+# Named corpus sizes used by the benchmark suite
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+# Motions generated and written per transaction, so large corpora stay within memory
+SEED_CHUNK_SIZE = 20000
+
+
+def seed_corpus(db_path, motion_count, parties_per_motion=2, attorneys_per_party=1, seed=0):
+    """Populate a database with synthetic motions, parties and attorneys
+    
+    The same seed and counts always produce the same corpus.
+    """
+    rng = random.Random(seed)
+    db = Database(db_path)
+    base_date = datetime.date(2024, 1, 1)
+    
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM motions")
+        first_id = cursor.fetchone()["max_id"] + 1
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM parties")
+        party_id = cursor.fetchone()["max_id"]
+        
+        for chunk_start in range(first_id, first_id + motion_count, SEED_CHUNK_SIZE):
+            chunk_end = min(chunk_start + SEED_CHUNK_SIZE, first_id + motion_count)
+            party_id = _seed_chunk(cursor, rng, base_date, range(chunk_start, chunk_end), party_id,
+                                   parties_per_motion, attorneys_per_party)
+            conn.commit()
+    
+    db.rebuild_rollups()
+    db.rebuild_search_index()
+    return db
+
+
+def _seed_chunk(cursor, rng, base_date, motion_ids, party_id, parties_per_motion, attorneys_per_party):
+    """Generate and insert one chunk of motions, returning the last party id used"""
+    motions = []
+    parties = []
+    attorneys = []
+    
+    for motion_id in motion_ids:
+        order_date = (base_date + datetime.timedelta(days=rng.randrange(730))).isoformat()
+        motion_type = rng.choice(["motion to dismiss denied", "motion for summary judgment denied"])
+        motion = {
+            "case_name": f"Plaintiff {motion_id} v. Defendant {motion_id}",
+            "judge": f"Judge {rng.randrange(400)}",
+            "court": f"District Court {rng.randrange(94)}",
+            "docket_number": f"1:{order_date[2:4]}-cv-{motion_id:06d}",
+            "motion_type": motion_type,
+            "order_info": {
+                "date": order_date,
+                "description": "Dismiss (Contested) - Denied",
+                "document_number": f"doc-{motion_id}"
+            },
+            "parties": [
+                {
+                    "type": rng.choice(["Plaintiff", "Defendant"]),
+                    "name": f"Party {motion_id}-{party_index}",
+                    "attorneys": [
+                        {"name": f"Attorney {rng.randrange(20000)}", "firm": f"Firm {rng.randrange(2000)}"}
+                        for _ in range(attorneys_per_party)
+                    ]
+                }
+                for party_index in range(parties_per_motion)
+            ],
+            "summary": f"The court denied the {motion_type} for reasons stated in the order. " * 8
+        }
+        motions.append((
+            motion_id, motion["case_name"], motion["judge"], motion["court"], motion["docket_number"],
+            motion_type, order_date, motion["order_info"]["description"], motion["order_info"]["document_number"],
+            motion["summary"], order_date, json.dumps(motion)
+        ))
+        
+        for party in motion["parties"]:
+            party_id += 1
+            parties.append((party_id, motion_id, party["type"], party["name"]))
+            attorneys.extend((party_id, attorney["name"], attorney["firm"]) for attorney in party["attorneys"])
+    
+    cursor.executemany(
+        '''
+        INSERT INTO motions (
+            id, case_name, judge, court, docket_number, motion_type,
+            order_date, order_description, document_number,
+            summary, date_added, full_data
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        motions
+    )
+    cursor.executemany("INSERT INTO parties (id, motion_id, party_type, party_name) VALUES (?, ?, ?, ?)", parties)
+    cursor.executemany("INSERT INTO attorneys (party_id, attorney_name, law_firm) VALUES (?, ?, ?)", attorneys)
+    return party_id
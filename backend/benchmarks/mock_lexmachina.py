@@ -0,0 +1,171 @@
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Event types the mock's cases are denied under, in the order the API client queries them
+EVENT_TYPES = ["Dismiss (Contested)", "Summary Judgment (Contested)"]
+
+
+class MockLexMachinaHandler(BaseHTTPRequestHandler):
+    """Serves canned token, query and case-detail responses with artificial latency"""
+    
+    CASE_DETAIL_PATH = re.compile(r"^/district-cases/(\d+)$")
+    DOCUMENT_PATH = re.compile(r"^/documents/doc-(\d+)(?:-(\d+))?$")
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, payload, status=200, etag=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+    
+    def do_POST(self):
+        body = self._read_body()
+        self.server.requests.append(("POST", self.path, None))
+        time.sleep(self.server.latency)
+        
+        if self.path == "/oauth2/token":
+            self._send_json({"access_token": "mock-token", "expires_in": 3600})
+        elif self.path == "/query-district-cases":
+            self._send_json({"cases": self.server.query_cases(json.loads(body or b"{}"))})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+    
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, self.headers.get("If-None-Match")))
+        time.sleep(self.server.latency)
+        
+        match = self.CASE_DETAIL_PATH.match(self.path)
+        document = self.DOCUMENT_PATH.match(self.path)
+        if document:
+            event_index = int(document.group(2)) - 1 if document.group(2) else 0
+            body = mock_order_text(int(document.group(1)), event_index=event_index).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", self.server.document_content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif match:
+            # Case details never change here, so the case id doubles as its ETag
+            etag = f'"case-{match.group(1)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send_json(mock_case(int(match.group(1))), etag=etag)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+class MockLexMachinaServer(ThreadingHTTPServer):
+    """Local stand-in for the Lex Machina API"""
+    
+    daemon_threads = True
+    
+    def __init__(self, case_count=100, latency=0.05, port=0):
+        super().__init__(("127.0.0.1", port), MockLexMachinaHandler)
+        self.case_count = case_count
+        self.latency = latency
+        self.document_content_type = "text/plain; charset=utf-8"
+        # (method, path, If-None-Match) of every request received
+        self.requests = []
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+    
+    def query_cases(self, payload):
+        """Cases with a denied event of one of the requested types, one page at a time"""
+        event_types = set(payload.get("events", {}).get("includeEventTypes") or EVENT_TYPES)
+        page = payload.get("page", 1)
+        page_size = payload.get("pageSize", 100)
+        case_ids = [
+            case_id for case_id in range(1, self.case_count + 1)
+            if event_types.intersection(mock_event_types(case_id))
+        ]
+        start = (page - 1) * page_size
+        return [{"districtCaseId": case_id} for case_id in case_ids[start:start + page_size]]
+    
+    def make_api(self, **kwargs):
+        """LexMachinaAPI client pointed at this server; keyword arguments go to its constructor"""
+        from lexmachina import LexMachinaAPI
+        
+        base_url = self.base_url
+        
+        class MockLexMachinaAPI(LexMachinaAPI):
+            TOKEN_URL = f"{base_url}/oauth2/token"
+            QUERY_URL = f"{base_url}/query-district-cases"
+            CASE_DETAIL_URL = f"{base_url}/district-cases/{{}}"
+            DOCUMENT_URL = f"{base_url}/documents/{{}}"
+        
+        return MockLexMachinaAPI("client", "secret", **kwargs)
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def mock_event_types(case_id):
+    """Types of a case's denied motion events: one for every case, and both for every third case"""
+    first, second = EVENT_TYPES if case_id % 2 else reversed(EVENT_TYPES)
+    return [first, second] if case_id % 3 == 0 else [first]
+
+
+def mock_case(case_id):
+    """Build a deterministic case-detail payload with its denied motions"""
+    return {
+        "caseName": f"Plaintiff {case_id} v. Defendant {case_id}",
+        "court": {"name": f"District Court {case_id % 7}"},
+        "judge": {"name": f"Judge {case_id % 23}"},
+        "docketNumber": f"1:24-cv-{case_id:05d}",
+        "parties": [
+            {"name": f"Plaintiff {case_id}", "role": "Plaintiff"},
+            {"name": f"Defendant {case_id}", "role": "Defendant"}
+        ],
+        "lawFirmRepresentations": [
+            {"side": "Plaintiff", "lawFirm": {"name": f"Firm {case_id % 11}"},
+             "attorneys": [{"name": f"Attorney {case_id}A"}]},
+            {"side": "Defendant", "lawFirm": {"name": f"Firm {case_id % 13}"},
+             "attorneys": [{"name": f"Attorney {case_id}B"}]}
+        ],
+        "events": [
+            {"type": event_type, "outcome": "Denied", "date": "2024-01-15",
+             "documentId": f"doc-{case_id}" if index == 0 else f"doc-{case_id}-{index + 1}"}
+            for index, event_type in enumerate(mock_event_types(case_id))
+        ]
+    }
+
+
+def mock_order_text(case_id, paragraphs=40, event_index=0):
+    """Build a deterministic order document for one of a case's events, a few tens of kilobytes long"""
+    motion = "dismiss" if "Dismiss" in mock_event_types(case_id)[event_index] else "summary judgment"
+    body = "\n\n".join(
+        f"{index}. The Court has considered the parties' arguments on the motion for {motion} in case "
+        f"1:24-cv-{case_id:05d}, including the standard of review, the record evidence and the "
+        f"authorities cited by Plaintiff {case_id} and Defendant {case_id}, and finds them insufficient."
+        for index in range(1, paragraphs + 1)
+    )
+    return (
+        f"MEMORANDUM ORDER\n\nPlaintiff {case_id} v. Defendant {case_id}\n\n{body}\n\n"
+        f"For these reasons, the motion for {motion} is DENIED.\n"
+    )
@@ -0,0 +1,39 @@
+import time
+import threading
+from types import SimpleNamespace
+
+
+class StubCompletion:
+    """Stand-in for openai.ChatCompletion.create that answers after a fixed latency
+    
+    Pass an instance as SummaryEngine(completion_fn=...). It counts calls and
+    the tokens a real request would have used, so runs can report LLM spend.
+    """
+    
+    def __init__(self, latency=0.2, completion_tokens=150):
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+    
+    def __call__(self, model=None, messages=(), max_tokens=None, **kwargs):
+        time.sleep(self.latency)
+        prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+        
+        order_text = messages[-1]["content"] if messages else ""
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message={"role": "assistant", "content": f"Summary: {order_text[:200]}"})],
+            usage={"prompt_tokens": prompt_tokens, "completion_tokens": self.completion_tokens}
+        )
+    
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.calls * self.completion_tokens
+            }
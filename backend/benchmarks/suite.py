@@ -0,0 +1,305 @@
+"""Run the timed benchmark scenarios against a seeded corpus and local API stand-ins, emitting JSON.
+
+Scenarios:
+  filter     GET /api/motions/filter for a fixed set of queries, uncached and from the view cache
+  stats      GET /api/stats, uncached and from the view cache
+  analytics  GET /api/analytics/* on a warm snapshot, uncached and from the view cache, plus snapshot loads
+  refresh    full and incremental refresh against the mock Lex Machina server and a stubbed OpenAI client
+  insert     bulk upserts of new motions into the corpus
+
+Run from the backend directory:
+    
+    python -m benchmarks.suite --scale 100k --output results.json
+    python -m benchmarks.suite --scale 1m --scenarios filter,stats --corpus-dir /var/tmp/corpora
+
+Seeding a 1m corpus takes several minutes; --corpus-dir keeps seeded corpora
+between runs (each run works on a copy, so results stay repeatable).
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import datetime
+import subprocess
+from benchmarks.corpus import SCALES, seed_corpus
+from benchmarks.mock_lexmachina import MockLexMachinaServer
+from benchmarks.stub_openai import StubCompletion
+from benchmarks.bench_insert import make_motion
+
+SCENARIOS = ["filter", "stats", "analytics", "refresh", "insert"]
+
+# Query strings for the filter scenario: single filters, combinations and a deep date range
+FILTER_QUERIES = [
+    "court=District%20Court%203",
+    "judge=Judge%2017",
+    "judge=17",
+    "motion_type=dismiss",
+    "start_date=2024-03-01&end_date=2024-03-31",
+    "court=District%20Court%203&start_date=2024-01-01&end_date=2024-06-30",
+    "judge=Judge%2017&motion_type=summary&view=summary",
+    "start_date=2024-01-01&limit=500",
+]
+
+# Paths under /api/analytics/ for the analytics scenario
+ANALYTICS_QUERIES = [
+    "judges",
+    "judges?window_days=30&motion_type=dismiss",
+    "trends?dimension=judge&months=12&rolling=3",
+    "trends?dimension=court&months=24&rolling=6",
+    "trends?dimension=all",
+    "firm-judge?firms=25&judges=25",
+]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    samples = sorted(samples)
+    
+    def percentile(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+    
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(percentile(0.5), 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def prepare_corpus(scale, seed, corpus_dir, work_dir):
+    """Copy of the seeded corpus for this run, seeding (and caching in corpus_dir) if needed"""
+    work_path = os.path.join(work_dir, "motions.db")
+    cached_path = os.path.join(corpus_dir, f"corpus-{scale}-{seed}.db") if corpus_dir else None
+    
+    start = time.perf_counter()
+    if cached_path and os.path.exists(cached_path):
+        shutil.copyfile(cached_path, work_path)
+        return work_path, {"seeded": False, "seconds": round(time.perf_counter() - start, 3)}
+    
+    seed_corpus(work_path, SCALES[scale], seed=seed).close()
+    
+    # Fold the WAL into the main file so a single file copy is a complete corpus
+    conn = sqlite3.connect(work_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    if cached_path:
+        os.makedirs(corpus_dir, exist_ok=True)
+        shutil.copyfile(work_path, cached_path)
+    return work_path, {"seeded": True, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def load_app(db_path, work_dir):
+    """Import the Flask app against the benchmark corpus, with the scheduler off"""
+    os.environ.update({
+        "DATABASE_PATH": db_path,
+        "HTTP_CACHE_PATH": os.path.join(work_dir, "http_cache.db"),
+        "DOCUMENT_STORE_PATH": os.path.join(work_dir, "documents"),
+        "SCHEDULER_ENABLED": "0",
+    })
+    import app
+    return app
+
+
+def time_requests(client, paths, repeat, before=None):
+    """Time GET requests, calling before() ahead of each one; fails on unsuccessful responses"""
+    samples = []
+    for _ in range(repeat):
+        for path in paths:
+            if before:
+                before()
+            start = time.perf_counter()
+            response = client.get(path)
+            samples.append(time.perf_counter() - start)
+            if response.status_code != 200 or not response.get_json().get("success"):
+                raise Exception(f"{path} failed: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    return samples
+
+
+def scenario_filter(app, args):
+    client = app.app.test_client()
+    paths = [f"/api/motions/filter?{query}" for query in FILTER_QUERIES]
+    
+    # Follow the cursor a few pages deep on the busiest listing
+    cursor_samples = []
+    path = "/api/motions/filter?start_date=2024-01-01&view=summary"
+    for _ in range(5):
+        app.view_cache.clear()
+        start = time.perf_counter()
+        body = client.get(path).get_json()
+        cursor_samples.append(time.perf_counter() - start)
+        path = f"/api/motions/filter?start_date=2024-01-01&view=summary&cursor={body['next_cursor']}"
+    
+    return {
+        "queries": len(paths),
+        "uncached": summarize(time_requests(client, paths, args.repeat, before=app.view_cache.clear)),
+        "cached": summarize(time_requests(client, paths, args.repeat)),
+        "cursor_pages": summarize(cursor_samples),
+    }
+
+
+def scenario_stats(app, args):
+    client = app.app.test_client()
+    paths = ["/api/stats"]
+    return {
+        "uncached": summarize(time_requests(client, paths, args.repeat, before=app.view_cache.clear)),
+        "cached": summarize(time_requests(client, paths, args.repeat)),
+    }
+
+
+def scenario_analytics(app, args):
+    client = app.app.test_client()
+    paths = [f"/api/analytics/{query}" for query in ANALYTICS_QUERIES]
+    
+    # The load paid by the first analytics request after each write
+    load_samples = []
+    for _ in range(3):
+        app.analytics_engine.clear()
+        start = time.perf_counter()
+        app.analytics_engine.snapshot()
+        load_samples.append(time.perf_counter() - start)
+    
+    return {
+        "queries": len(paths),
+        "snapshot_load": summarize(load_samples),
+        "uncached": summarize(time_requests(client, paths, args.repeat, before=app.view_cache.clear)),
+        "cached": summarize(time_requests(client, paths, args.repeat)),
+    }
+
+
+def scenario_insert(app, args):
+    batch_size = app.REFRESH_BATCH_SIZE
+    # Case ids far above the mock server's, so every motion is new
+    motions = [make_motion(case_id) for case_id in range(10 ** 7, 10 ** 7 + args.insert_motions)]
+    
+    samples = []
+    start = time.perf_counter()
+    for offset in range(0, len(motions), batch_size):
+        batch_start = time.perf_counter()
+        app.db.insert_motions(motions[offset:offset + batch_size])
+        samples.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "motions": len(motions),
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "motions_per_second": round(len(motions) / elapsed, 1),
+        "batch": summarize(samples),
+    }
+
+
+def scenario_refresh(app, args):
+    from summaries import SummaryEngine
+    from tracker import MotionTracker
+    from http_cache import ResponseCache
+    from documents import DocumentStore
+    
+    work_dir = tempfile.mkdtemp(prefix="refresh-")
+    completion = StubCompletion(latency=args.llm_latency)
+    server = MockLexMachinaServer(case_count=args.refresh_cases, latency=args.api_latency).start()
+    try:
+        api = server.make_api(
+            max_workers=args.workers,
+            summarizer=SummaryEngine(app.db, completion_fn=completion, max_workers=args.workers),
+            response_cache=ResponseCache(os.path.join(work_dir, "http_cache.db")),
+            document_store=DocumentStore(os.path.join(work_dir, "documents"))
+        )
+        tracker = MotionTracker(api, app.db, batch_size=app.REFRESH_BATCH_SIZE)
+        
+        results = {}
+        for run in ("full", "incremental"):
+            calls_before = completion.stats()["calls"]
+            start = time.perf_counter()
+            stats = tracker.refresh(days_back=1, incremental=True)
+            results[run] = {
+                "seconds": round(time.perf_counter() - start, 3),
+                "motions_found": stats["motions_found"],
+                "cases_skipped": stats["cases_skipped"],
+                "api_calls_avoided": stats["api_calls_avoided"],
+                "llm_calls": completion.stats()["calls"] - calls_before,
+            }
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return {
+        "cases": args.refresh_cases,
+        "api_latency": args.api_latency,
+        "llm_latency": args.llm_latency,
+        "workers": args.workers,
+        **results,
+        "llm": completion.stats(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="1k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions of each timed request")
+    parser.add_argument("--refresh-cases", type=int, default=200, help="Cases served by the mock Lex Machina server")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Mock API latency per request in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stubbed OpenAI latency per completion in seconds")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent case fetches and summaries during refresh")
+    parser.add_argument("--insert-motions", type=int, default=5000)
+    parser.add_argument("--corpus-dir", help="Directory caching seeded corpora between runs")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    
+    work_dir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        db_path, corpus = prepare_corpus(args.scale, args.seed, args.corpus_dir, work_dir)
+        app = load_app(db_path, work_dir)
+        
+        # Read scenarios run before the ones that write, so they see the pristine corpus
+        results = {}
+        for name in sorted(scenarios, key=SCENARIOS.index):
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = globals()[f"scenario_{name}"](app, args)
+        
+        report = {
+            "meta": {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "scale": args.scale,
+                "motions": SCALES[args.scale],
+                "seed": args.seed,
+                "corpus": corpus,
+            },
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
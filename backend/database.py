@@ -1,25 +1,609 @@
 import os
 import json
+import base64
+import queue
+import hashlib
 import sqlite3
 import datetime
+import threading
 from contextlib import contextmanager
+import metrics
+from names import name_key
 
-class Database:
-    """Database management for motion tracking"""
+# Stay well under SQLite's bound-parameter limit when batching IN (...) lookups
+MAX_BATCH_PARAMS = 500
+
+# Per-motion columns kept as precomputed counts in motion_rollups; law firm
+# counts come from attorneys and the overall total is stored under 'total'.
+# Court, judge and law firm counts are keyed by dimension id.
+ROLLUP_DIMENSIONS = {
+    "court": "court_id",
+    "judge": "judge_id",
+    "motion_type": "motion_type",
+    "day": "date(order_date)",
+}
+
+# Normalized name dimensions: dimension table, and the table and columns holding the raw name and its id
+NAME_DIMENSIONS = {
+    "judge": ("judges", "motions", "judge", "judge_id"),
+    "court": ("courts", "motions", "court", "court_id"),
+    "law_firm": ("law_firms", "attorneys", "law_firm", "law_firm_id"),
+}
+
+# Trend bucket sizes; days are grouped into weeks (from Monday) and months in Python
+TREND_BUCKETS = ("day", "week", "month")
+
+
+def _rebuild_rollups(cursor):
+    """Recompute every rollup count from the raw motions and attorneys rows"""
+    cursor.execute("DELETE FROM motion_rollups")
+    cursor.execute("INSERT INTO motion_rollups (dimension, key, count) SELECT 'total', '', COUNT(*) FROM motions")
+    for dimension, expression in ROLLUP_DIMENSIONS.items():
+        cursor.execute(
+            f'''
+            INSERT INTO motion_rollups (dimension, key, count)
+            SELECT ?, {expression}, COUNT(*) FROM motions
+            WHERE {expression} IS NOT NULL
+            GROUP BY {expression}
+            ''',
+            (dimension,)
+        )
+    cursor.execute(
+        '''
+        INSERT INTO motion_rollups (dimension, key, count)
+        SELECT 'law_firm', law_firm_id, COUNT(*) FROM attorneys
+        WHERE law_firm_id IS NOT NULL
+        GROUP BY law_firm_id
+        '''
+    )
+
+
+def _rebuild_name_rollups(cursor):
+    """Rollup counts keyed by raw names, as migration 2 first filled them
     
-    def __init__(self, db_path="motions.db"):
+    Kept as shipped so databases upgraded from before migration 2 take the
+    same path; migration 10 rebuilds the rollups keyed by dimension id.
+    """
+    cursor.execute("DELETE FROM motion_rollups")
+    cursor.execute("INSERT INTO motion_rollups (dimension, key, count) SELECT 'total', '', COUNT(*) FROM motions")
+    for dimension, expression in (("court", "court"), ("judge", "judge"), ("motion_type", "motion_type"),
+                                  ("day", "date(order_date)")):
+        cursor.execute(
+            f'''
+            INSERT INTO motion_rollups (dimension, key, count)
+            SELECT ?, {expression}, COUNT(*) FROM motions
+            WHERE {expression} IS NOT NULL
+            GROUP BY {expression}
+            ''',
+            (dimension,)
+        )
+    cursor.execute(
+        '''
+        INSERT INTO motion_rollups (dimension, key, count)
+        SELECT 'law_firm', law_firm, COUNT(*) FROM attorneys
+        WHERE law_firm IS NOT NULL
+        GROUP BY law_firm
+        '''
+    )
+
+
+def _rekey_courts(cursor):
+    """Recompute court name keys after a change to court normalization
+    
+    A court whose new key is already taken keeps its old one; aliases store
+    only their key, so they are left as they are.
+    """
+    cursor.execute("SELECT id, name FROM courts")
+    cursor.executemany(
+        "UPDATE OR IGNORE courts SET name_key = ? WHERE id = ?",
+        [(name_key("court", row["name"]), row["id"]) for row in cursor.fetchall()]
+    )
+
+
+def _find_dimension_id(cursor, dimension, name):
+    """Id of the dimension row a name normalizes or is aliased to, or None if there is none"""
+    key = name_key(dimension, name)
+    cursor.execute("SELECT canonical_id FROM name_aliases WHERE dimension = ? AND alias_key = ?", (dimension, key))
+    row = cursor.fetchone()
+    if row:
+        return row["canonical_id"]
+    
+    cursor.execute(f"SELECT id FROM {NAME_DIMENSIONS[dimension][0]} WHERE name_key = ?", (key,))
+    row = cursor.fetchone()
+    return row["id"] if row else None
+
+
+def _dimension_id(cursor, dimension, name):
+    """Id of the dimension row for a name, adding the row if the name is new"""
+    if name is None:
+        return None
+    
+    dimension_id = _find_dimension_id(cursor, dimension, name)
+    if dimension_id is None:
+        cursor.execute(
+            f"INSERT INTO {NAME_DIMENSIONS[dimension][0]} (name, name_key) VALUES (?, ?)",
+            (name.strip(), name_key(dimension, name))
+        )
+        dimension_id = cursor.lastrowid
+    return dimension_id
+
+
+def _assign_dimension_ids(cursor):
+    """Fill in missing dimension ids from the raw name columns, most common spelling first"""
+    for dimension, (_, table, name_column, id_column) in NAME_DIMENSIONS.items():
+        cursor.execute(
+            f'''
+            SELECT {name_column} AS name FROM {table}
+            WHERE {id_column} IS NULL AND {name_column} IS NOT NULL
+            GROUP BY {name_column} ORDER BY COUNT(*) DESC
+            '''
+        )
+        names = [row["name"] for row in cursor.fetchall()]
+        if not names:
+            continue
+        
+        # One pass over the table, looking each row's id up in a temporary name map
+        cursor.execute("DROP TABLE IF EXISTS temp.dimension_map")
+        cursor.execute("CREATE TEMP TABLE dimension_map (name TEXT PRIMARY KEY, id INTEGER)")
+        cursor.executemany(
+            "INSERT INTO dimension_map (name, id) VALUES (?, ?)",
+            [(name, _dimension_id(cursor, dimension, name)) for name in names]
+        )
+        cursor.execute(
+            f'''
+            UPDATE {table} SET {id_column} = (SELECT id FROM dimension_map WHERE dimension_map.name = {table}.{name_column})
+            WHERE {id_column} IS NULL AND {name_column} IS NOT NULL
+            '''
+        )
+        cursor.execute("DROP TABLE temp.dimension_map")
+
+
+# Column weights for bm25 ranking of search results, in motions_fts column order
+SEARCH_COLUMN_WEIGHTS = {
+    "case_name": 10.0,
+    "judge": 4.0,
+    "court": 2.0,
+    "motion_type": 1.0,
+    "summary": 1.0,
+    "parties": 5.0,
+    "law_firms": 4.0,
+    "order_text": 1.0,
+}
+
+# Search document for each motion: its own text columns plus its party and law firm names.
+# The order text is not stored in the motions table, so callers supply its source.
+SEARCH_INDEX_SELECT = '''
+    SELECT
+        motions.id, motions.case_name, motions.judge, motions.court, motions.motion_type, motions.summary,
+        (SELECT group_concat(party_name, ' ') FROM parties WHERE parties.motion_id = motions.id),
+        (SELECT group_concat(DISTINCT attorneys.law_firm) FROM attorneys
+         JOIN parties ON parties.id = attorneys.party_id
+         WHERE parties.motion_id = motions.id),
+        {order_text}
+    FROM motions
+'''
+
+# Statements creating the full-text search table and its column weights
+SEARCH_INDEX_SCHEMA = [
+    f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS motions_fts USING fts5(
+        {', '.join(SEARCH_COLUMN_WEIGHTS)},
+        tokenize = 'porter unicode61'
+    )
+    ''',
+    f"INSERT INTO motions_fts (motions_fts, rank) VALUES ('rank', 'bm25({', '.join(map(str, SEARCH_COLUMN_WEIGHTS.values()))})')",
+]
+
+
+def _rebuild_search_index(cursor):
+    """Repopulate the full-text search index from the stored motions, keeping indexed order text"""
+    cursor.execute("DROP TABLE IF EXISTS temp.saved_order_text")
+    cursor.execute(
+        "CREATE TEMP TABLE saved_order_text AS SELECT rowid AS motion_id, order_text FROM motions_fts WHERE order_text IS NOT NULL"
+    )
+    cursor.execute("CREATE UNIQUE INDEX temp.idx_saved_order_text ON saved_order_text (motion_id)")
+    cursor.execute("DELETE FROM motions_fts")
+    cursor.execute(
+        f"INSERT INTO motions_fts (rowid, {', '.join(SEARCH_COLUMN_WEIGHTS)}) "
+        + SEARCH_INDEX_SELECT.format(
+            order_text="(SELECT order_text FROM saved_order_text WHERE saved_order_text.motion_id = motions.id)"
+        )
+    )
+    cursor.execute("DROP TABLE temp.saved_order_text")
+
+
+def _recreate_search_index(cursor):
+    """Drop and recreate the full-text search table with the current columns, then fill it"""
+    cursor.execute("DROP TABLE IF EXISTS motions_fts")
+    for statement in SEARCH_INDEX_SCHEMA:
+        cursor.execute(statement)
+    _rebuild_search_index(cursor)
+
+
+def _search_query(text):
+    """Turn free text into an FTS5 query matching every term, with prefix matching on the last"""
+    terms = [term.replace('"', '') for term in text.split()]
+    terms = [f'"{term}"' for term in terms if term]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+# Fields that motion listings may return, mapped to their SQL select expression.
+# full_data is reserved for the single-motion detail route; parties are loaded separately.
+LIST_FIELDS = {
+    "id": "id",
+    "case_name": "case_name",
+    "judge": "judge",
+    "court": "court",
+    "docket_number": "docket_number",
+    "motion_type": "motion_type",
+    "order_date": "order_date",
+    "order_description": "order_description",
+    "document_number": "document_number",
+    "summary": "summary",
+    "summary_preview": "substr(summary, 1, 200) AS summary_preview",
+    "date_added": "date_added",
+    "parties": None,
+}
+
+# Named field sets for the listing endpoints
+LIST_VIEWS = {
+    "summary": ["id", "case_name", "judge", "court", "motion_type", "order_date", "summary_preview"],
+    "detail": [field for field in LIST_FIELDS if field != "summary_preview"],
+    "export": [field for field in LIST_FIELDS if field not in ("summary_preview", "parties")],
+}
+
+# Columns returned by the single-motion detail route: the detail listing fields plus the source data
+DETAIL_COLUMNS = [LIST_FIELDS[field] for field in LIST_VIEWS["detail"] if LIST_FIELDS[field]] + ["full_data"]
+
+# Rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = 1000
+
+# Rows fetched per round trip when loading the analytics snapshot
+ANALYTICS_BATCH_SIZE = 50000
+
+
+def resolve_fields(view=None, fields=None):
+    """Turn a view name or a comma-separated field list into the fields to select"""
+    if fields:
+        return [field.strip() for field in fields.split(",") if field.strip()]
+    if view not in LIST_VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    return LIST_VIEWS[view]
+
+
+def encode_cursor(motion):
+    """Opaque continuation token pointing just past the given motion"""
+    position = json.dumps([motion["order_date"], motion["id"]])
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    """Decode a continuation token into an (order_date, id) keyset position"""
+    try:
+        order_date, motion_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(motion_id, int) or not isinstance(order_date, (str, type(None))):
+        raise ValueError("Invalid cursor")
+    return order_date, motion_id
+
+
+def _decode_job(row):
+    """Turn a jobs row into a dict with its JSON columns parsed"""
+    job = dict(row)
+    for column in ("params", "progress", "result"):
+        job[column] = json.loads(job[column]) if job[column] else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+def _bucket_start(day, bucket):
+    """First day of the trend bucket containing the given date"""
+    if bucket == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, bucket):
+    """First day of the trend bucket following the one starting at the given date"""
+    if bucket == "week":
+        return day + datetime.timedelta(days=7)
+    if bucket == "month":
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def _batches(values, size=MAX_BATCH_PARAMS):
+    """Split a list into consecutive slices of at most size items"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# Versioned schema migrations, applied in order on startup. PRAGMA user_version
+# records the last version applied. Each step is a SQL string or a callable
+# taking a cursor.
+MIGRATIONS = [
+    (1, [
+        # Listing order, and the court filter ordered by date
+        "CREATE INDEX IF NOT EXISTS idx_motions_order_date ON motions (order_date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_motions_court ON motions (court, order_date)",
+        # Covering indexes for the grouped stats queries
+        "CREATE INDEX IF NOT EXISTS idx_motions_judge ON motions (judge)",
+        "CREATE INDEX IF NOT EXISTS idx_motions_motion_type ON motions (motion_type)",
+        # Child lookups when hydrating and rewriting parties and attorneys
+        "CREATE INDEX IF NOT EXISTS idx_parties_motion_id ON parties (motion_id)",
+        "CREATE INDEX IF NOT EXISTS idx_attorneys_party_id ON attorneys (party_id)",
+        "CREATE INDEX IF NOT EXISTS idx_attorneys_law_firm ON attorneys (law_firm)",
+    ]),
+    (2, [
+        # Precomputed counts for the stats endpoints, maintained by insert_motion
+        '''
+        CREATE TABLE IF NOT EXISTS motion_rollups (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, key)
+        ) WITHOUT ROWID
+        ''',
+        _rebuild_name_rollups,
+    ]),
+    (3, [
+        # Fingerprint of the parties payload, so bulk upserts can skip unchanged children
+        "ALTER TABLE motions ADD COLUMN parties_hash TEXT",
+    ]),
+    (4, [
+        # Full-text search over motions, keyed by motion id and kept in sync by insert_motions
+        *SEARCH_INDEX_SCHEMA,
+        _rebuild_search_index,
+    ]),
+    (5, [
+        # Incremental refresh state: per event type high-water marks and per case fingerprints
+        '''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            event_type TEXT PRIMARY KEY,
+            high_water_mark TEXT,
+            updated_at TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS case_fingerprints (
+            case_id TEXT PRIMARY KEY,
+            fingerprint TEXT,
+            last_seen TEXT
+        )
+        ''',
+    ]),
+    (6, [
+        # Background jobs such as refreshes, shared by every worker process
+        '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT,
+            params TEXT,
+            status TEXT,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            cancel_requested INTEGER DEFAULT 0,
+            created_at TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            heartbeat_at TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, kind)",
+    ]),
+    (7, [
+        # User-editable settings stored as JSON documents
+        '''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT
+        )
+        ''',
+        # Last run claimed by each schedule, so only one process submits it
+        '''
+        CREATE TABLE IF NOT EXISTS schedules (
+            name TEXT PRIMARY KEY,
+            last_due TEXT,
+            claimed_by TEXT,
+            claimed_at TEXT
+        )
+        ''',
+        # Expiring locks held by one process at a time
+        '''
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT,
+            expires_at TEXT
+        )
+        ''',
+    ]),
+    (8, [
+        # Add fetched order text to the search index (FTS5 tables cannot gain columns in place)
+        _recreate_search_index,
+    ]),
+    (9, [
+        # Counter bumped by every write to the motion data, used to invalidate cached responses
+        '''
+        CREATE TABLE IF NOT EXISTS data_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+        ''',
+        "INSERT OR IGNORE INTO data_generation (id, generation) VALUES (1, 0)",
+    ]),
+    (10, [
+        # Normalized judges, courts and law firms with integer keys; the raw
+        # name columns are kept as received, alongside the dimension ids
+        *[
+            f'''
+            CREATE TABLE IF NOT EXISTS {dimension_table} (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL UNIQUE
+            )
+            '''
+            for dimension_table, _, _, _ in NAME_DIMENSIONS.values()
+        ],
+        # Extra spellings mapped onto a dimension row, e.g. initials for a full name
+        '''
+        CREATE TABLE IF NOT EXISTS name_aliases (
+            dimension TEXT NOT NULL,
+            alias_key TEXT NOT NULL,
+            canonical_id INTEGER NOT NULL,
+            PRIMARY KEY (dimension, alias_key)
+        ) WITHOUT ROWID
+        ''',
+        "ALTER TABLE motions ADD COLUMN judge_id INTEGER REFERENCES judges (id)",
+        "ALTER TABLE motions ADD COLUMN court_id INTEGER REFERENCES courts (id)",
+        "ALTER TABLE attorneys ADD COLUMN law_firm_id INTEGER REFERENCES law_firms (id)",
+        _assign_dimension_ids,
+        # Grouping and filtering now go through the ids, so the text indexes are replaced
+        "DROP INDEX IF EXISTS idx_motions_court",
+        "DROP INDEX IF EXISTS idx_motions_judge",
+        "DROP INDEX IF EXISTS idx_attorneys_law_firm",
+        "CREATE INDEX IF NOT EXISTS idx_motions_court_id ON motions (court_id, order_date)",
+        "CREATE INDEX IF NOT EXISTS idx_motions_judge_id ON motions (judge_id, order_date)",
+        "CREATE INDEX IF NOT EXISTS idx_attorneys_law_firm_id ON attorneys (law_firm_id)",
+        _rebuild_rollups,
+    ]),
+    (11, [
+        # Date-range shards of historical backfills, so an interrupted backfill resumes
+        '''
+        CREATE TABLE IF NOT EXISTS backfill_shards (
+            shard_start TEXT,
+            shard_end TEXT,
+            status TEXT,
+            motions INTEGER DEFAULT 0,
+            error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (shard_start, shard_end)
+        )
+        ''',
+    ]),
+    (12, [
+        # Widened to cover the analytics snapshot columns, so loading it scans the index instead of full_data
+        "DROP INDEX IF EXISTS idx_motions_motion_type",
+        "CREATE INDEX IF NOT EXISTS idx_motions_motion_type ON motions (motion_type, judge_id, court_id, order_date)",
+    ]),
+    (13, [
+        # Rollups are read in descending count order, which otherwise sorts each dimension per request
+        "CREATE INDEX IF NOT EXISTS idx_motion_rollups_count ON motion_rollups (dimension, count)",
+    ]),
+    (14, [
+        # Fingerprints of fetched case details per event type; the old ones hashed query entries, which never change
+        "DROP TABLE IF EXISTS case_fingerprints",
+        '''
+        CREATE TABLE case_fingerprints (
+            event_type TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            fingerprint TEXT,
+            last_seen TEXT,
+            PRIMARY KEY (event_type, case_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (15, [
+        # Initials in court names are only spelled out inside a district citation such as "N.D. Cal."
+        _rekey_courts,
+    ]),
+]
+
+
+class ConnectionPool:
+    """Thread-safe pool of tuned SQLite connections
+    
+    A thread keeps the same connection for nested checkouts, and released
+    connections go back on a LIFO stack so threads keep reusing warm
+    connections (and their prepared-statement caches) across calls.
+    """
+    
+    def __init__(self, db_path, max_idle=8, journal_mode="WAL", read_only=False):
         self.db_path = db_path
-        self._initialize_db()
+        self.journal_mode = journal_mode
+        self.read_only = read_only
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._local = threading.local()
     
-    @contextmanager
-    def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self):
+        factory = metrics.InstrumentedConnection if metrics.enabled else sqlite3.Connection
+        if self.read_only:
+            # The journal mode is the writer's to set; a read-only connection keeps it
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30, check_same_thread=False,
+                                   cached_statements=256, factory=factory)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=256,
+                                   factory=factory)
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -16000")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread, reusing one already held"""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
+        self._local.conn = conn
         try:
             yield conn
         finally:
-            conn.close()
+            self._local.conn = None
+            # Never hand an open transaction to the next borrower
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Database:
+    """Database management for motion tracking"""
+    
+    def __init__(self, db_path="motions.db", pool_size=8, journal_mode="WAL", read_only=False):
+        """Open the database, creating and migrating its schema unless read_only
+        
+        A read-only database expects the schema to be current already, e.g.
+        in a worker process reading a database its parent opened.
+        """
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_idle=pool_size, journal_mode=journal_mode, read_only=read_only)
+        if not read_only:
+            self._initialize_db()
+    
+    def _get_connection(self):
+        """Context manager for pooled database connections"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
     
     def _initialize_db(self):
         """Initialize database schema if it doesn't exist"""
@@ -67,273 +651,957 @@ class Database:
             )
             ''')
             
+            # Create summary cache table, keyed on a hash of order text and prompt version
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                cache_key TEXT PRIMARY KEY,
+                prompt_version TEXT,
+                model TEXT,
+                summary TEXT,
+                created_at TEXT
+            )
+            ''')
+            
             conn.commit()
+            
+            self._apply_migrations(conn)
+    
+    def _apply_migrations(self, conn):
+        """Bring the schema up to the latest migration version"""
+        cursor = conn.cursor()
+        
+        for version, steps in MIGRATIONS:
+            # Take the write lock first so concurrent workers apply each migration once
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] >= version:
+                conn.rollback()
+                continue
+            
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def get_schema_version(self):
+        """Return the last schema migration version applied"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            return cursor.fetchone()[0]
     
     def insert_motion(self, motion_data):
         """Insert a new denied motion into the database"""
+        return self.insert_motions([motion_data])[0]
+    
+    def insert_motions(self, motions):
+        """Insert or update a batch of denied motions in a single transaction, returning their ids"""
+        motion_ids = []
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
             
-            # Extract basic motion data
-            case_name = motion_data.get("case_name", "Unknown Case")
-            judge = motion_data.get("judge", "Unknown Judge")
-            court = motion_data.get("court", "Unknown Court")
-            docket_number = motion_data.get("docket_number", "Unknown Docket")
-            motion_type = motion_data.get("motion_type", "Unknown Motion Type")
-            summary = motion_data.get("summary", "")
-            
-            # Extract order info
-            order_info = motion_data.get("order_info", {})
-            order_date = order_info.get("date") if order_info else None
-            order_description = order_info.get("description") if order_info else None
-            document_number = order_info.get("document_number") if order_info else None
-            
-            # Current date
-            date_added = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-            # Full data as JSON
-            full_data = json.dumps(motion_data)
-            
-            # Check if motion already exists
-            cursor.execute(
-                "SELECT id FROM motions WHERE court = ? AND docket_number = ? AND document_number = ?",
-                (court, docket_number, document_number)
+            try:
+                for motion_data in motions:
+                    motion_ids.append(self._upsert_motion(cursor, motion_data))
+                if motion_ids:
+                    self._bump_generation(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        
+        return motion_ids
+    
+    def _upsert_motion(self, cursor, motion_data):
+        """Write one motion and its parties within the caller's transaction"""
+        # Extract basic motion data
+        case_name = motion_data.get("case_name", "Unknown Case")
+        judge = motion_data.get("judge", "Unknown Judge")
+        court = motion_data.get("court", "Unknown Court")
+        docket_number = motion_data.get("docket_number", "Unknown Docket")
+        motion_type = motion_data.get("motion_type", "Unknown Motion Type")
+        summary = motion_data.get("summary", "")
+        
+        # Extract order info
+        order_info = motion_data.get("order_info", {})
+        order_date = order_info.get("date") if order_info else None
+        order_description = order_info.get("description") if order_info else None
+        document_number = order_info.get("document_number") if order_info else None
+        
+        # Current date
+        date_added = datetime.datetime.now().strftime("%Y-%m-%d")
+        
+        # Order text is only indexed for search; the document itself lives in the document store
+        order_text = motion_data.get("order_text")
+        
+        # Full data as JSON, and a fingerprint of the parties to detect unchanged children
+        full_data = json.dumps({key: value for key, value in motion_data.items() if key != "order_text"})
+        parties = motion_data.get("parties", [])
+        parties_hash = hashlib.sha256(json.dumps(parties, sort_keys=True).encode("utf-8")).hexdigest()
+        
+        # Retract an existing motion's rollup counts before overwriting it
+        cursor.execute(
+            "SELECT id, parties_hash FROM motions WHERE court = ? AND docket_number = ? AND document_number = ?",
+            (court, docket_number, document_number)
+        )
+        existing = cursor.fetchone()
+        if existing:
+            self._update_rollups(cursor, existing["id"], -1)
+        
+        judge_id = _dimension_id(cursor, "judge", judge)
+        court_id = _dimension_id(cursor, "court", court)
+        
+        cursor.execute(
+            '''
+            INSERT INTO motions (
+                case_name, judge, court, docket_number, motion_type,
+                order_date, order_description, document_number,
+                summary, date_added, full_data, parties_hash, judge_id, court_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (court, docket_number, document_number) DO UPDATE SET
+                case_name = excluded.case_name,
+                judge = excluded.judge,
+                judge_id = excluded.judge_id,
+                court_id = excluded.court_id,
+                motion_type = excluded.motion_type,
+                order_date = excluded.order_date,
+                order_description = excluded.order_description,
+                summary = excluded.summary,
+                date_added = excluded.date_added,
+                full_data = excluded.full_data,
+                parties_hash = excluded.parties_hash
+            ''',
+            (case_name, judge, court, docket_number, motion_type,
+             order_date, order_description, document_number,
+             summary, date_added, full_data, parties_hash, judge_id, court_id)
+        )
+        motion_id = existing["id"] if existing else cursor.lastrowid
+        
+        if not existing or existing["parties_hash"] != parties_hash:
+            self._replace_parties(cursor, motion_id, parties)
+        
+        self._update_rollups(cursor, motion_id, 1)
+        self._index_motion(cursor, motion_id, order_text)
+        return motion_id
+    
+    def _index_motion(self, cursor, motion_id, order_text=None):
+        """Refresh a motion's full-text search document, keeping its indexed order text unless replaced"""
+        if order_text is None:
+            cursor.execute("SELECT order_text FROM motions_fts WHERE rowid = ?", (motion_id,))
+            row = cursor.fetchone()
+            order_text = row["order_text"] if row else None
+        
+        cursor.execute("DELETE FROM motions_fts WHERE rowid = ?", (motion_id,))
+        cursor.execute(
+            f"INSERT INTO motions_fts (rowid, {', '.join(SEARCH_COLUMN_WEIGHTS)}) "
+            + SEARCH_INDEX_SELECT.format(order_text="?") + " WHERE motions.id = ?",
+            (order_text, motion_id)
+        )
+    
+    def _replace_parties(self, cursor, motion_id, parties):
+        """Rewrite a motion's parties and attorneys with batched statements"""
+        cursor.execute(
+            "DELETE FROM attorneys WHERE party_id IN (SELECT id FROM parties WHERE motion_id = ?)",
+            (motion_id,)
+        )
+        cursor.execute("DELETE FROM parties WHERE motion_id = ?", (motion_id,))
+        
+        if not parties:
+            return
+        
+        cursor.executemany(
+            "INSERT INTO parties (motion_id, party_type, party_name) VALUES (?, ?, ?)",
+            [(motion_id, party.get("type", "Unknown"), party.get("name", "Unknown Party")) for party in parties]
+        )
+        
+        # Party ids are assigned in insertion order, so they line up with the payload
+        cursor.execute("SELECT id FROM parties WHERE motion_id = ? ORDER BY id", (motion_id,))
+        party_ids = [row["id"] for row in cursor.fetchall()]
+        
+        firms = {attorney.get("firm", "Unknown Firm") for party in parties for attorney in party.get("attorneys", [])}
+        firm_ids = {firm: _dimension_id(cursor, "law_firm", firm) for firm in firms}
+        
+        cursor.executemany(
+            "INSERT INTO attorneys (party_id, attorney_name, law_firm, law_firm_id) VALUES (?, ?, ?, ?)",
+            [
+                (party_id, attorney.get("name", "Unknown Attorney"), attorney.get("firm", "Unknown Firm"),
+                 firm_ids[attorney.get("firm", "Unknown Firm")])
+                for party_id, party in zip(party_ids, parties)
+                for attorney in party.get("attorneys", [])
+            ]
+        )
+    
+    def _update_rollups(self, cursor, motion_id, delta):
+        """Add (delta=1) or retract (delta=-1) a stored motion's contribution to the rollup counts"""
+        cursor.execute(
+            f"SELECT {', '.join(f'{expression} AS {dimension}' for dimension, expression in ROLLUP_DIMENSIONS.items())} "
+            "FROM motions WHERE id = ?",
+            (motion_id,)
+        )
+        row = cursor.fetchone()
+        keys = [("total", "")] + [(dimension, row[dimension]) for dimension in ROLLUP_DIMENSIONS]
+        
+        cursor.execute(
+            '''
+            SELECT attorneys.law_firm_id FROM attorneys
+            JOIN parties ON parties.id = attorneys.party_id
+            WHERE parties.motion_id = ?
+            ''',
+            (motion_id,)
+        )
+        keys += [("law_firm", attorney_row["law_firm_id"]) for attorney_row in cursor.fetchall()]
+        keys = [(dimension, key) for dimension, key in keys if key is not None]
+        
+        cursor.executemany(
+            '''
+            INSERT INTO motion_rollups (dimension, key, count) VALUES (?, ?, ?)
+            ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count
+            ''',
+            [(dimension, key, delta) for dimension, key in keys]
+        )
+        if delta < 0:
+            cursor.executemany(
+                "DELETE FROM motion_rollups WHERE dimension = ? AND key = ? AND count <= 0",
+                keys
             )
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing motion
-                motion_id = existing["id"]
+    
+    def _bump_generation(self, cursor):
+        """Advance the data generation within the caller's write transaction"""
+        cursor.execute("UPDATE data_generation SET generation = generation + 1 WHERE id = 1")
+    
+    def get_generation(self):
+        """Current data generation; it changes whenever motions are written"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT generation FROM data_generation WHERE id = 1")
+            return cursor.fetchone()["generation"]
+    
+    def rebuild_rollups(self):
+        """Recompute the stats rollup tables from scratch"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                _assign_dimension_ids(cursor)
+                _rebuild_rollups(cursor)
+                self._bump_generation(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def add_name_alias(self, dimension, alias, canonical):
+        """Make alias another spelling of canonical, merging any motions already stored under it"""
+        dimension_table, table, _, id_column = NAME_DIMENSIONS[dimension]
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                canonical_id = _dimension_id(cursor, dimension, canonical)
+                merged_id = _find_dimension_id(cursor, dimension, alias)
+                
                 cursor.execute(
                     '''
-                    UPDATE motions SET
-                        case_name = ?,
-                        judge = ?,
-                        motion_type = ?,
-                        order_date = ?,
-                        order_description = ?,
-                        summary = ?,
-                        date_added = ?,
-                        full_data = ?
-                    WHERE id = ?
+                    INSERT INTO name_aliases (dimension, alias_key, canonical_id) VALUES (?, ?, ?)
+                    ON CONFLICT (dimension, alias_key) DO UPDATE SET canonical_id = excluded.canonical_id
                     ''',
-                    (case_name, judge, motion_type, order_date, order_description, 
-                     summary, date_added, full_data, motion_id)
+                    (dimension, name_key(dimension, alias), canonical_id)
+                )
+                
+                if merged_id is not None and merged_id != canonical_id:
+                    # Repoint rows, aliases and rollup counts from the merged row, then drop it
+                    cursor.execute(f"UPDATE {table} SET {id_column} = ? WHERE {id_column} = ?", (canonical_id, merged_id))
+                    cursor.execute(
+                        "UPDATE name_aliases SET canonical_id = ? WHERE dimension = ? AND canonical_id = ?",
+                        (canonical_id, dimension, merged_id)
+                    )
+                    cursor.execute(
+                        '''
+                        INSERT INTO motion_rollups (dimension, key, count)
+                        SELECT dimension, ?, count FROM motion_rollups WHERE dimension = ? AND key = ?
+                        ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count
+                        ''',
+                        (canonical_id, dimension, merged_id)
+                    )
+                    cursor.execute("DELETE FROM motion_rollups WHERE dimension = ? AND key = ?", (dimension, merged_id))
+                    cursor.execute(f"DELETE FROM {dimension_table} WHERE id = ?", (merged_id,))
+                    self._bump_generation(cursor)
+                
+                conn.commit()
+                return canonical_id
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def rebuild_search_index(self):
+        """Recompute the full-text search index from scratch"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                _rebuild_search_index(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def get_high_water_mark(self, event_type):
+        """Get the end date of the last completed sync for an event type"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT high_water_mark FROM sync_state WHERE event_type = ?", (event_type,))
+            row = cursor.fetchone()
+            return row["high_water_mark"] if row else None
+    
+    def get_case_fingerprint(self, event_type, case_id):
+        """Get the fingerprint of a case as last processed for an event type, or None"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT fingerprint FROM case_fingerprints WHERE event_type = ? AND case_id = ?",
+                (event_type, case_id)
+            )
+            row = cursor.fetchone()
+            return row["fingerprint"] if row else None
+    
+    def record_sync(self, event_type, high_water_mark, fingerprints):
+        """Store the fingerprints of the cases a sync processed and advance its high-water mark"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO case_fingerprints (event_type, case_id, fingerprint, last_seen) VALUES (?, ?, ?, ?)",
+                    [(event_type, case_id, fingerprint, high_water_mark) for case_id, fingerprint in fingerprints.items()]
                 )
-            else:
-                # Insert new motion
+                cursor.execute(
+                    "INSERT OR REPLACE INTO sync_state (event_type, high_water_mark, updated_at) VALUES (?, ?, ?)",
+                    (event_type, high_water_mark, datetime.datetime.now().isoformat())
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def create_job(self, kind, params, stale_after):
+        """Insert a queued job unless an identical one is still active, returning (job_id, created)"""
+        now = datetime.datetime.now()
+        fresh_since = (now - datetime.timedelta(seconds=stale_after)).isoformat()
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
                 cursor.execute(
                     '''
-                    INSERT INTO motions (
-                        case_name, judge, court, docket_number, motion_type,
-                        order_date, order_description, document_number,
-                        summary, date_added, full_data
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    SELECT id FROM jobs
+                    WHERE status IN ('queued', 'running') AND kind = ? AND params = ?
+                      AND cancel_requested = 0 AND heartbeat_at >= ?
+                    ORDER BY id LIMIT 1
                     ''',
-                    (case_name, judge, court, docket_number, motion_type,
-                     order_date, order_description, document_number,
-                     summary, date_added, full_data)
+                    (kind, params, fresh_since)
                 )
-                motion_id = cursor.lastrowid
-            
-            # Delete existing parties and attorneys for this motion
-            cursor.execute("SELECT id FROM parties WHERE motion_id = ?", (motion_id,))
-            party_ids = [row["id"] for row in cursor.fetchall()]
-            
-            for party_id in party_ids:
-                cursor.execute("DELETE FROM attorneys WHERE party_id = ?", (party_id,))
-            
-            cursor.execute("DELETE FROM parties WHERE motion_id = ?", (motion_id,))
-            
-            # Insert parties and attorneys
-            for party in motion_data.get("parties", []):
-                party_type = party.get("type", "Unknown")
-                party_name = party.get("name", "Unknown Party")
+                existing = cursor.fetchone()
+                if existing:
+                    conn.rollback()
+                    return existing["id"], False
                 
                 cursor.execute(
-                    "INSERT INTO parties (motion_id, party_type, party_name) VALUES (?, ?, ?)",
-                    (motion_id, party_type, party_name)
+                    "INSERT INTO jobs (kind, params, status, created_at, heartbeat_at) VALUES (?, ?, 'queued', ?, ?)",
+                    (kind, params, now.isoformat(), now.isoformat())
+                )
+                job_id = cursor.lastrowid
+                conn.commit()
+                return job_id, True
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def start_job(self, job_id):
+        """Mark a queued job as running; returns False if it was cancelled before starting"""
+        now = datetime.datetime.now().isoformat()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ? AND status = 'queued' AND cancel_requested = 0",
+                (now, now, job_id)
+            )
+            started = cursor.rowcount == 1
+            if not started:
+                cursor.execute(
+                    "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                    (now, job_id)
                 )
-                party_id = cursor.lastrowid
-                
-                for attorney in party.get("attorneys", []):
-                    attorney_name = attorney.get("name", "Unknown Attorney")
-                    law_firm = attorney.get("firm", "Unknown Firm")
-                    
-                    cursor.execute(
-                        "INSERT INTO attorneys (party_id, attorney_name, law_firm) VALUES (?, ?, ?)",
-                        (party_id, attorney_name, law_firm)
-                    )
-            
             conn.commit()
-            return motion_id
+            return started
     
-    def get_motions(self, limit=100, offset=0):
-        """Get all tracked motions with pagination"""
+    def update_job_progress(self, job_id, progress, queued_ids=()):
+        """Store a running job's progress and heartbeat, returning whether cancellation was requested
+        
+        queued_ids are jobs waiting behind it in the same process; they share its heartbeat.
+        """
+        now = datetime.datetime.now().isoformat()
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
             cursor.execute(
-                "SELECT * FROM motions ORDER BY order_date DESC LIMIT ? OFFSET ?",
-                (limit, offset)
+                "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+                (progress, now, job_id)
             )
-            motions = []
-            
-            for row in cursor.fetchall():
-                motion = dict(row)
-                
-                # Get parties for this motion
-                cursor.execute("SELECT * FROM parties WHERE motion_id = ?", (row["id"],))
-                parties = []
-                
-                for party_row in cursor.fetchall():
-                    party = dict(party_row)
-                    
-                    # Get attorneys for this party
-                    cursor.execute("SELECT * FROM attorneys WHERE party_id = ?", (party["id"],))
-                    attorneys = [dict(attorney_row) for attorney_row in cursor.fetchall()]
-                    
-                    party["attorneys"] = attorneys
-                    parties.append(party)
-                
-                motion["parties"] = parties
-                motions.append(motion)
-            
-            return motions
+            cursor.executemany(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'queued'",
+                [(now, queued_id) for queued_id in queued_ids]
+            )
+            conn.commit()
+            cursor.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+            return bool(cursor.fetchone()["cancel_requested"])
     
-    def filter_motions(self, court=None, judge=None, motion_type=None, start_date=None, end_date=None, limit=100, offset=0):
-        """Filter motions by various criteria"""
+    def finish_job(self, job_id, status, result=None, error=None):
+        """Record a job's final status and result or error"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            query = "SELECT * FROM motions WHERE 1=1"
-            params = []
-            
-            if court:
-                query += " AND court = ?"
-                params.append(court)
-            
-            if judge:
-                query += " AND judge LIKE ?"
-                params.append(f"%{judge}%")
-            
-            if motion_type:
-                query += " AND motion_type LIKE ?"
-                params.append(f"%{motion_type}%")
-            
-            if start_date:
-                query += " AND order_date >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND order_date <= ?"
-                params.append(end_date)
-            
-            query += " ORDER BY order_date DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-            
-            cursor.execute(query, params)
-            motions = []
-            
-            for row in cursor.fetchall():
-                motion = dict(row)
-                
-                # Get parties for this motion
-                cursor.execute("SELECT * FROM parties WHERE motion_id = ?", (row["id"],))
-                parties = []
-                
-                for party_row in cursor.fetchall():
-                    party = dict(party_row)
-                    
-                    # Get attorneys for this party
-                    cursor.execute("SELECT * FROM attorneys WHERE party_id = ?", (party["id"],))
-                    attorneys = [dict(attorney_row) for attorney_row in cursor.fetchall()]
-                    
-                    party["attorneys"] = attorneys
-                    parties.append(party)
-                
-                motion["parties"] = parties
-                motions.append(motion)
-            
-            return motions
+            cursor.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, datetime.datetime.now().isoformat(), job_id)
+            )
+            conn.commit()
     
-    def count_motions(self):
-        """Count total number of tracked motions"""
+    def request_job_cancel(self, job_id):
+        """Flag an active job for cancellation, returning False if it is not active"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) as count FROM motions")
-            return cursor.fetchone()["count"]
+            cursor.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN ('queued', 'running')",
+                (job_id,)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
     
-    def count_motions_by_court(self):
-        """Count motions by court"""
+    def fail_stale_jobs(self, stale_after):
+        """Fail active jobs whose heartbeat stopped, e.g. because their process exited"""
+        now = datetime.datetime.now()
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT court, COUNT(*) as count FROM motions GROUP BY court ORDER BY count DESC")
-            return [dict(row) for row in cursor.fetchall()]
+            cursor.execute(
+                '''
+                UPDATE jobs SET status = 'failed', error = 'Job stopped responding', finished_at = ?
+                WHERE status IN ('queued', 'running') AND heartbeat_at < ?
+                ''',
+                (now.isoformat(), (now - datetime.timedelta(seconds=stale_after)).isoformat())
+            )
+            conn.commit()
     
-    def count_motions_by_judge(self, limit=20):
-        """Count motions by judge"""
+    def get_job(self, job_id):
+        """Get a job with its progress and result decoded"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            return _decode_job(row) if row else None
+    
+    def get_jobs(self, limit=20):
+        """Get the most recent jobs, newest first"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+            return [_decode_job(row) for row in cursor.fetchall()]
+    
+    def get_setting(self, key, default=None):
+        """Get a stored setting, or default if it has never been saved"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
+            row = cursor.fetchone()
+            return json.loads(row["value"]) if row else default
+    
+    def set_setting(self, key, value):
+        """Store a setting as JSON"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT judge, COUNT(*) as count FROM motions GROUP BY judge ORDER BY count DESC LIMIT ?",
-                (limit,)
+                '''
+                INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+                ''',
+                (key, json.dumps(value), datetime.datetime.now().isoformat())
             )
-            return [dict(row) for row in cursor.fetchall()]
+            conn.commit()
     
-    def count_motions_by_type(self):
-        """Count motions by type"""
+    def get_schedule(self, name):
+        """Get the last run claimed for a schedule"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM schedules WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def claim_schedule(self, name, due, owner):
+        """Atomically claim a schedule's run at due; returns False if it was already claimed"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                INSERT INTO schedules (name, last_due, claimed_by, claimed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    last_due = excluded.last_due,
+                    claimed_by = excluded.claimed_by,
+                    claimed_at = excluded.claimed_at
+                WHERE schedules.last_due < excluded.last_due
+                ''',
+                (name, due, owner, datetime.datetime.now().isoformat())
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+    
+    def acquire_lease(self, name, owner, ttl):
+        """Take or extend a lease for ttl seconds; returns False while another owner holds it"""
+        now = datetime.datetime.now()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+                ''',
+                (name, owner, (now + datetime.timedelta(seconds=ttl)).isoformat(), now.isoformat())
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+    
+    def release_lease(self, name, owner):
+        """Give up a lease if this owner still holds it"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+            conn.commit()
+    
+    def add_backfill_shards(self, shards):
+        """Record (start, end) backfill shards as pending, leaving ones already recorded untouched"""
+        now = datetime.datetime.now().isoformat()
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT motion_type, COUNT(*) as count FROM motions GROUP BY motion_type ORDER BY count DESC")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO backfill_shards (shard_start, shard_end, status, updated_at) VALUES (?, ?, 'pending', ?)",
+                [(shard_start, shard_end, now) for shard_start, shard_end in shards]
+            )
+            conn.commit()
+    
+    def get_backfill_shards(self, start_date, end_date):
+        """Backfill shards lying within a date range, oldest first"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM backfill_shards WHERE shard_start >= ? AND shard_end <= ? ORDER BY shard_start, shard_end",
+                (start_date, end_date)
+            )
             return [dict(row) for row in cursor.fetchall()]
     
-    def get_motion_trend(self, days=30):
-        """Get motion trend for the past X days"""
+    def finish_backfill_shard(self, shard, status, motions=0, error=None):
+        """Record the outcome of a (start, end) backfill shard"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE backfill_shards SET status = ?, motions = ?, error = ?, updated_at = ? WHERE shard_start = ? AND shard_end = ?",
+                (status, motions, error, datetime.datetime.now().isoformat(), *shard)
+            )
+            conn.commit()
+    
+    def get_cached_summary(self, cache_key):
+        """Look up a previously generated summary by its cache key"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT summary FROM summary_cache WHERE cache_key = ?", (cache_key,))
+            row = cursor.fetchone()
+            return row["summary"] if row else None
+    
+    def store_cached_summary(self, cache_key, prompt_version, model, summary):
+        """Store a generated summary under its cache key"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO summary_cache (cache_key, prompt_version, model, summary, created_at) VALUES (?, ?, ?, ?, ?)",
+                (cache_key, prompt_version, model, summary, datetime.datetime.now().isoformat())
+            )
+            conn.commit()
+    
+    def store_cached_summaries(self, entries):
+        """Store (cache_key, prompt_version, model, summary) entries in one transaction"""
+        now = datetime.datetime.now().isoformat()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR REPLACE INTO summary_cache (cache_key, prompt_version, model, summary, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(*entry, now) for entry in entries]
+            )
+            conn.commit()
+    
+    def get_motion(self, motion_id):
+        """Get a single motion with its parties and full source data"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(DETAIL_COLUMNS)} FROM motions WHERE id = ?", (motion_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
             
-            # Calculate date range
-            end_date = datetime.datetime.now()
-            start_date = end_date - datetime.timedelta(days=days)
-            
-            # Generate date series
-            date_series = []
-            current_date = start_date
-            
-            while current_date <= end_date:
-                date_str = current_date.strftime("%Y-%m-%d")
-                date_series.append(date_str)
-                current_date += datetime.timedelta(days=1)
-            
-            # Get counts per day
-            results = []
+            motion = dict(row)
+            motion["full_data"] = json.loads(motion["full_data"]) if motion["full_data"] else None
+            return self._attach_parties(cursor, [motion])[0]
+    
+    def get_motions(self, limit=100, offset=0, after=None, fields=None):
+        """Get all tracked motions with pagination, newest first
+        
+        Pass the decoded cursor of the last motion seen as `after` to page by
+        keyset instead of offset, and a list of LIST_FIELDS names as `fields`
+        to project the columns returned (all of them by default).
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            return self._fetch_page(cursor, [], [], limit, offset, after, fields)
+    
+    def filter_motions(self, court=None, judge=None, motion_type=None, start_date=None, end_date=None, limit=100, offset=0, after=None, fields=None):
+        """Filter motions by various criteria"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            conditions, params = self._filter_conditions(cursor, court, judge, motion_type, start_date, end_date)
+            return self._fetch_page(cursor, conditions, params, limit, offset, after, fields)
+    
+    def iter_motions(self, court=None, judge=None, motion_type=None, start_date=None, end_date=None, fields=None):
+        """Yield every motion matching the filter_motions criteria, newest first, in constant memory
+        
+        Rows are read from one open statement in batches of EXPORT_BATCH_SIZE,
+        so the export sees a single consistent snapshot. The pooled connection
+        is held until the generator is exhausted or closed.
+        """
+        fields = LIST_VIEWS["export"] if fields is None else fields
+        unknown = [field for field in fields if field not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        columns = ["id"] + [field for field in fields if field != "id"]
+        select_list = ", ".join(LIST_FIELDS[field] for field in columns if LIST_FIELDS[field])
+        return self._iter_motion_rows(select_list, fields, court, judge, motion_type, start_date, end_date)
+    
+    def _iter_motion_rows(self, select_list, fields, court, judge, motion_type, start_date, end_date):
+        """Generator behind iter_motions, so argument errors surface before streaming starts"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            conditions, params = self._filter_conditions(cursor, court, judge, motion_type, start_date, end_date)
+            cursor.execute(
+                f"SELECT {select_list} FROM motions WHERE {' AND '.join(conditions) or '1=1'} ORDER BY order_date DESC, id DESC",
+                params
+            )
             
-            for date_str in date_series:
+            while True:
+                motions = [dict(row) for row in cursor.fetchmany(EXPORT_BATCH_SIZE)]
+                if not motions:
+                    return
+                if "parties" in fields:
+                    self._attach_parties(conn.cursor(), motions)
+                for motion in motions:
+                    if "id" not in fields:
+                        del motion["id"]
+                    yield motion
+    
+    def iter_analytics_columns(self):
+        """Yield the raw columns of the analytics snapshot, all read in one transaction
+        
+        Yields ("generation", n), ("motion_types", names), ("names", (dimension,
+        {id: name})) for each name dimension, then ("motions", rows) batches of
+        (id, judge_id, court_id, motion type index, order day) in any order and
+        ("law_firms", rows) batches of (motion_id, law_firm_id). Missing ids and
+        unreadable dates are -1; order days count from 1970-01-01.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # One read transaction, so every column comes from the same state of the data
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute("SELECT generation FROM data_generation WHERE id = 1")
+                yield "generation", cursor.fetchone()["generation"]
+                
+                cursor.execute("SELECT DISTINCT motion_type FROM motions WHERE motion_type IS NOT NULL ORDER BY motion_type")
+                motion_types = [row["motion_type"] for row in cursor.fetchall()]
+                yield "motion_types", motion_types
+                
+                for dimension, (dimension_table, _, _, _) in NAME_DIMENSIONS.items():
+                    cursor.execute(f"SELECT id, name FROM {dimension_table}")
+                    yield "names", (dimension, {row["id"]: row["name"] for row in cursor.fetchall()})
+                
+                # Plain tuples for the bulk reads, which go straight into arrays
+                cursor.row_factory = None
+                type_index = " ".join("WHEN ? THEN ?" for _ in motion_types)
+                cursor.execute(
+                    f'''
+                    SELECT id, COALESCE(judge_id, -1), COALESCE(court_id, -1),
+                           {f"CASE motion_type {type_index} ELSE -1 END" if motion_types else "-1"},
+                           COALESCE(CAST(julianday(order_date) - 2440587.5 AS INTEGER), -1)
+                    FROM motions
+                    ''',
+                    [value for index, motion_type in enumerate(motion_types) for value in (motion_type, index)]
+                )
+                while True:
+                    rows = cursor.fetchmany(ANALYTICS_BATCH_SIZE)
+                    if not rows:
+                        break
+                    yield "motions", rows
+                
                 cursor.execute(
-                    "SELECT COUNT(*) as count FROM motions WHERE order_date = ?",
-                    (date_str,)
+                    '''
+                    SELECT p.motion_id, a.law_firm_id
+                    FROM attorneys a JOIN parties p ON p.id = a.party_id
+                    WHERE a.law_firm_id IS NOT NULL
+                    '''
                 )
-                count = cursor.fetchone()["count"]
-                results.append({
-                    "date": date_str,
-                    "count": count
-                })
+                while True:
+                    rows = cursor.fetchmany(ANALYTICS_BATCH_SIZE)
+                    if not rows:
+                        break
+                    yield "law_firms", rows
+            finally:
+                conn.rollback()
+    
+    def find_dimension_id(self, dimension, name):
+        """Id of the judge, court or law firm a name normalizes or is aliased to, or None"""
+        with self._get_connection() as conn:
+            return _find_dimension_id(conn.cursor(), dimension, name)
+    
+    def _filter_conditions(self, cursor, court=None, judge=None, motion_type=None, start_date=None, end_date=None):
+        """Build the WHERE conditions and parameters shared by filtered listings and exports"""
+        conditions = []
+        params = []
+        
+        if court:
+            conditions.append("court_id = ?")
+            params.append(_find_dimension_id(cursor, "court", court))
+        
+        if judge:
+            # An exact or aliased name selects one judge; anything else matches by substring
+            judge_id = _find_dimension_id(cursor, "judge", judge)
+            if judge_id is not None:
+                conditions.append("judge_id = ?")
+                params.append(judge_id)
+            else:
+                # Unary + keeps the judge_id index out, so pages come in order from the order_date index
+                conditions.append("+judge_id IN (SELECT id FROM judges WHERE name_key LIKE ?)")
+                params.append(f"%{name_key('judge', judge)}%")
+        
+        if motion_type:
+            conditions.append("motion_type LIKE ?")
+            params.append(f"%{motion_type}%")
+        
+        if start_date:
+            conditions.append("order_date >= ?")
+            params.append(start_date)
+        
+        if end_date:
+            conditions.append("order_date <= ?")
+            params.append(end_date)
+        
+        return conditions, params
+    
+    def _fetch_page(self, cursor, conditions, params, limit, offset=0, after=None, fields=None):
+        """Select one page of motions ordered by (order_date, id) descending, with NULL dates last"""
+        fields = list(LIST_FIELDS) if fields is None else fields
+        unknown = [field for field in fields if field not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        # id and order_date are always returned so the page can produce a cursor
+        columns = ["id", "order_date"] + [field for field in fields if field not in ("id", "order_date")]
+        select_list = ", ".join(LIST_FIELDS[field] for field in columns if LIST_FIELDS[field])
+        
+        def select(extra_conditions, extra_params, order_by, page_limit, page_offset=0):
+            where = " AND ".join(conditions + extra_conditions) or "1=1"
+            cursor.execute(
+                f"SELECT {select_list} FROM motions WHERE {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                params + extra_params + [page_limit, page_offset]
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        
+        if after is None:
+            return select([], [], "order_date DESC, id DESC", limit, offset)
+        
+        # Keyset paging: dated rows strictly before the cursor, then the undated tail.
+        # Each half is a single range scan on the (order_date, id) index.
+        order_date, last_id = after
+        motions = []
+        if order_date is not None:
+            motions = select(["(order_date, id) < (?, ?)"], [order_date, last_id], "order_date DESC, id DESC", limit)
+        
+        if len(motions) < limit:
+            undated = ["order_date IS NULL"]
+            undated_params = []
+            if order_date is None:
+                undated.append("id < ?")
+                undated_params.append(last_id)
+            motions += select(undated, undated_params, "id DESC", limit - len(motions))
+        
+        if "parties" in fields:
+            self._attach_parties(cursor, motions)
+        return motions
+    
+    def _attach_parties(self, cursor, motions):
+        """Load parties and attorneys for a page of motions in batched queries"""
+        motion_ids = [motion["id"] for motion in motions]
+        parties_by_motion = {motion_id: [] for motion_id in motion_ids}
+        parties_by_id = {}
+        
+        for batch in _batches(motion_ids):
+            placeholders = ",".join("?" * len(batch))
+            
+            # Ordered along idx_parties_motion_id, which keeps each motion's parties in id order
+            cursor.execute(
+                f"SELECT * FROM parties WHERE motion_id IN ({placeholders}) ORDER BY motion_id, id",
+                batch
+            )
+            for party_row in cursor.fetchall():
+                party = dict(party_row)
+                party["attorneys"] = []
+                parties_by_motion[party["motion_id"]].append(party)
+                parties_by_id[party["id"]] = party
             
-            return results
+            cursor.execute(
+                f'''
+                SELECT attorneys.* FROM attorneys
+                JOIN parties ON parties.id = attorneys.party_id
+                WHERE parties.motion_id IN ({placeholders})
+                ORDER BY parties.motion_id, parties.id, attorneys.id
+                ''',
+                batch
+            )
+            for attorney_row in cursor.fetchall():
+                parties_by_id[attorney_row["party_id"]]["attorneys"].append(dict(attorney_row))
+        
+        for motion in motions:
+            motion["parties"] = parties_by_motion[motion["id"]]
+        
+        return motions
     
-    def get_law_firms(self, limit=50):
-        """Get most active law firms"""
+    def search_motions(self, text, limit=20, offset=0):
+        """Full-text search over case names, parties, law firms, summaries and order text, best matches first"""
+        query = _search_query(text)
+        if not query:
+            return []
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 '''
-                SELECT law_firm, COUNT(*) as count
-                FROM attorneys
-                GROUP BY law_firm
-                ORDER BY count DESC
-                LIMIT ?
+                SELECT
+                    motions.id, motions.case_name, motions.judge, motions.court,
+                    motions.docket_number, motions.motion_type, motions.order_date,
+                    motions_fts.rank AS score,
+                    snippet(motions_fts, -1, '<mark>', '</mark>', '...', 16) AS snippet
+                FROM motions_fts
+                JOIN motions ON motions.id = motions_fts.rowid
+                WHERE motions_fts MATCH ?
+                ORDER BY motions_fts.rank
+                LIMIT ? OFFSET ?
                 ''',
-                (limit,)
+                (query, limit, offset)
             )
-            return [dict(row) for row in cursor.fetchall()]
\ No newline at end of file
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_stats(self):
+        """Get all dashboard statistics from one consistent snapshot on a single connection"""
+        with self._get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                return {
+                    "total_motions": self.count_motions(),
+                    "by_court": self.count_motions_by_court(),
+                    "by_judge": self.count_motions_by_judge(),
+                    "by_motion_type": self.count_motions_by_type(),
+                    "recent_trend": self.get_motion_trend()
+                }
+            finally:
+                conn.rollback()
+    
+    def count_motions(self):
+        """Count total number of tracked motions"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT count FROM motion_rollups WHERE dimension = 'total'")
+            row = cursor.fetchone()
+            return row["count"] if row else 0
+    
+    def _read_rollup(self, dimension, label, limit=-1):
+        """Read one rollup dimension as [{label: key, "count": n}] in descending count order
+        
+        Keys of the name dimensions are ids, returned as their canonical names.
+        """
+        if dimension in NAME_DIMENSIONS:
+            dimension_table = NAME_DIMENSIONS[dimension][0]
+            query = f'''
+                SELECT {dimension_table}.name AS {label}, motion_rollups.count FROM motion_rollups
+                JOIN {dimension_table} ON {dimension_table}.id = motion_rollups.key
+                WHERE motion_rollups.dimension = ? ORDER BY motion_rollups.count DESC LIMIT ?
+            '''
+        else:
+            query = f"SELECT key AS {label}, count FROM motion_rollups WHERE dimension = ? ORDER BY count DESC LIMIT ?"
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (dimension, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def count_motions_by_court(self):
+        """Count motions by court"""
+        return self._read_rollup("court", "court")
+    
+    def count_motions_by_judge(self, limit=20):
+        """Count motions by judge"""
+        return self._read_rollup("judge", "judge", limit)
+    
+    def count_motions_by_type(self):
+        """Count motions by type"""
+        return self._read_rollup("motion_type", "motion_type")
+    
+    def get_motion_trend(self, days=30, bucket="day", start_date=None, end_date=None):
+        """Get motion counts per day, week or month over a date window from the daily rollup"""
+        if bucket not in TREND_BUCKETS:
+            raise ValueError(f"Unknown trend bucket: {bucket}")
+        
+        # Calculate date range (defaults to the past X days)
+        end = datetime.date.fromisoformat(end_date) if end_date else datetime.date.today()
+        start = datetime.date.fromisoformat(start_date) if start_date else end - datetime.timedelta(days=days)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT key, count FROM motion_rollups WHERE dimension = 'day' AND key >= ? AND key < ?",
+                (start.isoformat(), (end + datetime.timedelta(days=1)).isoformat())
+            )
+            # At most one row per day, so summing into buckets here is cheaper than a grouped sort in SQL
+            counts = {}
+            for row in cursor.fetchall():
+                bucket_start = _bucket_start(datetime.date.fromisoformat(row["key"]), bucket).isoformat()
+                counts[bucket_start] = counts.get(bucket_start, 0) + row["count"]
+        
+        # Zero-fill every bucket in the window
+        results = []
+        current = _bucket_start(start, bucket)
+        while current <= end:
+            date_str = current.isoformat()
+            results.append({
+                "date": date_str,
+                "count": counts.get(date_str, 0)
+            })
+            current = _next_bucket(current, bucket)
+        
+        return results
+    
+    def get_law_firms(self, limit=50):
+        """Get most active law firms"""
+        return self._read_rollup("law_firm", "law_firm", limit)
@@ -0,0 +1,165 @@
+import os
+import time
+import zlib
+import codecs
+import hashlib
+import tempfile
+from database import ConnectionPool
+
+# Size of the chunks documents are streamed and decompressed in
+CHUNK_SIZE = 64 * 1024
+
+# Characters of each order's text added to the full-text search index
+INDEX_TEXT_CHARS = 100000
+
+
+def text_encoding(content_type):
+    """Charset to decode a document with, or None if its content type is not text
+    
+    Documents served without a Content-Type are taken to be UTF-8 text. PDFs
+    and other binary formats are not decoded; there is no text extraction.
+    """
+    if not content_type:
+        return "utf-8"
+    
+    media_type, _, params = content_type.partition(";")
+    if not media_type.strip().lower().startswith("text/"):
+        return None
+    
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            try:
+                return codecs.lookup(value.strip().strip('"')).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+class DocumentStore:
+    """Content-addressed store of zlib-compressed order documents on disk
+    
+    Blobs live under root as objects/<hash[:2]>/<hash>.z, named by the SHA-256
+    of the uncompressed document, so identical documents are stored once. A
+    small SQLite index next to them maps Lex Machina document ids to blobs.
+    Documents are compressed and read back in chunks, never held in memory whole.
+    """
+    
+    def __init__(self, root="documents", compression_level=6):
+        self.root = root
+        self.compression_level = compression_level
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.pool = ConnectionPool(os.path.join(root, "index.db"))
+        
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                document_id TEXT PRIMARY KEY,
+                content_hash TEXT,
+                size INTEGER,
+                compressed_size INTEGER,
+                content_type TEXT,
+                fetched_at REAL
+            )
+            ''')
+            conn.commit()
+    
+    def _blob_path(self, content_hash):
+        return os.path.join(self.root, "objects", content_hash[:2], f"{content_hash}.z")
+    
+    def get(self, document_id):
+        """Return the index entry for a document id, or None if it has not been stored"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM documents WHERE document_id = ?", (document_id,)).fetchone()
+        if not row or not os.path.exists(self._blob_path(row["content_hash"])):
+            return None
+        return dict(row)
+    
+    def put(self, document_id, chunks, content_type=None):
+        """Compress a stream of byte chunks into the store and index it under document_id"""
+        digest = hashlib.sha256()
+        compressor = zlib.compressobj(self.compression_level)
+        size = 0
+        
+        # Compress into a temporary file first, since the blob name is only known at the end
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(self.root, "objects"), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp.write(compressor.compress(chunk))
+                temp.write(compressor.flush())
+                compressed_size = temp.tell()
+            
+            content_hash = digest.hexdigest()
+            path = self._blob_path(content_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        entry = {
+            "document_id": document_id,
+            "content_hash": content_hash,
+            "size": size,
+            "compressed_size": compressed_size,
+            "content_type": content_type,
+            "fetched_at": time.time()
+        }
+        with self.pool.connection() as conn:
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO documents (document_id, content_hash, size, compressed_size, content_type, fetched_at)
+                VALUES (:document_id, :content_hash, :size, :compressed_size, :content_type, :fetched_at)
+                ''',
+                entry
+            )
+            conn.commit()
+        return entry
+    
+    def iter_text(self, content_hash, encoding="utf-8"):
+        """Yield a stored text document's text in chunks as it is decompressed"""
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        
+        with open(self._blob_path(content_hash), "rb") as blob:
+            while True:
+                chunk = blob.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = decoder.decode(decompressor.decompress(chunk))
+                if text:
+                    yield text
+        
+        text = decoder.decode(decompressor.flush(), final=True)
+        if text:
+            yield text
+    
+    def read_text(self, content_hash, limit=None, encoding="utf-8"):
+        """Read a stored text document's text, stopping after limit characters if given
+        
+        Only meaningful for text documents; see text_encoding for the encoding
+        of a stored entry.
+        """
+        parts = []
+        length = 0
+        for text in self.iter_text(content_hash, encoding):
+            parts.append(text)
+            length += len(text)
+            if limit is not None and length >= limit:
+                break
+        text = "".join(parts)
+        return text[:limit] if limit is not None else text
+    
+    def stats(self):
+        """Count stored documents and their raw and compressed sizes"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS documents, SUM(size) AS size, SUM(compressed_size) AS compressed_size FROM documents"
+            ).fetchone()
+        return {"documents": row["documents"], "size": row["size"] or 0, "compressed_size": row["compressed_size"] or 0}
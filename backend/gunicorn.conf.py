@@ -0,0 +1,7 @@
+# Loaded by gunicorn from the working directory, as in the Procfile
+
+
+def post_worker_init(worker):
+    """Run the daily refresh scheduler in each web worker"""
+    from app import start_scheduler
+    start_scheduler()
@@ -0,0 +1,133 @@
+import time
+import threading
+from database import ConnectionPool
+
+
+class ResponseCache:
+    """Disk-backed cache of HTTP GET responses with TTL, LRU eviction and revalidation metadata"""
+    
+    # How many stores happen between eviction passes
+    EVICT_EVERY = 100
+    
+    # How many reads are buffered before their access times are written in one batch
+    ACCESS_FLUSH_EVERY = 100
+    
+    def __init__(self, path="http_cache.db", ttl=6 * 3600, max_entries=20000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pool = ConnectionPool(path)
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._accessed = {}
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL
+            )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+            conn.commit()
+    
+    def get(self, url):
+        """Return the cached entry for a URL with a 'fresh' flag, or None
+        
+        Reads stay reads: the access time used for eviction is buffered and
+        written with the next batch, so a process exiting between flushes
+        loses only some recency.
+        """
+        now = time.time()
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        
+        with self._lock:
+            self._accessed[url] = now
+            flush = len(self._accessed) >= self.ACCESS_FLUSH_EVERY
+        if flush:
+            self.flush_access_times()
+        
+        entry = dict(row)
+        entry["fresh"] = now - entry["fetched_at"] < self.ttl
+        return entry
+    
+    def conditional_headers(self, entry):
+        """Validators for revalidating a stale entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def store(self, url, response):
+        """Cache a successful response along with its validators"""
+        now = time.time()
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now)
+            )
+            conn.commit()
+        
+        self._record("misses")
+        with self._lock:
+            self._stores += 1
+            evict = self._stores % self.EVICT_EVERY == 0
+        if evict:
+            self.evict()
+    
+    def mark_revalidated(self, url):
+        """Reset an entry's TTL after the server confirmed it is unchanged (304)"""
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        self._record("revalidated")
+    
+    def mark_hit(self):
+        self._record("hits")
+    
+    def flush_access_times(self):
+        """Write the buffered access times of entries read since the last flush"""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return
+        
+        with self.pool.connection() as conn:
+            conn.executemany(
+                "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE url = ?",
+                [(accessed_at, url) for url, accessed_at in accessed.items()]
+            )
+            conn.commit()
+    
+    def evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        self.flush_access_times()
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE url IN (SELECT url FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                conn.commit()
+    
+    def stats(self):
+        """Hit, revalidation and miss counts plus the overall hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+        total = sum(stats.values())
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / total if total else 0.0
+        return stats
+    
+    def _record(self, name):
+        with self._lock:
+            self._stats[name] += 1
@@ -0,0 +1,82 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once cancellation has been requested"""
+
+
+class JobContext:
+    """Handle passed to a running job for reporting progress and observing cancellation"""
+    
+    def __init__(self, db, job_id, queued=lambda: ()):
+        self.db = db
+        self.job_id = job_id
+        self.queued = queued
+    
+    def progress(self, values):
+        """Record progress (and a heartbeat), raising JobCancelled if the job was cancelled
+        
+        Jobs queued behind this one in the same process get a heartbeat too,
+        so they are not failed as stale or skipped when coalescing.
+        """
+        if self.db.update_job_progress(self.job_id, json.dumps(values), queued_ids=self.queued()):
+            raise JobCancelled()
+
+
+class JobQueue:
+    """Background jobs persisted in the jobs table, run on a local worker pool
+    
+    Submitting a job whose kind and parameters match one already queued or
+    running returns the existing job instead of starting a duplicate.
+    """
+    
+    def __init__(self, db, max_workers=1, stale_after=600):
+        self.db = db
+        self.stale_after = stale_after
+        self._handlers = {}
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        
+        # Jobs whose owning process died never finish on their own
+        self.db.fail_stale_jobs(stale_after)
+    
+    def register(self, kind, handler):
+        """Register handler(params, context) as the runner for a kind of job"""
+        self._handlers[kind] = handler
+    
+    def submit(self, kind, params):
+        """Queue a job, returning (job_id, created) where created is False for a coalesced duplicate"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        
+        job_id, created = self.db.create_job(kind, json.dumps(params, sort_keys=True), self.stale_after)
+        if created:
+            with self._lock:
+                self._queued.add(job_id)
+            self._executor.submit(self._run, job_id, kind, params)
+        return job_id, created
+    
+    def cancel(self, job_id):
+        """Request cancellation; the job stops at its next progress report"""
+        return self.db.request_job_cancel(job_id)
+    
+    def _queued_ids(self):
+        with self._lock:
+            return list(self._queued)
+    
+    def _run(self, job_id, kind, params):
+        with self._lock:
+            self._queued.discard(job_id)
+        if not self.db.start_job(job_id):
+            return
+        
+        try:
+            result = self._handlers[kind](params, JobContext(self.db, job_id, self._queued_ids))
+            self.db.finish_job(job_id, "succeeded", result=json.dumps(result))
+        except JobCancelled:
+            self.db.finish_job(job_id, "cancelled")
+        except Exception as e:
+            self.db.finish_job(job_id, "failed", error=str(e))
@@ -0,0 +1,561 @@
+import json
+import time
+import random
+import datetime
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+from summaries import SummaryEngine, MAX_ORDER_CHARS
+from documents import CHUNK_SIZE, INDEX_TEXT_CHARS, text_encoding
+
+# Responses worth retrying, and the subset that means the API wants less traffic
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+OVERLOAD_STATUSES = {429, 503}
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate to each host"""
+    
+    def __init__(self, requests_per_second=None, burst=None):
+        self.rate = requests_per_second
+        self.burst = burst or max(1, int(requests_per_second or 1))
+        self._lock = threading.Lock()
+        self._buckets = {}
+    
+    def acquire(self, url):
+        """Block until a request to the host of the given URL is allowed"""
+        if not self.rate:
+            return
+        
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD limit on concurrent requests, shrunk when the API signals overload
+    
+    Each successful response raises the limit by about one request per limit's
+    worth of successes (additive increase), and a 429 or 503 cuts it by
+    decrease (multiplicative decrease). Only requests started after the last
+    cut can cut it again, so a burst of rejections for requests sent under the
+    old limit counts once. A Retry-After on an overload response holds back
+    every new request until it has passed.
+    """
+    
+    def __init__(self, maximum, minimum=1, decrease=0.5):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease = decrease
+        self.limit = float(maximum)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+    
+    def acquire(self):
+        """Block until a request may start, returning its start time for release()"""
+        with self._condition:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                elif self._in_flight < int(self.limit):
+                    self._in_flight += 1
+                    return time.monotonic()
+                else:
+                    self._condition.wait()
+    
+    def release(self, started, status=None, retry_after=None):
+        """Finish a request, adjusting the limit by its response status (None if no response arrived)"""
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if status in OVERLOAD_STATUSES:
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif status is not None and status < 500:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fails requests fast while the API keeps failing
+    
+    After failure_threshold consecutive failures the circuit opens and
+    requests raise CircuitOpenError for reset_timeout seconds. Then a single
+    trial request is let through: success closes the circuit, failure opens
+    it again.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+        self._lock = threading.Lock()
+    
+    def check(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Lex Machina API circuit open after {self._failures} consecutive failures")
+            # Half open: one trial at a time, with another allowed if the last one never reported back
+            if self._trial_at is not None and now - self._trial_at < self.reset_timeout:
+                raise CircuitOpenError("Lex Machina API circuit half open, waiting on a trial request")
+            self._trial_at = now
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+class LexMachinaAPI:
+    """Client for the Lex Machina API"""
+    
+    TOKEN_URL = "https://api.lexmachina.com/oauth2/token"
+    QUERY_URL = "https://api.lexmachina.com/query-district-cases"
+    CASE_DETAIL_URL = "https://api.lexmachina.com/district-cases/{}"
+    DOCUMENT_URL = "https://api.lexmachina.com/documents/{}"
+    PAGE_SIZE = 100
+    
+    def __init__(self, client_id, client_secret, max_workers=8, requests_per_second=None, summarizer=None,
+                 response_cache=None, document_store=None, max_retries=4, backoff_base=0.5, backoff_cap=30,
+                 timeout=(10, 60)):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.access_token = None
+        self.token_expiry = None
+        self._token_lock = threading.Lock()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(requests_per_second)
+        # Case workers plus the page prefetcher can have a request in flight at once
+        self.concurrency = AdaptiveConcurrencyLimit(self.max_workers + 1)
+        self.circuit_breaker = CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.summarizer = summarizer or SummaryEngine()
+        self.response_cache = response_cache
+        self.document_store = document_store
+        
+        # One keep-alive session shared by all workers, with a connection per worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers + 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def _request(self, method, url, endpoint, authorize=True, **kwargs):
+        """Send a request to the API, retrying transient failures, and return the final response
+        
+        Connection errors, timeouts, 429s and 5xx responses are retried up to
+        max_retries times with jittered exponential backoff, waiting at least as
+        long as a Retry-After header asks. A 401 fetches a new access token and
+        retries once. The response returned may still carry an error status for
+        the caller to handle. Latency is recorded under endpoint.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        headers = dict(kwargs.pop("headers", None) or {})
+        attempt = 0
+        token_renewed = False
+        
+        while True:
+            if authorize:
+                token = self.get_access_token()
+                headers["Authorization"] = f"Bearer {token}"
+            self.circuit_breaker.check()
+            self.rate_limiter.acquire(url)
+            
+            started = self.concurrency.acquire()
+            response = error = None
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            finally:
+                status = response.status_code if response is not None else None
+                retry_after = self._retry_after(response)
+                self.concurrency.release(started, status, retry_after)
+            
+            if metrics.enabled:
+                metrics.record_external("lexmachina", endpoint, status or "error", time.perf_counter() - start)
+            
+            if error is None and status not in RETRY_STATUSES:
+                # Client errors are the request's fault, not a sign the API is down
+                self.circuit_breaker.record_success()
+                if status == 401 and authorize and not token_renewed:
+                    response.close()
+                    self._invalidate_token(token)
+                    token_renewed = True
+                    continue
+                return response
+            
+            # A 429 means the API is up but throttling; only other failures count toward opening the circuit
+            if status != 429:
+                self.circuit_breaker.record_failure()
+            if attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+            
+            if response is not None:
+                response.close()
+            delay = max(retry_after or 0, random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt)))
+            attempt += 1
+            if metrics.enabled:
+                metrics.EXTERNAL_REQUEST_RETRIES.inc("lexmachina", endpoint, str(status or "error"))
+            time.sleep(delay)
+    
+    @staticmethod
+    def _retry_after(response):
+        """Seconds to wait from a response's Retry-After header, or None"""
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.datetime.now(retry_at.tzinfo)).total_seconds())
+    
+    def _token_valid(self):
+        return self.access_token and self.token_expiry and datetime.datetime.now() < self.token_expiry
+    
+    def _invalidate_token(self, token):
+        """Drop a token the API rejected, unless another thread has already replaced it"""
+        with self._token_lock:
+            if self.access_token == token:
+                self.access_token = None
+    
+    def get_access_token(self):
+        """Get OAuth2 token from Lex Machina API, refreshing it at most once at a time across threads"""
+        if self._token_valid():
+            return self.access_token
+        
+        with self._token_lock:
+            # Another thread may have fetched a new token while this one waited
+            if self._token_valid():
+                return self.access_token
+            
+            response = self._request(
+                "POST", self.TOKEN_URL, "token", authorize=False,
+                data={"client_id": self.client_id, "client_secret": self.client_secret},
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+            
+            if response.status_code == 200:
+                token_data = response.json()
+                # Set expiry time (typically 1 hour, but subtract 5 minutes to be safe)
+                self.token_expiry = datetime.datetime.now() + datetime.timedelta(seconds=token_data.get("expires_in", 3600) - 300)
+                self.access_token = token_data["access_token"]
+                return self.access_token
+            else:
+                raise Exception(f"Failed to get access token: {response.status_code} - {response.text}")
+    
+    def search_denied_motions(self, motion_type=None, days_back=1, start_date=None, end_date=None,
+                              event_types=None, skip_case=None):
+        """Search for denied motions to dismiss or summary judgment, yielding each as it is processed
+        
+        An explicit start_date/end_date overrides days_back, and event_types
+        overrides the types derived from motion_type. skip_case, if given, is
+        called from the worker threads with each case id and its fetched
+        details, and returns True to skip processing that case.
+        """
+        # Calculate date range
+        end_date = end_date or datetime.datetime.now()
+        start_date = start_date or end_date - datetime.timedelta(days=days_back)
+        
+        # Determine event types to search for, unless given explicitly
+        if not event_types:
+            event_types = []
+            if motion_type:
+                if "dismiss" in motion_type.lower():
+                    event_types.append("Dismiss (Contested)")
+                elif "summary judgment" in motion_type.lower():
+                    event_types.append("Summary Judgment (Contested)")
+            else:
+                event_types = ["Dismiss (Contested)", "Summary Judgment (Contested)"]
+        
+        # Build query payload (page and pageSize are filled in per request)
+        payload = {
+            "caseStatus": "Open",
+            "events": {
+                "includeEventTypes": event_types,
+                "date": {
+                    "onOrAfter": start_date.strftime("%Y-%m-%d"),
+                    "onOrBefore": end_date.strftime("%Y-%m-%d")
+                },
+                "includeEventOutcomes": ["Denied"]
+            }
+        }
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="lexmachina") as executor:
+            for case_refs in self._iter_result_pages(payload):
+                case_ids = [
+                    case_ref.get("districtCaseId")
+                    for case_ref in case_refs
+                    if case_ref.get("districtCaseId")
+                ]
+                
+                # Fetch and process case details concurrently, keeping query order
+                for processed_case in self._fetch_cases(executor, case_ids, motion_type, skip_case):
+                    if processed_case:
+                        yield processed_case
+    
+    def _query_page(self, payload, page):
+        """Execute the case query for a single page of results"""
+        page_payload = dict(payload, page=page, pageSize=self.PAGE_SIZE)
+        response = self._request("POST", self.QUERY_URL, "query", json=page_payload)
+        
+        if response.status_code == 200:
+            return response.json().get("cases", [])
+        else:
+            raise Exception(f"API request failed with status {response.status_code}: {response.text}")
+    
+    def _iter_result_pages(self, payload):
+        """Walk every page of query results, prefetching the next page while the current one is processed"""
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="lexmachina-pages") as prefetcher:
+            page = 1
+            pending = prefetcher.submit(self._query_page, payload, page)
+            
+            while pending:
+                case_refs = pending.result()
+                
+                # A short page means there is nothing left to fetch
+                if len(case_refs) < self.PAGE_SIZE:
+                    pending = None
+                else:
+                    page += 1
+                    pending = prefetcher.submit(self._query_page, payload, page)
+                
+                if case_refs:
+                    yield case_refs
+    
+    def get_case_details(self, case_id):
+        """Get detailed case information"""
+        headers = {}
+        url = self.CASE_DETAIL_URL.format(case_id)
+        
+        # Serve from the response cache while fresh, otherwise revalidate with its validators
+        cached = self.response_cache.get(url) if self.response_cache else None
+        if cached and cached["fresh"]:
+            self.response_cache.mark_hit()
+            return json.loads(cached["body"])
+        if cached:
+            headers.update(self.response_cache.conditional_headers(cached))
+        
+        response = self._request("GET", url, "case", headers=headers)
+        
+        if response.status_code == 304 and cached:
+            self.response_cache.mark_revalidated(url)
+            return json.loads(cached["body"])
+        elif response.status_code == 200:
+            if self.response_cache:
+                self.response_cache.store(url, response)
+            return response.json()
+        else:
+            raise Exception(f"Failed to get case details: {response.status_code} - {response.text}")
+    
+    def get_order_document(self, document_id):
+        """Return the stored copy of an order document, downloading it into the document store if needed
+        
+        The download is streamed straight into the compressed store. Returns
+        None when the document is not available from the API.
+        """
+        entry = self.document_store.get(document_id)
+        if entry:
+            return entry
+        
+        url = self.DOCUMENT_URL.format(document_id)
+        with self._request("GET", url, "document", stream=True) as response:
+            if response.status_code == 404:
+                return None
+            if response.status_code != 200:
+                raise Exception(f"Failed to get document {document_id}: {response.status_code} - {response.text}")
+            
+            return self.document_store.put(
+                document_id,
+                response.iter_content(chunk_size=CHUNK_SIZE),
+                content_type=response.headers.get("Content-Type")
+            )
+    
+    def _fetch_case(self, case_id, motion_type=None, skip_case=None):
+        """Fetch a single case and process it into a motion record tagged with its case id"""
+        case_details = self.get_case_details(case_id)
+        if skip_case and skip_case(case_id, case_details):
+            return None
+        
+        motion = self._process_case(case_details, motion_type)
+        if motion:
+            motion["case_id"] = str(case_id)
+        return motion
+    
+    def _fetch_cases(self, executor, case_ids, motion_type=None, skip_case=None):
+        """Fetch and process cases on the worker pool, yielding results in input order"""
+        if self.max_workers == 1:
+            return (self._fetch_case(case_id, motion_type, skip_case) for case_id in case_ids)
+        
+        return executor.map(lambda case_id: self._fetch_case(case_id, motion_type, skip_case), case_ids)
+    
+    def _process_case(self, case, motion_type=None):
+        """Process a case to extract relevant information"""
+        # Extract case name
+        case_name = case.get("caseName", "Unknown Case")
+        
+        # Extract court information
+        court = case.get("court", {}).get("name", "Unknown Court")
+        
+        # Extract judge information
+        judge = case.get("judge", {}).get("name", "Unknown Judge")
+        
+        # Extract docket number
+        docket_number = case.get("docketNumber", "Unknown Docket")
+        
+        # Extract parties and their representation
+        parties = []
+        for party in case.get("parties", []):
+            party_name = party.get("name", "Unknown Party")
+            party_role = party.get("role", "Unknown Role")
+            
+            attorneys = []
+            # Find law firm representations for this party
+            for rep in case.get("lawFirmRepresentations", []):
+                if rep.get("side") == party_role:
+                    firm = rep.get("lawFirm", {}).get("name", "Unknown Firm")
+                    
+                    for attorney in rep.get("attorneys", []):
+                        attorney_name = attorney.get("name", "Unknown Attorney")
+                        attorneys.append({
+                            "name": attorney_name,
+                            "firm": firm
+                        })
+            
+            parties.append({
+                "type": party_role,
+                "name": party_name,
+                "attorneys": attorneys
+            })
+        
+        # Find the relevant motion and order information
+        order_info = None
+        order_text = None
+        order_document = None
+        
+        # Look for denied motions in events
+        for event in case.get("events", []):
+            event_type = event.get("type", "")
+            event_outcome = event.get("outcome", "")
+            
+            is_relevant_motion = False
+            determined_motion_type = ""
+            
+            if "Dismiss" in event_type and "Contested" in event_type and "Denied" in event_outcome:
+                is_relevant_motion = True
+                determined_motion_type = "motion to dismiss denied"
+            elif "Summary Judgment" in event_type and "Contested" in event_type and "Denied" in event_outcome:
+                is_relevant_motion = True
+                determined_motion_type = "motion for summary judgment denied"
+            
+            # If we have a specific motion type filter, check it
+            if motion_type and determined_motion_type != motion_type:
+                continue
+                
+            if is_relevant_motion:
+                event_date = event.get("date")
+                event_description = f"{event_type} - {event_outcome}"
+                document_id = event.get("documentId")
+                
+                # Get the order text if we have a document ID; orders that are
+                # not text (e.g. PDFs) are stored but summarized from the description
+                if document_id and self.document_store:
+                    order_document = self.get_order_document(document_id)
+                    encoding = text_encoding(order_document["content_type"]) if order_document else None
+                    if encoding:
+                        # Only the part of the order that is summarized and indexed is decompressed
+                        order_text = self.document_store.read_text(
+                            order_document["content_hash"],
+                            limit=max(MAX_ORDER_CHARS, INDEX_TEXT_CHARS),
+                            encoding=encoding
+                        )
+                if document_id and order_text is None:
+                    order_text = f"Order denying {determined_motion_type}. Document ID: {document_id}"
+                
+                order_info = {
+                    "date": event_date,
+                    "description": event_description,
+                    "document_number": document_id
+                }
+                
+                # Stop after finding the first relevant motion
+                break
+        
+        if not order_info:
+            return None
+        
+        # Generate AI summary of the order
+        summary = self._generate_summary(order_text or f"Order denying motion in case {case_name}")
+        
+        motion = {
+            "case_name": case_name,
+            "judge": judge,
+            "court": court,
+            "docket_number": docket_number,
+            "parties": parties,
+            "motion_type": motion_type or "order denial",
+            "order_info": order_info,
+            "summary": summary
+        }
+        
+        if order_document:
+            order_info["content_hash"] = order_document["content_hash"]
+            order_info["size"] = order_document["size"]
+            if text_encoding(order_document["content_type"]):
+                # Indexed for search, but kept out of the stored motion row
+                motion["order_text"] = order_text[:INDEX_TEXT_CHARS]
+        
+        return motion
+    
+    def _generate_summary(self, order_text):
+        """Generate an AI summary of the court order"""
+        return self.summarizer.summarize(order_text)
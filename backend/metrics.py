@@ -0,0 +1,286 @@
+import time
+import sqlite3
+import threading
+
+# Set by configure(); every hook checks this first, so disabled metrics cost one attribute lookup
+enabled = False
+
+# Upper bounds, in seconds, of the default latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Bucket bounds for per-request SQL statement counts
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+# Bucket bounds, in seconds, for whole refresh runs
+REFRESH_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a value per combination of label values"""
+    
+    type = "counter"
+    
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Cumulative histogram of observations with a bucket set per combination of label values"""
+    
+    type = "histogram"
+    
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+    
+    def samples(self):
+        with self._lock:
+            series = {label_values: (list(counts), total, count) for label_values, (counts, total, count) in self._series.items()}
+        
+        names = self.labels + ("le",)
+        for label_values, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", _format_labels(names, label_values + (_format_value(bound),)), cumulative
+            yield f"{self.name}_bucket", _format_labels(names, label_values + ("+Inf",)), count
+            yield f"{self.name}_sum", _format_labels(self.labels, label_values), total
+            yield f"{self.name}_count", _format_labels(self.labels, label_values), count
+
+
+class Registry:
+    """Set of metrics rendered together in the Prometheus text exposition format"""
+    
+    def __init__(self):
+        self._metrics = []
+    
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_http_request_duration_seconds", "Time spent handling API requests",
+    ["route", "method", "status"]
+))
+HTTP_REQUEST_SQL_QUERIES = REGISTRY.register(Histogram(
+    "courtwatch_http_request_sql_queries", "SQL statements executed per API request",
+    ["route"], buckets=QUERY_COUNT_BUCKETS
+))
+HTTP_REQUEST_SQL_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_http_request_sql_seconds", "Time spent executing SQL per API request",
+    ["route"]
+))
+SQL_QUERY_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_sql_query_duration_seconds", "Time spent executing SQL statements, by leading keyword",
+    ["statement"]
+))
+EXTERNAL_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_external_request_duration_seconds", "Latency of outbound API requests until response headers",
+    ["service", "endpoint", "status"]
+))
+EXTERNAL_REQUEST_ERRORS = REGISTRY.register(Counter(
+    "courtwatch_external_request_errors_total", "Outbound API requests that failed or returned an error status",
+    ["service", "endpoint"]
+))
+EXTERNAL_REQUEST_RETRIES = REGISTRY.register(Counter(
+    "courtwatch_external_request_retries_total", "Outbound API requests retried, by the status that caused the retry",
+    ["service", "endpoint", "status"]
+))
+LLM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_llm_request_duration_seconds", "Latency of LLM completion calls",
+    ["model", "status"]
+))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "courtwatch_llm_errors_total", "LLM completion calls that raised an error",
+    ["model"]
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "courtwatch_llm_tokens_total", "Tokens used by LLM completion calls",
+    ["model", "type"]
+))
+REFRESH_RUNS = REGISTRY.register(Counter(
+    "courtwatch_refresh_runs_total", "Refresh runs by outcome",
+    ["status"]
+))
+REFRESH_SECONDS = REGISTRY.register(Histogram(
+    "courtwatch_refresh_duration_seconds", "Duration of refresh runs",
+    ["status"], buckets=REFRESH_BUCKETS
+))
+REFRESH_ITEMS = REGISTRY.register(Counter(
+    "courtwatch_refresh_items_total", "Motions found and work avoided by refresh runs",
+    ["kind"]
+))
+
+
+def configure(enable):
+    """Turn instrumentation on or off for this process"""
+    global enabled
+    enabled = bool(enable)
+
+
+class RequestProfile:
+    """SQL and outbound call time accumulated while handling one API request"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.timings = {}
+    
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+    
+    def server_timing(self, total):
+        """Server-Timing header value breaking the request's time down by component"""
+        parts = [f'sql;dur={self.sql_seconds * 1000:.2f};desc="{self.sql_queries} queries"']
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in sorted(self.timings.items()))
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_local = threading.local()
+
+
+def begin_request():
+    _local.profile = RequestProfile()
+    return _local.profile
+
+
+def end_request():
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    return profile
+
+
+def record_query(sql, seconds):
+    statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "EMPTY"
+    SQL_QUERY_SECONDS.observe(seconds, statement)
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.sql_queries += 1
+        profile.sql_seconds += seconds
+
+
+def record_external(service, endpoint, status, seconds):
+    """Record an outbound request; status is the HTTP status, or "error" if no response arrived"""
+    EXTERNAL_REQUEST_SECONDS.observe(seconds, service, endpoint, str(status))
+    if status == "error" or status >= 400:
+        EXTERNAL_REQUEST_ERRORS.inc(service, endpoint)
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.add(service, seconds)
+
+
+def record_llm(model, seconds, usage=None, error=False):
+    LLM_REQUEST_SECONDS.observe(seconds, model, "error" if error else "ok")
+    if error:
+        LLM_ERRORS.inc(model)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage and usage.get(kind):
+            LLM_TOKENS.inc(model, kind.split("_")[0], amount=usage[kind])
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.add("llm", seconds)
+
+
+def record_refresh(status, seconds, stats=None):
+    REFRESH_RUNS.inc(status)
+    REFRESH_SECONDS.observe(seconds, status)
+    for kind, value in (stats or {}).items():
+        if isinstance(value, int) and value:
+            REFRESH_ITEMS.inc(kind, amount=value)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times each statement it executes"""
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones behind execute(), time their statements
+    
+    Passed to sqlite3.connect as the factory only while metrics are enabled,
+    so uninstrumented connections keep the C fast path.
+    """
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,63 @@
+import re
+import unicodedata
+
+# Words dropped from judge names so "Hon. John Smith" and "Judge John Smith" match
+JUDGE_TITLES = {
+    "hon", "honorable", "the", "judge", "chief", "magistrate", "senior", "district", "us",
+    "justice", "jr", "sr", "ii", "iii", "iv",
+}
+
+# Entity suffixes dropped from law firm names so "Smith & Jones LLP" matches "Smith and Jones"
+LAW_FIRM_SUFFIXES = {"llp", "llc", "lp", "pc", "pa", "pllc", "ltd", "inc", "plc", "the"}
+
+# Spelled-out forms of common court abbreviations
+COURT_ABBREVIATIONS = {
+    "us": "united states",
+    "dist": "district",
+    "ct": "court",
+}
+
+# District court citations such as "N.D. Cal." or "D. Del.": an optional direction
+# initial and "D." at the start of the name, followed by the state ("D.C." is a place)
+DISTRICT_CITATION = re.compile(r"^\s*(?:([NSEWCM])\.\s*)?D\.\s*(?=\S)(?!C\.)", re.IGNORECASE)
+DISTRICT_DIRECTIONS = {
+    "n": "northern",
+    "s": "southern",
+    "e": "eastern",
+    "w": "western",
+    "c": "central",
+    "m": "middle",
+}
+
+
+def _words(name):
+    """Lowercase ASCII words of a name, with periods removed so "L.L.P." reads as "llp" """
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    name = name.replace("&", " and ").replace(".", "")
+    return re.sub(r"[^a-z0-9]+", " ", name).split()
+
+
+def name_key(dimension, name):
+    """Normalized matching key for a judge, court or law firm name ("" if nothing is left)
+    
+    Names with the same key are stored as one dimension row. Variants that
+    normalization cannot reconcile, such as initials, are joined with aliases.
+    """
+    if dimension == "judge":
+        # "Smith, John" -> "john smith"
+        if name.count(",") == 1:
+            last, first = name.split(",")
+            name = f"{first} {last}"
+        words = [word for word in _words(name) if word not in JUDGE_TITLES]
+    elif dimension == "law_firm":
+        words = [word for word in _words(name) if word not in LAW_FIRM_SUFFIXES]
+    elif dimension == "court":
+        # Initials are only spelled out in a district citation, never as standalone words
+        citation = DISTRICT_CITATION.match(name)
+        if citation:
+            direction = DISTRICT_DIRECTIONS[citation.group(1).lower()] if citation.group(1) else ""
+            name = f"{direction} district {name[citation.end():]}"
+        words = " ".join(COURT_ABBREVIATIONS.get(word, word) for word in _words(name)).split()
+    else:
+        raise ValueError(f"Unknown dimension: {dimension}")
+    return " ".join(words)
@@ -0,0 +1,153 @@
+import os
+import uuid
+import hashlib
+import datetime
+import socket
+import logging
+from apscheduler.schedulers.background import BackgroundScheduler
+
+# Defaults for the refresh settings edited on the Settings page
+DEFAULT_REFRESH_SETTINGS = {"autoRefresh": True, "refreshTime": "01:00", "daysBack": 1}
+
+# Longest window a refresh may look back over, in days
+MAX_DAYS_BACK = 365
+
+logger = logging.getLogger(__name__)
+
+
+def process_owner():
+    """Identifier for this process, used as the owner of schedule claims and leases"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def validate_refresh_settings(settings):
+    """Check and normalize refresh settings, raising ValueError if they are invalid"""
+    settings = {**DEFAULT_REFRESH_SETTINGS, **settings}
+    
+    try:
+        hour, minute = (int(part) for part in str(settings["refreshTime"]).split(":"))
+        datetime.time(hour, minute)
+    except (TypeError, ValueError):
+        raise ValueError("refreshTime must be HH:MM")
+    
+    try:
+        days_back = int(settings["daysBack"])
+    except (TypeError, ValueError):
+        raise ValueError("daysBack must be a number")
+    if not 1 <= days_back <= MAX_DAYS_BACK:
+        raise ValueError(f"daysBack must be between 1 and {MAX_DAYS_BACK}")
+    
+    return {
+        "autoRefresh": bool(settings["autoRefresh"]),
+        "refreshTime": f"{hour:02d}:{minute:02d}",
+        "daysBack": days_back
+    }
+
+
+class Lease:
+    """Expiring SQLite lock held by at most one process at a time"""
+    
+    def __init__(self, db, name, ttl, owner=None):
+        self.db = db
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or process_owner()
+    
+    def acquire(self):
+        """Take the lease, or extend it if already held; False while another process holds it"""
+        return self.db.acquire_lease(self.name, self.owner, self.ttl)
+    
+    def release(self):
+        self.db.release_lease(self.name, self.owner)
+
+
+class RefreshScheduler:
+    """Daily refresh scheduler that is safe to run in every worker process
+    
+    Each worker ticks on its own, but a run is only submitted by the worker
+    that atomically claims its due time in the schedules table. The due time
+    is offset by a jitter derived from the date, so every worker agrees on it
+    while the load on the upstream APIs still varies from day to day. A run
+    missed while no process was up is submitted on the next tick, looking back
+    far enough to cover the gap, up to MAX_DAYS_BACK days.
+    """
+    
+    SCHEDULE_NAME = "refresh"
+    
+    def __init__(self, db, submit, tick_seconds=60, jitter_seconds=900):
+        self.db = db
+        self.submit = submit
+        self.tick_seconds = tick_seconds
+        self.jitter_seconds = jitter_seconds
+        self.owner = process_owner()
+        self._scheduler = None
+    
+    def start(self):
+        """Start ticking in a background thread"""
+        if self._scheduler:
+            return
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(self.tick, "interval", seconds=self.tick_seconds,
+                                max_instances=1, coalesce=True)
+        self._scheduler.start()
+    
+    def shutdown(self):
+        if self._scheduler:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+    
+    def settings(self):
+        return self.db.get_setting("refresh", DEFAULT_REFRESH_SETTINGS)
+    
+    def due_time(self, day, refresh_time):
+        """Scheduled run time for a day: the configured time plus that day's jitter"""
+        hour, minute = (int(part) for part in refresh_time.split(":"))
+        digest = hashlib.sha256(day.isoformat().encode("utf-8")).digest()
+        jitter = int.from_bytes(digest[:4], "big") % (self.jitter_seconds + 1)
+        return datetime.datetime.combine(day, datetime.time(hour, minute)) + datetime.timedelta(seconds=jitter)
+    
+    def last_due(self, now, refresh_time):
+        """Most recent scheduled run time at or before now"""
+        due = self.due_time(now.date(), refresh_time)
+        if due > now:
+            due = self.due_time(now.date() - datetime.timedelta(days=1), refresh_time)
+        return due
+    
+    def next_run(self, now=None):
+        """Next scheduled run time, or None when automatic refresh is off"""
+        settings = self.settings()
+        if not settings["autoRefresh"]:
+            return None
+        
+        now = now or datetime.datetime.now()
+        due = self.due_time(now.date(), settings["refreshTime"])
+        if due <= now:
+            due = self.due_time(now.date() + datetime.timedelta(days=1), settings["refreshTime"])
+        return due
+    
+    def tick(self, now=None):
+        """Submit the most recent scheduled run if no process has claimed it yet, returning its job id"""
+        settings = self.settings()
+        if not settings["autoRefresh"]:
+            return None
+        
+        now = now or datetime.datetime.now()
+        due = self.last_due(now, settings["refreshTime"])
+        previous = self.db.get_schedule(self.SCHEDULE_NAME)
+        if previous and previous["last_due"] >= due.isoformat():
+            return None
+        
+        if not self.db.claim_schedule(self.SCHEDULE_NAME, due.isoformat(), self.owner):
+            return None
+        
+        # Catch up on every day since the last claimed run
+        days_back = settings["daysBack"]
+        if previous:
+            missed = (due.date() - datetime.datetime.fromisoformat(previous["last_due"]).date()).days
+            days_back = max(days_back, missed)
+            if days_back > MAX_DAYS_BACK:
+                logger.warning("Refresh catch-up of %d days limited to the last %d", days_back, MAX_DAYS_BACK)
+                days_back = MAX_DAYS_BACK
+        
+        return self.submit(days_back)
+
@@ -0,0 +1,166 @@
+import time
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import openai
+import metrics
+
+# Bump whenever the prompt or request parameters change so cached summaries are regenerated
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You are a helpful legal assistant. Summarize the following court order denying a motion "
+    "to dismiss or motion for summary judgment. Focus on the key legal reasoning and grounds for denial."
+)
+
+# Limit order text to stay within token limits
+MAX_ORDER_CHARS = 15000
+
+# Start of the text returned in place of a summary when generating it fails
+SUMMARY_ERROR_PREFIX = "Error generating summary: "
+
+
+def summary_failed(summary):
+    """Whether a summary is the placeholder for a failed generation"""
+    return bool(summary) and summary.startswith(SUMMARY_ERROR_PREFIX)
+
+
+def openai_completion(**kwargs):
+    """Default completion client backed by the OpenAI API"""
+    return openai.ChatCompletion.create(**kwargs)
+
+
+class TokenBudget:
+    """Sliding one-minute window that throttles completions to a token budget"""
+    
+    WINDOW_SECONDS = 60
+    
+    def __init__(self, tokens_per_minute=None):
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        self._spent = deque()
+    
+    def acquire(self, tokens):
+        """Block until spending the given number of tokens stays within budget"""
+        if not self.tokens_per_minute:
+            return
+        
+        # A single request larger than the budget is allowed once the window is empty
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._spent and now - self._spent[0][0] >= self.WINDOW_SECONDS:
+                    self._spent.popleft()
+                
+                used = sum(spent for _, spent in self._spent)
+                if used + tokens <= self.tokens_per_minute:
+                    self._spent.append((now, tokens))
+                    return
+                
+                wait = self.WINDOW_SECONDS - (now - self._spent[0][0])
+            time.sleep(wait)
+
+
+class SummaryEngine:
+    """Generates AI summaries of court orders with caching, deduplication and throttling"""
+    
+    def __init__(self, db=None, completion_fn=None, model="gpt-4", max_workers=4,
+                 tokens_per_minute=None, max_tokens=500, prompt_version=PROMPT_VERSION):
+        self.db = db
+        self.completion_fn = completion_fn or openai_completion
+        self.model = model
+        self.max_tokens = max_tokens
+        self.prompt_version = prompt_version
+        self.budget = TokenBudget(tokens_per_minute)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="summaries")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {"hits": 0, "misses": 0, "deduplicated": 0, "errors": 0}
+    
+    def cache_key(self, order_text):
+        """Content address of a summary: hash of prompt version, model and order text"""
+        digest = hashlib.sha256()
+        for part in (self.prompt_version, self.model, order_text[:MAX_ORDER_CHARS]):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def summarize(self, order_text):
+        """Return the summary for an order, generating it only if it is not cached"""
+        return self.submit(order_text).result()
+    
+    def submit(self, order_text):
+        """Schedule a summary and return a future, sharing work with identical in-flight requests"""
+        key = self.cache_key(order_text)
+        
+        with self._lock:
+            if key in self._in_flight:
+                self._stats["deduplicated"] += 1
+                return self._in_flight[key]
+        
+        cached = self.db.get_cached_summary(key) if self.db else None
+        
+        with self._lock:
+            if cached is not None:
+                self._stats["hits"] += 1
+                future = Future()
+                future.set_result(cached)
+                return future
+            
+            # Another thread may have started the same summary while we checked the cache
+            if key in self._in_flight:
+                self._stats["deduplicated"] += 1
+                return self._in_flight[key]
+            
+            self._stats["misses"] += 1
+            future = self._executor.submit(self._generate, key, order_text)
+            self._in_flight[key] = future
+        
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+    
+    def stats(self):
+        """Snapshot of cache hit, miss, deduplication and error counts"""
+        with self._lock:
+            return dict(self._stats)
+    
+    def _release(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+    
+    def _estimate_tokens(self, order_text):
+        # Roughly four characters per token for English text
+        return (len(SYSTEM_PROMPT) + len(order_text[:MAX_ORDER_CHARS])) // 4 + self.max_tokens
+    
+    def _generate(self, key, order_text):
+        """Call the completion client and store the result in the cache"""
+        self.budget.acquire(self._estimate_tokens(order_text))
+        
+        start = time.perf_counter()
+        try:
+            response = self.completion_fn(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": order_text[:MAX_ORDER_CHARS]}
+                ],
+                max_tokens=self.max_tokens,
+                temperature=0.3
+            )
+            summary = response.choices[0].message["content"]
+        except Exception as e:
+            if metrics.enabled:
+                metrics.record_llm(self.model, time.perf_counter() - start, error=True)
+            # Failures are not cached so the next refresh retries them
+            with self._lock:
+                self._stats["errors"] += 1
+            return f"{SUMMARY_ERROR_PREFIX}{e}"
+        
+        if metrics.enabled:
+            metrics.record_llm(self.model, time.perf_counter() - start, usage=getattr(response, "usage", None))
+        
+        if self.db:
+            self.db.store_cached_summary(key, self.prompt_version, self.model, summary)
+        return summary
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Empty database in a temporary directory"""
+    database = Database(str(tmp_path / "motions.db"))
+    yield database
+    database.pool.close()
@@ -0,0 +1,21 @@
+import pytest
+from analytics import AnalyticsEngine
+
+
+@pytest.mark.parametrize("call, message", [
+    (lambda engine: engine.judge_velocity(as_of="2024-13-01"), "as_of must be a date in YYYY-MM-DD format"),
+    (lambda engine: engine.judge_velocity(as_of="yesterday"), "as_of must be a date in YYYY-MM-DD format"),
+    (lambda engine: engine.monthly_trends(end_month="2024-13"), "end_month must be a month in YYYY-MM format"),
+    (lambda engine: engine.monthly_trends(end_month="2024-01-15"), "end_month must be a month in YYYY-MM format"),
+    (lambda engine: engine.firm_judge_matrix(end_date="01/15/2024"), "end_date must be a date in YYYY-MM-DD format"),
+])
+def test_malformed_dates_are_rejected_by_name(db, call, message):
+    with pytest.raises(ValueError) as error:
+        call(AnalyticsEngine(db))
+    assert str(error.value) == message
+
+
+def test_well_formed_dates_are_accepted(db):
+    engine = AnalyticsEngine(db)
+    assert engine.judge_velocity(as_of="2024-02-29")["judges"] == []
+    assert engine.monthly_trends(end_month="2024-02")["series"] == []
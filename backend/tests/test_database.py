@@ -0,0 +1,33 @@
+import sqlite3
+import pytest
+from database import Database, DETAIL_COLUMNS
+
+
+def test_motion_detail_leaves_out_internal_columns(db):
+    motion_id = db.insert_motion({
+        "case_name": "Plaintiff v. Defendant",
+        "judge": "Hon. Jane Roe",
+        "court": "District Court",
+        "docket_number": "1:24-cv-00001",
+        "motion_type": "motion to dismiss denied",
+        "order_info": {"date": "2024-01-15", "description": "Denied", "document_number": "doc-1"},
+        "summary": "summary",
+        "parties": [{"name": "Plaintiff", "role": "Plaintiff", "attorneys": [{"name": "Counsel", "firm": "Firm LLP"}]}]
+    })
+    
+    motion = db.get_motion(motion_id)
+    
+    assert set(motion) == set(DETAIL_COLUMNS) | {"parties"}
+    assert not {"judge_id", "court_id", "parties_hash"} & set(motion)
+    assert motion["judge"] == "Hon. Jane Roe"
+
+
+def test_read_only_database_reads_without_writing(db):
+    db.store_cached_summaries([("key", "v1", "model", "summary")])
+    reader = Database(db.db_path, read_only=True)
+    try:
+        assert reader.get_cached_summary("key") is not None
+        with pytest.raises(sqlite3.OperationalError):
+            reader.store_cached_summaries([("other", "v1", "model", "summary")])
+    finally:
+        reader.close()
@@ -0,0 +1,61 @@
+import pytest
+from documents import DocumentStore, text_encoding
+from benchmarks.mock_lexmachina import MockLexMachinaServer, mock_order_text
+
+
+@pytest.fixture
+def server():
+    server = MockLexMachinaServer(case_count=2, latency=0).start()
+    yield server
+    server.stop()
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.texts = []
+    
+    def summarize(self, order_text):
+        self.texts.append(order_text)
+        return "summary"
+
+
+@pytest.mark.parametrize("content_type, encoding", [
+    (None, "utf-8"),
+    ("text/plain", "utf-8"),
+    ("text/plain; charset=ISO-8859-1", "iso8859-1"),
+    ("text/html; charset=unknown-charset", "utf-8"),
+    ("application/pdf", None),
+    ("application/octet-stream", None),
+])
+def test_text_encoding(content_type, encoding):
+    assert text_encoding(content_type) == encoding
+
+
+def test_read_text_uses_the_documents_charset(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents"))
+    entry = store.put("doc-1", [b"Order denied \xa7 12"], content_type="text/plain; charset=latin-1")
+    
+    encoding = text_encoding(entry["content_type"])
+    assert store.read_text(entry["content_hash"], encoding=encoding) == "Order denied § 12"
+
+
+def test_text_orders_are_summarized_and_indexed(server, tmp_path):
+    summarizer = RecordingSummarizer()
+    api = server.make_api(summarizer=summarizer, document_store=DocumentStore(str(tmp_path / "documents")))
+    
+    motion = api._process_case(api.get_case_details(1))
+    
+    assert summarizer.texts == [mock_order_text(1)]
+    assert motion["order_text"] == mock_order_text(1)
+
+
+def test_pdf_orders_fall_back_to_the_description(server, tmp_path):
+    server.document_content_type = "application/pdf"
+    summarizer = RecordingSummarizer()
+    api = server.make_api(summarizer=summarizer, document_store=DocumentStore(str(tmp_path / "documents")))
+    
+    motion = api._process_case(api.get_case_details(1))
+    
+    assert summarizer.texts == ["Order denying motion to dismiss denied. Document ID: doc-1"]
+    assert "order_text" not in motion
+    assert motion["order_info"]["content_hash"]
@@ -0,0 +1,76 @@
+import time
+import pytest
+from http_cache import ResponseCache
+from benchmarks.mock_lexmachina import MockLexMachinaServer, mock_case
+
+
+@pytest.fixture
+def server():
+    server = MockLexMachinaServer(case_count=10, latency=0).start()
+    yield server
+    server.stop()
+
+
+def case_requests(server):
+    return [request for request in server.requests if request[1].startswith("/district-cases/")]
+
+
+def make_api(server, tmp_path, **cache_options):
+    cache = ResponseCache(str(tmp_path / "http_cache.db"), **cache_options)
+    return server.make_api(max_workers=1, response_cache=cache), cache
+
+
+def test_miss_then_fresh_hit(server, tmp_path):
+    api, cache = make_api(server, tmp_path)
+    
+    assert api.get_case_details(1) == mock_case(1)
+    assert api.get_case_details(1) == mock_case(1)
+    
+    assert case_requests(server) == [("GET", "/district-cases/1", None)]
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_revalidated(server, tmp_path):
+    api, cache = make_api(server, tmp_path, ttl=0.2)
+    api.get_case_details(2)
+    time.sleep(0.3)
+    
+    assert api.get_case_details(2) == mock_case(2)
+    # The 304 renews the entry, so the next read is served without a request
+    assert api.get_case_details(2) == mock_case(2)
+    
+    assert case_requests(server) == [
+        ("GET", "/district-cases/2", None),
+        ("GET", "/district-cases/2", '"case-2"'),
+    ]
+    assert cache.stats()["revalidated"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_reads_do_not_write_until_flushed(server, tmp_path):
+    api, cache = make_api(server, tmp_path)
+    api.get_case_details(3)
+    url = api.CASE_DETAIL_URL.format(3)
+    stored_at = cache.get(url)["accessed_at"]
+    
+    time.sleep(0.01)
+    api.get_case_details(3)
+    assert cache.get(url)["accessed_at"] == stored_at
+    
+    cache.flush_access_times()
+    assert cache.get(url)["accessed_at"] > stored_at
+
+
+def test_eviction_keeps_recently_read_entries(server, tmp_path):
+    api, cache = make_api(server, tmp_path, max_entries=2)
+    for case_id in (1, 2, 3):
+        api.get_case_details(case_id)
+        time.sleep(0.01)
+    api.get_case_details(1)
+    
+    cache.evict()
+    
+    assert cache.get(api.CASE_DETAIL_URL.format(1)) is not None
+    assert cache.get(api.CASE_DETAIL_URL.format(2)) is None
+    assert cache.get(api.CASE_DETAIL_URL.format(3)) is not None
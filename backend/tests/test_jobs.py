@@ -0,0 +1,40 @@
+import time
+import threading
+from jobs import JobQueue
+
+
+def test_queued_job_shares_the_running_jobs_heartbeat(db):
+    release = threading.Event()
+    
+    def handler(params, job):
+        while not release.is_set():
+            job.progress({"step": params["step"]})
+            time.sleep(0.05)
+    
+    queue = JobQueue(db, max_workers=1, stale_after=0.5)
+    queue.register("wait", handler)
+    running_id, _ = queue.submit("wait", {"step": 1})
+    queued_id, _ = queue.submit("wait", {"step": 2})
+    
+    try:
+        time.sleep(1)
+        db.fail_stale_jobs(0.5)
+        
+        assert db.get_job(running_id)["status"] == "running"
+        assert db.get_job(queued_id)["status"] == "queued"
+        # Still alive, so submitting it again reuses it
+        assert queue.submit("wait", {"step": 2}) == (queued_id, False)
+    finally:
+        release.set()
+        queue._executor.shutdown(wait=True)
+
+
+def test_jobs_without_a_heartbeat_are_failed(db):
+    queue = JobQueue(db, stale_after=600)
+    queue.register("noop", lambda params, job: None)
+    job_id, _ = db.create_job("noop", "{}", stale_after=600)
+    
+    time.sleep(0.1)
+    db.fail_stale_jobs(0.05)
+    
+    assert db.get_job(job_id)["status"] == "failed"
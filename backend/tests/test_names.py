@@ -0,0 +1,32 @@
+import pytest
+from names import name_key
+
+
+@pytest.mark.parametrize("name, key", [
+    ("N.D. Cal.", "northern district cal"),
+    ("N. D. Cal.", "northern district cal"),
+    ("S.D.N.Y.", "southern district ny"),
+    ("C.D. Cal.", "central district cal"),
+    ("D. Del.", "district del"),
+    ("Dist. Del.", "district del"),
+    ("D.N.J.", "district nj"),
+    ("D.D.C.", "district dc"),
+    ("U.S. Dist. Ct.", "united states district court"),
+])
+def test_court_citations_are_spelled_out(name, key):
+    assert name_key("court", name) == key
+
+
+@pytest.mark.parametrize("name, key", [
+    ("D.C. Superior Court", "dc superior court"),
+    ("Court of Appeals, D.C. Circuit", "court of appeals dc circuit"),
+    ("Bankruptcy Court for the E. Smith Estate", "bankruptcy court for the e smith estate"),
+    ("Northern District of California", "northern district of california"),
+])
+def test_initials_outside_a_citation_are_kept(name, key):
+    assert name_key("court", name) == key
+
+
+def test_judge_and_law_firm_keys():
+    assert name_key("judge", "Hon. John Smith") == name_key("judge", "Smith, John") == "john smith"
+    assert name_key("law_firm", "Smith & Jones, L.L.P.") == name_key("law_firm", "Smith and Jones") == "smith and jones"
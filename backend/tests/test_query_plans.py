@@ -0,0 +1,70 @@
+import sqlite3
+import pytest
+from database import ConnectionPool
+from benchmarks.corpus import seed_corpus
+
+# (name, call) for each read path the API depends on; every SELECT a call runs is checked
+READ_PATHS = [
+    ("list newest", lambda db: db.get_motions(limit=20)),
+    ("list projected with parties", lambda db: db.get_motions(limit=20, fields=["id", "case_name", "parties"])),
+    ("list next page", lambda db: db.get_motions(limit=20, after=("2024-06-01", 500))),
+    ("list undated tail", lambda db: db.get_motions(limit=20, after=(None, 500))),
+    ("filter by court", lambda db: db.filter_motions(court="District Court 3", limit=20)),
+    ("filter by judge", lambda db: db.filter_motions(judge="Judge 17", limit=20)),
+    ("filter by judge substring", lambda db: db.filter_motions(judge="udge 1", limit=20)),
+    ("filter by type and dates", lambda db: db.filter_motions(
+        motion_type="dismiss", start_date="2024-03-01", end_date="2024-06-30", limit=20
+    )),
+    ("filter next page", lambda db: db.filter_motions(court="District Court 3", limit=20, after=("2024-06-01", 500))),
+    ("export", lambda db: list(db.iter_motions(court="District Court 3", fields=["case_name", "parties"]))),
+    ("stats", lambda db: db.get_stats()),
+    ("law firms", lambda db: db.get_law_firms()),
+    ("trend by day", lambda db: db.get_motion_trend(bucket="day", start_date="2024-01-01", end_date="2024-03-31")),
+    ("trend by week", lambda db: db.get_motion_trend(bucket="week", start_date="2024-01-01", end_date="2024-03-31")),
+    ("trend by month", lambda db: db.get_motion_trend(bucket="month", start_date="2024-01-01", end_date="2024-12-31")),
+]
+
+
+@pytest.fixture(scope="module")
+def traced_db(tmp_path_factory):
+    """Seeded database whose connections record each statement they run, with parameters inlined"""
+    statements = []
+    connect = ConnectionPool._connect
+    
+    def traced_connect(pool):
+        conn = connect(pool)
+        conn.set_trace_callback(statements.append)
+        return conn
+    
+    path = str(tmp_path_factory.mktemp("plans") / "motions.db")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(ConnectionPool, "_connect", traced_connect)
+        db = seed_corpus(path, 2000)
+        yield db, statements, path
+    db.pool.close()
+
+
+def plan_problems(details):
+    """Plan lines showing a temporary b-tree or a full table scan"""
+    return [
+        detail for detail in details
+        if "TEMP B-TREE" in detail or (detail.startswith("SCAN") and "USING" not in detail)
+    ]
+
+
+@pytest.mark.parametrize("name, call", READ_PATHS, ids=[name for name, _ in READ_PATHS])
+def test_read_path_uses_indexes(traced_db, name, call):
+    db, statements, path = traced_db
+    statements.clear()
+    call(db)
+    
+    selects = list(dict.fromkeys(sql for sql in statements if sql.lstrip().upper().startswith("SELECT")))
+    assert selects, f"{name} ran no SELECT"
+    
+    conn = sqlite3.connect(path)
+    try:
+        for sql in selects:
+            details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            assert not plan_problems(details), f"{' '.join(sql.split())}\n  " + "\n  ".join(details)
+    finally:
+        conn.close()
@@ -0,0 +1,41 @@
+import datetime
+from scheduler import RefreshScheduler, MAX_DAYS_BACK
+
+
+def make_scheduler(db):
+    submitted = []
+    
+    def submit(days_back):
+        submitted.append(days_back)
+        return len(submitted)
+    
+    db.set_setting("refresh", {"autoRefresh": True, "refreshTime": "01:00", "daysBack": 1})
+    return RefreshScheduler(db, submit, jitter_seconds=0), submitted
+
+
+def test_run_is_submitted_once_per_day(db):
+    scheduler, submitted = make_scheduler(db)
+    now = datetime.datetime(2024, 3, 10, 12, 0)
+    
+    assert scheduler.tick(now) == 1
+    assert scheduler.tick(now + datetime.timedelta(hours=1)) is None
+    assert submitted == [1]
+
+
+def test_missed_runs_are_caught_up(db):
+    scheduler, submitted = make_scheduler(db)
+    scheduler.tick(datetime.datetime(2024, 3, 10, 12, 0))
+    
+    scheduler.tick(datetime.datetime(2024, 3, 14, 12, 0))
+    
+    assert submitted == [1, 4]
+
+
+def test_catch_up_after_a_long_gap_is_limited(db, caplog):
+    scheduler, submitted = make_scheduler(db)
+    scheduler.tick(datetime.datetime(2022, 3, 10, 12, 0))
+    
+    scheduler.tick(datetime.datetime(2024, 3, 10, 12, 0))
+    
+    assert submitted == [1, MAX_DAYS_BACK]
+    assert "limited to the last 365" in caplog.text
@@ -0,0 +1,111 @@
+import time
+import threading
+from types import SimpleNamespace
+from summaries import SummaryEngine, TokenBudget
+from benchmarks.stub_openai import StubCompletion
+
+
+def make_response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message={"role": "assistant", "content": content})])
+
+
+def test_cache_hit_after_miss(db):
+    completion = StubCompletion(latency=0)
+    engine = SummaryEngine(db, completion_fn=completion)
+    
+    first = engine.summarize("Order denying the motion to dismiss.")
+    second = engine.summarize("Order denying the motion to dismiss.")
+    
+    assert first == second
+    assert completion.stats()["calls"] == 1
+    assert engine.stats() == {"hits": 1, "misses": 1, "deduplicated": 0, "errors": 0}
+
+
+def test_cache_is_shared_through_the_database(db):
+    completion = StubCompletion(latency=0)
+    SummaryEngine(db, completion_fn=completion).summarize("Order text")
+    engine = SummaryEngine(db, completion_fn=completion)
+    
+    engine.summarize("Order text")
+    
+    assert completion.stats()["calls"] == 1
+    assert engine.stats()["hits"] == 1
+
+
+def test_prompt_version_change_misses(db):
+    completion = StubCompletion(latency=0)
+    SummaryEngine(db, completion_fn=completion, prompt_version="1").summarize("Order text")
+    SummaryEngine(db, completion_fn=completion, prompt_version="2").summarize("Order text")
+    
+    assert completion.stats()["calls"] == 2
+
+
+def test_identical_in_flight_prompts_share_one_call(db):
+    release = threading.Event()
+    calls = []
+    
+    def completion(**kwargs):
+        calls.append(kwargs)
+        release.wait(5)
+        return make_response("Shared summary")
+    
+    engine = SummaryEngine(db, completion_fn=completion, max_workers=4)
+    first = engine.submit("Same order")
+    second = engine.submit("Same order")
+    other = engine.submit("Different order")
+    release.set()
+    
+    assert first is second
+    assert first.result(5) == "Shared summary"
+    assert other.result(5) == "Shared summary"
+    assert len(calls) == 2
+    assert engine.stats()["deduplicated"] == 1
+
+
+def test_failures_are_not_cached(db):
+    failures = [Exception("rate limited")]
+    
+    def completion(**kwargs):
+        if failures:
+            raise failures.pop()
+        return make_response("Recovered summary")
+    
+    engine = SummaryEngine(db, completion_fn=completion)
+    
+    assert engine.summarize("Order text") == "Error generating summary: rate limited"
+    assert db.get_cached_summary(engine.cache_key("Order text")) is None
+    assert engine.summarize("Order text") == "Recovered summary"
+    assert engine.stats()["errors"] == 1
+    assert engine.stats()["misses"] == 2
+
+
+def test_token_budget_waits_for_the_window():
+    budget = TokenBudget(tokens_per_minute=100)
+    budget.WINDOW_SECONDS = 0.3
+    
+    start = time.monotonic()
+    budget.acquire(60)
+    budget.acquire(40)
+    assert time.monotonic() - start < 0.1
+    
+    budget.acquire(10)
+    assert time.monotonic() - start >= 0.3
+
+
+def test_token_budget_admits_oversized_request_alone():
+    budget = TokenBudget(tokens_per_minute=100)
+    budget.WINDOW_SECONDS = 0.2
+    
+    start = time.monotonic()
+    budget.acquire(500)
+    assert time.monotonic() - start < 0.1
+    budget.acquire(1)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_unlimited_budget_never_waits():
+    budget = TokenBudget()
+    start = time.monotonic()
+    for _ in range(100):
+        budget.acquire(10 ** 6)
+    assert time.monotonic() - start < 0.1
@@ -0,0 +1,90 @@
+import pytest
+from summaries import SummaryEngine
+from tracker import MotionTracker, EVENT_MOTION_TYPES
+from benchmarks import mock_lexmachina
+from benchmarks.mock_lexmachina import MockLexMachinaServer, mock_event_types
+from benchmarks.stub_openai import StubCompletion
+
+CASES = 6
+
+# Denied motions per motion type among the mock cases; cases 3 and 6 have one of each
+MOTIONS_BY_TYPE = {
+    motion_type: sum(event_type in mock_event_types(case_id) for case_id in range(1, CASES + 1))
+    for event_type, motion_type in EVENT_MOTION_TYPES.items()
+}
+MOTIONS = sum(MOTIONS_BY_TYPE.values())
+
+
+def failing_completion(**kwargs):
+    raise Exception("rate limited")
+
+
+@pytest.fixture
+def server():
+    server = MockLexMachinaServer(case_count=CASES, latency=0).start()
+    yield server
+    server.stop()
+
+
+def refresh(server, db, completion_fn):
+    api = server.make_api(max_workers=4, summarizer=SummaryEngine(db, completion_fn=completion_fn))
+    return MotionTracker(api, db).refresh(days_back=1, incremental=True)
+
+
+def test_first_sync_processes_every_case(server, db):
+    completion = StubCompletion(latency=0)
+    stats = refresh(server, db, completion)
+    
+    assert MOTIONS_BY_TYPE == {"motion to dismiss denied": 4, "motion for summary judgment denied": 4}
+    assert stats["motions_found"] == MOTIONS
+    assert stats["cases_skipped"] == 0
+    assert stats["llm_calls_avoided"] == stats["summary_cache"]["hits"] + stats["summary_cache"]["deduplicated"]
+    assert completion.stats()["calls"] == MOTIONS
+    
+    # Each motion is stored once, under the type of the event it was extracted for
+    stored = {}
+    for motion in db.get_motions(fields=["motion_type"]):
+        stored[motion["motion_type"]] = stored.get(motion["motion_type"], 0) + 1
+    assert stored == MOTIONS_BY_TYPE
+
+
+def test_unchanged_cases_are_skipped(server, db):
+    refresh(server, db, StubCompletion(latency=0))
+    completion = StubCompletion(latency=0)
+    stats = refresh(server, db, completion)
+    
+    assert stats["cases_skipped"] == MOTIONS
+    assert stats["motions_found"] == 0
+    assert completion.stats()["calls"] == 0
+
+
+def test_failed_summaries_are_retried(server, db):
+    failed = refresh(server, db, failing_completion)
+    assert failed["summaries_failed"] == MOTIONS
+    
+    completion = StubCompletion(latency=0)
+    retried = refresh(server, db, completion)
+    
+    assert retried["cases_skipped"] == 0
+    assert retried["summaries_failed"] == 0
+    assert completion.stats()["calls"] == MOTIONS
+    assert not any(motion["summary"].startswith("Error") for motion in db.get_motions(fields=["summary"]))
+
+
+def test_changed_case_is_processed_again(server, db, monkeypatch):
+    refresh(server, db, StubCompletion(latency=0))
+    
+    original = mock_lexmachina.mock_case
+    
+    def changed_case(case_id):
+        case = original(case_id)
+        if case_id in (1, 3):
+            case["caseName"] = f"Plaintiff {case_id} v. Renamed Defendant"
+        return case
+    
+    monkeypatch.setattr(mock_lexmachina, "mock_case", changed_case)
+    stats = refresh(server, db, StubCompletion(latency=0))
+    
+    # Case 1 has a motion of one type and case 3 one of each
+    assert stats["motions_found"] == 3
+    assert stats["cases_skipped"] == MOTIONS - 3
@@ -0,0 +1,30 @@
+import datetime
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "motions.db"))
+    monkeypatch.setenv("HTTP_CACHE_PATH", str(tmp_path / "http_cache.db"))
+    monkeypatch.setenv("DOCUMENT_STORE_PATH", str(tmp_path / "documents"))
+    import app
+    return app
+
+
+def test_stats_are_recomputed_on_a_new_day(app, monkeypatch):
+    http = app.app.test_client()
+    
+    # The default trend window ends today
+    today = http.get("/api/stats").get_json()["stats"]["recent_trend"]
+    assert http.get("/api/stats").get_json()["stats"]["recent_trend"] == today
+    
+    tomorrow_date = datetime.date.today() + datetime.timedelta(days=1)
+    
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return tomorrow_date
+    
+    monkeypatch.setattr(datetime, "date", Tomorrow)
+    tomorrow = http.get("/api/stats").get_json()["stats"]["recent_trend"]
+    assert tomorrow != today
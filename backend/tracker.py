@@ -0,0 +1,179 @@
+import json
+import time
+import hashlib
+import datetime
+import itertools
+import threading
+import metrics
+from jobs import JobCancelled
+from summaries import summary_failed
+
+# Lex Machina event types tracked, each with its own sync high-water mark, and
+# the motion type extracted from a case for each
+EVENT_MOTION_TYPES = {
+    "Dismiss (Contested)": "motion to dismiss denied",
+    "Summary Judgment (Contested)": "motion for summary judgment denied",
+}
+EVENT_TYPES = list(EVENT_MOTION_TYPES)
+
+
+def case_fingerprint(case, summary_version=""):
+    """Stable hash of fetched case details, used to recognize cases that have not changed since processed
+    
+    summary_version names the prompt and model summaries are generated with,
+    so changing either reprocesses every case.
+    """
+    digest = hashlib.sha256(summary_version.encode("utf-8"))
+    digest.update(json.dumps(case, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MotionTracker:
+    """Process and track motions from court dockets"""
+    
+    def __init__(self, api_client, db=None, batch_size=50):
+        self.api_client = api_client
+        self.db = db
+        self.batch_size = batch_size
+    
+    def find_denied_motions(self, days_back=1):
+        """Find denied motions to dismiss or summary judgment, yielding them as they are processed"""
+        # Stream denied motions from API client
+        return self.api_client.search_denied_motions(days_back=days_back)
+    
+    def store_motions(self, motions, on_batch=None):
+        """Write streamed motions to the database in bulk batches, returning how many were stored
+        
+        on_batch, if given, is called with the running total after each batch is written.
+        """
+        motions = iter(motions)
+        stored = 0
+        while True:
+            batch = list(itertools.islice(motions, self.batch_size))
+            if not batch:
+                return stored
+            self.db.insert_motions(batch)
+            stored += len(batch)
+            if on_batch:
+                on_batch(stored)
+    
+    def refresh(self, days_back=1, incremental=True, progress=None):
+        """Fetch and store denied motions, returning run statistics
+        
+        Incremental runs start each event type's query at its sync high-water
+        mark (or days_back, whichever is earlier) and skip the document fetch,
+        summary and write for cases whose details are unchanged since they were
+        last processed for that event type. A case whose summary failed is
+        processed again by the next run.
+        
+        progress, if given, receives a dict of running counts after every stored
+        batch; an exception raised from it aborts the refresh without advancing
+        the high-water mark of the event type in progress.
+        """
+        start = time.perf_counter()
+        try:
+            stats = self._refresh(days_back, incremental, progress)
+        except Exception as e:
+            if metrics.enabled:
+                metrics.record_refresh("cancelled" if isinstance(e, JobCancelled) else "failed", time.perf_counter() - start)
+            raise
+        
+        if metrics.enabled:
+            metrics.record_refresh("succeeded", time.perf_counter() - start, stats)
+        return stats
+    
+    def _refresh(self, days_back, incremental, progress):
+        stats = {"motions_found": 0, "cases_skipped": 0, "summaries_failed": 0}
+        
+        def report(event_type, stored):
+            if progress:
+                progress({
+                    "event_type": event_type,
+                    "motions_found": stats["motions_found"] + stored,
+                    "cases_skipped": stats["cases_skipped"]
+                })
+        
+        summaries_before = self.api_client.summarizer.stats()
+        response_cache = self.api_client.response_cache
+        http_before = response_cache.stats() if response_cache else None
+        
+        if incremental:
+            for event_type in EVENT_TYPES:
+                stats["motions_found"] += self._sync_event_type(
+                    event_type, days_back, stats,
+                    on_batch=lambda stored, event_type=event_type: report(event_type, stored)
+                )
+        else:
+            stats["motions_found"] = self.store_motions(
+                self.find_denied_motions(days_back=days_back),
+                on_batch=lambda stored: report(None, stored)
+            )
+        
+        summaries_after = self.api_client.summarizer.stats()
+        stats["summary_cache"] = {
+            name: summaries_after[name] - summaries_before[name]
+            for name in ("hits", "misses", "deduplicated")
+        }
+        
+        if response_cache:
+            http_after = response_cache.stats()
+            stats["http_cache"] = {
+                name: http_after[name] - http_before[name]
+                for name in ("hits", "revalidated", "misses")
+            }
+        
+        # Calls not made: case details served fresh from the response cache, and
+        # summaries served from the cache or shared with an identical request in flight
+        stats["api_calls_avoided"] = stats["http_cache"]["hits"] if response_cache else 0
+        stats["llm_calls_avoided"] = stats["summary_cache"]["hits"] + stats["summary_cache"]["deduplicated"]
+        return stats
+    
+    def _sync_event_type(self, event_type, days_back, stats, on_batch=None):
+        """Fetch new or changed cases for one event type, then advance its high-water mark"""
+        end_date = datetime.date.today()
+        start_date = end_date - datetime.timedelta(days=days_back)
+        
+        # Catch up from the last successful sync if it is older than the requested window
+        high_water_mark = self.db.get_high_water_mark(event_type)
+        if high_water_mark:
+            start_date = min(start_date, datetime.date.fromisoformat(high_water_mark))
+        
+        summarizer = self.api_client.summarizer
+        summary_version = f"{summarizer.prompt_version}:{summarizer.model}"
+        processed = {}
+        lock = threading.Lock()
+        
+        def skip_case(case_id, case):
+            case_id = str(case_id)
+            fingerprint = case_fingerprint(case, summary_version)
+            if self.db.get_case_fingerprint(event_type, case_id) == fingerprint:
+                with lock:
+                    stats["cases_skipped"] += 1
+                return True
+            
+            with lock:
+                processed[case_id] = fingerprint
+            return False
+        
+        def check_summaries(motions):
+            # A case whose summary failed keeps its old fingerprint, so the next sync retries it
+            for motion in motions:
+                if summary_failed(motion.get("summary")):
+                    with lock:
+                        processed.pop(motion.get("case_id"), None)
+                        stats["summaries_failed"] += 1
+                yield motion
+        
+        # Each pass extracts only its own event type's motion, so a case denied
+        # under both types yields one motion per type
+        motions_found = self.store_motions(check_summaries(self.api_client.search_denied_motions(
+            motion_type=EVENT_MOTION_TYPES[event_type],
+            start_date=start_date,
+            end_date=end_date,
+            event_types=[event_type],
+            skip_case=skip_case
+        )), on_batch=on_batch)
+        
+        # Only record progress once every motion from the window has been stored
+        self.db.record_sync(event_type, end_date.isoformat(), processed)
+        return motions_found
@@ -0,0 +1,66 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ViewCache:
+    """In-process LRU cache of rendered API responses, bounded by entry count and total size
+    
+    Entries are tagged with the data generation they were rendered from, and
+    an entry from an older generation is treated as a miss, so a write makes
+    every cached response stale at once without any explicit purge.
+    """
+    
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    def get(self, key, generation):
+        """Return the cached (body, etag) for key if it was rendered at this generation"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1], entry[2]
+            
+            self._stats["misses"] += 1
+            if entry:
+                self._remove(key)
+            return None
+    
+    def put(self, key, generation, body):
+        """Cache a rendered body, returning its (body, etag)"""
+        etag = hashlib.sha1(body).hexdigest()
+        if len(body) > self.max_bytes:
+            return body, etag
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (generation, body, etag)
+            self._bytes += len(body)
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        
+        return body, etag
+    
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def _remove(self, key):
+        _, body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
@@ -25,11 +25,28 @@ function App() {
     try {
       const response = await axios.post(`${API_URL}/refresh`, { days_back: 1 });
       
-      if (response.data.success) {
+      if (!response.data.success) {
+        setError(response.data.error || 'An error occurred during refresh');
+        return;
+      }
+      
+      // The refresh runs as a background job; poll until it finishes
+      let job;
+      do {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const jobResponse = await axios.get(`${API_URL}/jobs/${response.data.job_id}`);
+        if (!jobResponse.data.success) {
+          setError(jobResponse.data.error || 'An error occurred during refresh');
+          return;
+        }
+        job = jobResponse.data.job;
+      } while (job.status === 'queued' || job.status === 'running');
+      
+      if (job.status === 'succeeded') {
         setRefreshDate(new Date());
-        alert(`Refresh successful. Found ${response.data.motions_found} new motions.`);
+        alert(`Refresh successful. Found ${job.result.motions_found} new motions.`);
       } else {
-        setError(response.data.error || 'An error occurred during refresh');
+        setError(job.error || `Refresh ${job.status}`);
       }
     } catch (err) {
       setError(err.message || 'An error occurred during refresh');
@@ -12,6 +12,9 @@ const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884d8', '#82ca9d'
 function Analytics({ apiUrl }) {
   const [stats, setStats] = useState(null);
   const [lawFirms, setLawFirms] = useState([]);
+  const [velocity, setVelocity] = useState(null);
+  const [judgeTrends, setJudgeTrends] = useState(null);
+  const [firmMatrix, setFirmMatrix] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -35,6 +38,23 @@ function Analytics({ apiUrl }) {
         } else {
           setError(firmsResponse.data.error || 'Failed to fetch law firm data');
         }
+        
+        // Fetch judge analytics
+        const [velocityResponse, trendsResponse, matrixResponse] = await Promise.all([
+          axios.get(`${apiUrl}/analytics/judges`, { params: { window_days: 90, limit: 15 } }),
+          axios.get(`${apiUrl}/analytics/trends`, { params: { dimension: 'judge', months: 12, rolling: 3, limit: 5 } }),
+          axios.get(`${apiUrl}/analytics/firm-judge`, { params: { firms: 8, judges: 8 } })
+        ]);
+        if (velocityResponse.data.success && trendsResponse.data.success && matrixResponse.data.success) {
+          setVelocity(velocityResponse.data);
+          setJudgeTrends(trendsResponse.data);
+          setFirmMatrix(matrixResponse.data);
+        } else {
+          setError(
+            velocityResponse.data.error || trendsResponse.data.error || matrixResponse.data.error ||
+            'Failed to fetch judge analytics'
+          );
+        }
       } catch (err) {
         setError(err.message || 'An error occurred while fetching data');
       } finally {
@@ -61,6 +81,23 @@ function Analytics({ apiUrl }) {
   
   // Prepare data for trend line chart
   const trendData = stats?.recent_trend || [];
+  
+  // One row per month with each judge's rolling average under their name
+  const judgeSeries = judgeTrends?.series || [];
+  const judgeTrendData = (judgeTrends?.months || []).map((month, index) => {
+    const row = { month };
+    judgeSeries.forEach(series => {
+      row[series.name] = series.rolling_avg[index];
+    });
+    return row;
+  });
+  
+  const formatChange = (judge) => {
+    if (judge.change_pct === null) {
+      return judge.previous_denials === 0 ? 'New' : '-';
+    }
+    return `${judge.change_pct > 0 ? '+' : ''}${judge.change_pct.toFixed(0)}%`;
+  };
 
   return (
     <div className="analytics">
@@ -143,6 +180,34 @@ function Analytics({ apiUrl }) {
           )}
         </div>
         
+        <div className="chart-container wide">
+          <h3>Monthly Denials by Judge (3-Month Rolling Average)</h3>
+          {judgeTrendData.length > 0 ? (
+            <ResponsiveContainer width="100%" height={300}>
+              <LineChart
+                data={judgeTrendData}
+                margin={{ top: 5, right: 30, left: 20, bottom: 5 }}
+              >
+                <CartesianGrid strokeDasharray="3 3" />
+                <XAxis dataKey="month" />
+                <YAxis />
+                <Tooltip />
+                <Legend />
+                {judgeSeries.map((series, index) => (
+                  <Line
+                    key={series.id}
+                    type="monotone"
+                    dataKey={series.name}
+                    stroke={COLORS[index % COLORS.length]}
+                  />
+                ))}
+              </LineChart>
+            </ResponsiveContainer>
+          ) : (
+            <div className="no-data">No judge trend data available</div>
+          )}
+        </div>
+        
         <div className="chart-container wide">
           <h3>Courts Distribution</h3>
           {stats?.by_court && stats.by_court.length > 0 ? (
@@ -165,6 +230,70 @@ function Analytics({ apiUrl }) {
         </div>
       </div>
       
+      <div className="top-law-firms">
+        <h3>Judge Denial Velocity (Last {velocity?.window_days} Days{velocity?.as_of ? ` to ${velocity.as_of}` : ''})</h3>
+        {velocity?.judges?.length > 0 ? (
+          <div className="law-firms-table-container">
+            <table className="law-firms-table">
+              <thead>
+                <tr>
+                  <th>Judge</th>
+                  <th>Denials</th>
+                  <th>Per 30 Days</th>
+                  <th>Prior Period</th>
+                  <th>Change</th>
+                </tr>
+              </thead>
+              <tbody>
+                {velocity.judges.map(judge => (
+                  <tr key={judge.judge_id}>
+                    <td>{judge.judge}</td>
+                    <td>{judge.denials}</td>
+                    <td>{judge.velocity.toFixed(2)}</td>
+                    <td>{judge.previous_velocity.toFixed(2)}</td>
+                    <td className={judge.change > 0 ? 'change-up' : judge.change < 0 ? 'change-down' : ''}>
+                      {formatChange(judge)}
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        ) : (
+          <div className="no-data">No judge velocity data available</div>
+        )}
+      </div>
+      
+      <div className="top-law-firms">
+        <h3>Law Firms vs. Judges</h3>
+        {firmMatrix?.firms?.length > 0 ? (
+          <div className="law-firms-table-container">
+            <table className="law-firms-table firm-judge-matrix">
+              <thead>
+                <tr>
+                  <th>Law Firm</th>
+                  {firmMatrix.judges.map(judge => (
+                    <th key={judge.id}>{judge.name}</th>
+                  ))}
+                </tr>
+              </thead>
+              <tbody>
+                {firmMatrix.firms.map((firm, row) => (
+                  <tr key={firm.id}>
+                    <td>{firm.name}</td>
+                    {firmMatrix.counts[row].map((count, column) => (
+                      <td key={column}>{count || ''}</td>
+                    ))}
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        ) : (
+          <div className="no-data">No law firm and judge data available</div>
+        )}
+      </div>
+      
       <div className="top-law-firms">
         <h3>Top Law Firms</h3>
         {lawFirms.length > 0 ? (
@@ -30,7 +30,7 @@ function Dashboard({ apiUrl }) {
         }
         
         // Fetch recent motions
-        const motionsResponse = await axios.get(`${apiUrl}/motions?limit=5`);
+        const motionsResponse = await axios.get(`${apiUrl}/motions?limit=5&view=summary`);
         if (motionsResponse.data.success) {
           setRecentMotions(motionsResponse.data.motions);
         } else {
@@ -142,7 +142,7 @@ function Dashboard({ apiUrl }) {
                   <p><strong>Court:</strong> {motion.court}</p>
                   <p><strong>Judge:</strong> {motion.judge}</p>
                   <p><strong>Motion Type:</strong> {motion.motion_type}</p>
-                  <p className="motion-summary">{motion.summary.substring(0, 150)}...</p>
+                  <p className="motion-summary">{(motion.summary_preview || '').substring(0, 150)}...</p>
                 </div>
                 <div className="motion-footer">
                   <Link to={`/motions/${motion.id}`} className="view-details">View Details</Link>
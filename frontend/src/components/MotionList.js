@@ -16,7 +16,8 @@ function MotionList({ apiUrl }) {
     endDate: ''
   });
   const [currentPage, setCurrentPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  // Continuation token for each page, indexed by page number - 1
+  const [pageCursors, setPageCursors] = useState([null]);
   const itemsPerPage = 10;
 
   useEffect(() => {
@@ -29,9 +30,12 @@ function MotionList({ apiUrl }) {
     try {
       const params = {
         limit: itemsPerPage,
-        offset: (currentPage - 1) * itemsPerPage
+        fields: 'id,case_name,court,judge,motion_type,order_date'
       };
       
+      const cursor = pageCursors[currentPage - 1];
+      if (cursor) params.cursor = cursor;
+      
       if (filters.court) params.court = filters.court;
       if (filters.judge) params.judge = filters.judge;
       if (filters.motionType) params.motion_type = filters.motionType;
@@ -43,9 +47,12 @@ function MotionList({ apiUrl }) {
       if (response.data.success) {
         setMotions(response.data.motions);
         
-        // Calculate total pages (this would typically come from the API)
-        // In a real implementation, the API should return total count
-        setTotalPages(Math.ceil(response.data.total / itemsPerPage) || 1);
+        // Remember where the next page starts so deep pages cost the same as the first
+        setPageCursors(prev => {
+          const cursors = prev.slice(0, currentPage);
+          if (response.data.next_cursor) cursors.push(response.data.next_cursor);
+          return cursors;
+        });
       } else {
         setError(response.data.error || 'Failed to fetch motions');
       }
@@ -63,6 +70,7 @@ function MotionList({ apiUrl }) {
       [name]: value
     }));
     setCurrentPage(1); // Reset to first page when filters change
+    setPageCursors([null]);
   };
 
   const handleResetFilters = () => {
@@ -74,10 +82,11 @@ function MotionList({ apiUrl }) {
       endDate: ''
     });
     setCurrentPage(1);
+    setPageCursors([null]);
   };
 
   const handlePageChange = (newPage) => {
-    if (newPage >= 1 && newPage <= totalPages) {
+    if (newPage >= 1 && newPage <= pageCursors.length) {
       setCurrentPage(newPage);
     }
   };
@@ -186,7 +195,7 @@ function MotionList({ apiUrl }) {
                   <td>{motion.court}</td>
                   <td>{motion.judge}</td>
                   <td>{motion.motion_type}</td>
-                  <td>{motion.order_info?.date || 'Unknown'}</td>
+                  <td>{motion.order_date || 'Unknown'}</td>
                   <td>
                     <Link to={`/motions/${motion.id}`} className="view-button">
                       View
@@ -206,12 +215,12 @@ function MotionList({ apiUrl }) {
             </button>
             
             <span className="page-info">
-              Page {currentPage} of {totalPages}
+              Page {currentPage}
             </span>
             
             <button
               onClick={() => handlePageChange(currentPage + 1)}
-              disabled={currentPage === totalPages}
+              disabled={currentPage >= pageCursors.length}
             >
               Next
             </button>
@@ -1,5 +1,5 @@
 // components/Settings.js
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import './Settings.css';
 
@@ -19,6 +19,19 @@ function Settings({ apiUrl }) {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState(null);
   const [successMessage, setSuccessMessage] = useState('');
+  const [nextRun, setNextRun] = useState(null);
+
+  useEffect(() => {
+    // Load the saved refresh settings
+    axios.get(`${apiUrl}/settings/refresh`)
+      .then(response => {
+        if (response.data.success) {
+          setRefreshSettings(response.data.settings);
+          setNextRun(response.data.next_run);
+        }
+      })
+      .catch(() => {});
+  }, [apiUrl]);
 
   const handleApiChange = (e) => {
     const { name, value } = e.target;
@@ -67,6 +80,8 @@ function Settings({ apiUrl }) {
       const response = await axios.post(`${apiUrl}/settings/refresh`, refreshSettings);
       
       if (response.data.success) {
+        setRefreshSettings(response.data.settings);
+        setNextRun(response.data.next_run);
         setSuccessMessage('Refresh settings saved successfully');
       } else {
         setError(response.data.error || 'Failed to save refresh settings');
@@ -182,6 +197,10 @@ function Settings({ apiUrl }) {
             </select>
           </div>
           
+          {refreshSettings.autoRefresh && nextRun && (
+            <p className="schedule-info">Next scheduled refresh: {new Date(nextRun).toLocaleString()}</p>
+          )}
+          
           <div className="form-actions">
             <button 
               type="submit" 